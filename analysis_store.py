@@ -0,0 +1,337 @@
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
+
+import serializer
+from channel_linker import ChannelLinker
+
+# Declarations indexed into the nodes table when an AST is stored
+NODES_OF_INTEREST = frozenset([
+    'function_declaration', 'method_declaration', 'type_spec', 'field_declaration',
+    'method_spec', 'method_elem', 'const_spec', 'var_spec', 'import_spec',
+    'function_definition', 'class_specifier', 'struct_specifier', 'class_declaration'
+])
+NAME_NODE_TYPES = ('identifier', 'field_identifier', 'type_identifier', 'interpreted_string_literal')
+# String literal types holding the path of an import_spec
+IMPORT_PATH_TYPES = ('interpreted_string_literal', 'raw_string_literal')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    category TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    name TEXT,
+    start_row INTEGER, start_col INTEGER, end_row INTEGER, end_col INTEGER
+);
+CREATE TABLE IF NOT EXISTS components (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT,
+    start_row INTEGER, start_col INTEGER, end_row INTEGER, end_col INTEGER,
+    interface TEXT
+);
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    source TEXT,
+    target TEXT,
+    type TEXT,
+    count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS patterns (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT,
+    node_type TEXT,
+    direction TEXT,
+    start_row INTEGER, start_col INTEGER, end_row INTEGER, end_col INTEGER,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    channel TEXT,
+    direction TEXT,
+    function TEXT,
+    node_type TEXT,
+    start_row INTEGER, start_col INTEGER, end_row INTEGER, end_col INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_name ON nodes(name);
+CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(type);
+CREATE INDEX IF NOT EXISTS idx_nodes_file ON nodes(file_id);
+CREATE INDEX IF NOT EXISTS idx_components_name ON components(name);
+CREATE INDEX IF NOT EXISTS idx_components_kind ON components(kind);
+CREATE INDEX IF NOT EXISTS idx_components_file ON components(file_id);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target);
+CREATE INDEX IF NOT EXISTS idx_relationships_file ON relationships(file_id);
+CREATE INDEX IF NOT EXISTS idx_patterns_kind ON patterns(kind);
+CREATE INDEX IF NOT EXISTS idx_patterns_name ON patterns(name);
+CREATE INDEX IF NOT EXISTS idx_patterns_file ON patterns(file_id);
+CREATE INDEX IF NOT EXISTS idx_channels_channel ON channels(channel);
+CREATE INDEX IF NOT EXISTS idx_channels_function ON channels(function);
+CREATE INDEX IF NOT EXISTS idx_channels_file ON channels(file_id);
+"""
+
+def _location(start: Any, end: Any) -> Tuple[Optional[int], ...]:
+    """Flatten {'row', 'column'} start/end points into four columns."""
+    start = start if isinstance(start, dict) else {}
+    end = end if isinstance(end, dict) else {}
+    return start.get('row'), start.get('column'), end.get('row'), end.get('column')
+
+def _leaves(node: Dict) -> List[Dict]:
+    """Leaves of a dict AST subtree in document order."""
+    if not node.get('children'):
+        return [node]
+    return [leaf for child in node['children'] for leaf in _leaves(child)]
+
+class AnalysisStore:
+    """
+    SQLite store for per-file analysis results.
+
+    Each file owns its rows in the nodes, components, relationships, patterns
+    and channels tables, so re-analyzing a file replaces just that file's rows.
+    Project-wide channel patterns are kept with no owning file and rebuilt by
+    link_channels. Writes are batched with executemany inside one transaction
+    per call, and the name, type and file columns are indexed.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = ':memory:'):
+        """
+        Args:
+            db_path: SQLite database file, created if missing
+        """
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Bring databases created by earlier versions up to the current schema."""
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(relationships)')}
+        if 'count' not in columns:
+            # Relationship rows became unique edges with an occurrence count
+            with self.conn:
+                self.conn.execute('ALTER TABLE relationships ADD COLUMN count INTEGER NOT NULL DEFAULT 1')
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'AnalysisStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _node_name(node: Dict) -> Optional[str]:
+        for child in node.get('children', []):
+            if child.get('type') in NAME_NODE_TYPES and 'text' in child:
+                return child['text']
+        if node['type'] == 'import_spec':
+            # Unpruned trees keep the path literal as quote and content leaves, not as one text
+            for child in node.get('children', []):
+                if child.get('type') in IMPORT_PATH_TYPES:
+                    text = ''.join(leaf.get('text', '') for leaf in _leaves(child))
+                    return text if text.strip('"`') else None
+        return None
+
+    def _ast_rows(self, ast_data: Dict[str, Any]) -> List[Tuple]:
+        """Collect the declarations of an AST as nodes rows (without the file id)."""
+        rows = []
+        stack = [ast_data['ast']]
+        while stack:
+            node = stack.pop()
+            if node['type'] in NODES_OF_INTEREST:
+                rows.append((node['type'], self._node_name(node)) +
+                            _location(node.get('start_point'), node.get('end_point')))
+            stack.extend(node.get('children', []))
+        return rows
+
+    def _replace(self, path: str, category: Optional[str], rows: Dict[str, List[Tuple]]) -> None:
+        """Replace one file's rows; must run inside a transaction."""
+        self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+        file_id = self.conn.execute('INSERT INTO files (path, category) VALUES (?, ?)', (path, category)).lastrowid
+        statements = {
+            'nodes': 'INSERT INTO nodes (file_id, type, name, start_row, start_col, end_row, end_col) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            'components': 'INSERT INTO components (file_id, kind, name, start_row, start_col, end_row, end_col, '
+                          'interface) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            'relationships': 'INSERT INTO relationships (file_id, source, target, type, count) VALUES (?, ?, ?, ?, ?)',
+            'patterns': 'INSERT INTO patterns (file_id, kind, name, node_type, direction, start_row, start_col, '
+                        'end_row, end_col, detail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            'channels': 'INSERT INTO channels (file_id, channel, direction, function, node_type, start_row, '
+                        'start_col, end_row, end_col) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+        }
+        for table, table_rows in rows.items():
+            if table_rows:
+                self.conn.executemany(statements[table], [(file_id,) + row for row in table_rows])
+
+    def _cgra_rows(self, file_analysis: Dict[str, Any], ast_data: Optional[Dict[str, Any]]) -> Dict[str, List[Tuple]]:
+        components = file_analysis.get('components', {})
+        return {
+            'nodes': self._ast_rows(ast_data) if ast_data else [],
+            'components': [
+                (kind, comp.get('name')) +
+                _location(comp.get('location', {}).get('start'), comp.get('location', {}).get('end')) +
+                (serializer.dumps(comp.get('interface', {}), compact=True).decode('utf-8'),)
+                for kind, comps in components.items() if kind != 'relationships'
+                for comp in comps
+            ],
+            'relationships': [(rel.get('from'), rel.get('to'), rel.get('type'), rel.get('count', 1))
+                              for rel in components.get('relationships', [])],
+            'patterns': [],
+            'channels': [
+                (entry.get('channel'), entry.get('direction'), entry.get('function'), entry.get('type')) +
+                _location(entry['location'].get('start'), entry['location'].get('end'))
+                for entry in file_analysis.get('dataflow', {}).get('channels', [])
+            ]
+        }
+
+    def _architecture_rows(self, file_patterns: Dict[str, Any], ast_data: Optional[Dict[str, Any]]) -> Dict[str, List[Tuple]]:
+        patterns = []
+        for pattern in file_patterns.get('control_flow', []) + file_patterns.get('data_flow', []):
+            location = pattern.get('location', {})
+            patterns.append((pattern['type'], pattern.get('name'), pattern.get('node_type'), pattern.get('direction')) +
+                            _location(location.get('start'), location.get('end')) + (None,))
+        return {
+            'nodes': self._ast_rows(ast_data) if ast_data else [],
+            'components': [],
+            'relationships': [(rel.get('from'), rel.get('to'), rel.get('type'), rel.get('count', 1))
+                              for rel in file_patterns.get('relationships', [])],
+            'patterns': patterns,
+            'channels': []
+        }
+
+    def store_cgra_files(self, file_analyses: Iterable[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]) -> int:
+        """
+        Store CGRAAnalyzer.analyze_cgra_file results in one transaction, replacing earlier rows of the same files.
+
+        Args:
+            file_analyses: (file analysis, optional AST data) pairs; the AST feeds the nodes table
+
+        Returns:
+            Number of files stored
+        """
+        count = 0
+        with self.conn:
+            for file_analysis, ast_data in file_analyses:
+                self._replace(file_analysis['file'], file_analysis.get('category'),
+                              self._cgra_rows(file_analysis, ast_data))
+                count += 1
+        return count
+
+    def store_architecture_files(self, file_patterns: Iterable[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]) -> int:
+        """
+        Store ArchitectureAnalyzer.analyze_file results in one transaction, replacing earlier rows of the same files.
+
+        Args:
+            file_patterns: (file path, file patterns, optional AST data) triples
+
+        Returns:
+            Number of files stored
+        """
+        count = 0
+        with self.conn:
+            for path, patterns, ast_data in file_patterns:
+                self._replace(path, None, self._architecture_rows(patterns, ast_data))
+                count += 1
+        return count
+
+    def remove_file(self, path: str) -> None:
+        """Delete a file and all its rows."""
+        with self.conn:
+            self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+
+    def link_channels(self) -> int:
+        """
+        Rebuild the project-wide channel patterns from the stored channel operations.
+
+        Returns:
+            Number of channel patterns stored
+        """
+        linker = ChannelLinker()
+        linker.add(dict(row) for row in self.conn.execute(
+            'SELECT files.path AS file, channel, direction, function FROM channels JOIN files ON files.id = file_id'))
+        patterns = linker.link()['patterns']
+        with self.conn:
+            self.conn.execute("DELETE FROM patterns WHERE file_id IS NULL AND kind LIKE 'channel:%'")
+            self.conn.executemany(
+                'INSERT INTO patterns (file_id, kind, name, detail) VALUES (NULL, ?, ?, ?)',
+                [('channel:' + p['type'], p.get('channel') or p.get('function'),
+                  serializer.dumps(p, compact=True).decode('utf-8')) for p in patterns])
+        return len(patterns)
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Run an ad-hoc SQL query and return its rows as dicts."""
+        return [dict(row) for row in self.conn.execute(sql, tuple(params))]
+
+    def _find(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        clauses = []
+        params = []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == 'file':
+                clauses.append('files.path = ?')
+            else:
+                clauses.append(f'{table}.{column} = ?')
+            params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.query(f'SELECT {table}.*, files.path AS file FROM {table} '
+                          f'LEFT JOIN files ON files.id = {table}.file_id{where}', params)
+
+    def find_nodes(self, name: Optional[str] = None, type: Optional[str] = None,
+                   file: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._find('nodes', {'name': name, 'type': type, 'file': file})
+
+    def find_components(self, name: Optional[str] = None, kind: Optional[str] = None,
+                        file: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._find('components', {'name': name, 'kind': kind, 'file': file})
+
+    def find_relationships(self, source: Optional[str] = None, target: Optional[str] = None,
+                           file: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._find('relationships', {'source': source, 'target': target, 'file': file})
+
+    def find_patterns(self, kind: Optional[str] = None, name: Optional[str] = None,
+                      file: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._find('patterns', {'kind': kind, 'name': name, 'file': file})
+
+    def find_channels(self, channel: Optional[str] = None, function: Optional[str] = None,
+                      file: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._find('channels', {'channel': channel, 'function': function, 'file': file})
+
+    def files(self) -> List[str]:
+        return [row['path'] for row in self.conn.execute('SELECT path FROM files ORDER BY path')]
+
+def main():
+    """Example usage: index a CGRA project and run a few lookups."""
+    import sys
+    from cgra_analyzer import CGRAAnalyzer
+
+    if len(sys.argv) < 3:
+        print("Usage: python analysis_store.py <project_path> <database> [name]")
+        return
+
+    with AnalysisStore(sys.argv[2]) as store:
+        CGRAAnalyzer().analyze_cgra_project(sys.argv[1], store=store)
+        print(f"Indexed {len(store.files())} files into {sys.argv[2]}")
+        if len(sys.argv) > 3:
+            for row in store.find_nodes(name=sys.argv[3]):
+                print(f"- {row['type']} {row['name']} in {row['file']}:{row['start_row'] + 1}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
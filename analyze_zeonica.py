@@ -1,39 +1,88 @@
 import os
 import sys
-import json
+import argparse
 from pathlib import Path
 from code_analyzer import TreeSitterAnalyzer
 from cgra_analyzer import CGRAAnalyzer
+import compact_schema
+import serializer
+from shard_store import ShardWriter
+from ast_archive import ArchiveWriter, CODECS
+from analysis_store import AnalysisStore
+from file_policy import FilePolicy
+from parse_budget import ParseBudget
+from file_discovery import discover_files
 
-def analyze_component(analyzer, component_path, output_dir, component_name):
-    """Analyze a specific component directory."""
+def analyze_component(analyzer, component_path, output_dir, component_name, prune_profile=None,
+                      compact=False, sharded=False, archive=None):
+    """
+    Analyze a specific component directory, optionally pruned and in the compact schema.
+
+    With sharded output, each file's AST is written as its own record to
+    <component>_shards/ (see shard_store) instead of one monolithic JSON dump.
+    With an archive codec, each file's AST is compressed as its own frame into
+    <component>_analysis.astar (see ast_archive).
+    """
     print(f"\nAnalyzing {component_name} component...")
     if os.path.exists(component_path):
+        if archive:
+            writer = ArchiveWriter(os.path.join(output_dir, f"{component_name}_analysis.astar"), archive,
+                                   compact=compact)
+            return analyze_component_records(analyzer, component_path, writer, component_name, prune_profile)
+        if sharded:
+            writer = ShardWriter(os.path.join(output_dir, f"{component_name}_shards"), compact)
+            return analyze_component_records(analyzer, component_path, writer, component_name, prune_profile)
         files = []
-        for root, _, filenames in os.walk(component_path):
-            for filename in filenames:
-                if filename.endswith('.go'):
-                    file_path = os.path.join(root, filename)
-                    ast_data = analyzer.parse_file(file_path)
-                    if ast_data:
-                        files.append({
-                            'file': os.path.relpath(file_path, component_path),
-                            'ast': ast_data
-                        })
+        for file_path in discover_files(component_path, ('.go',)):
+            ast_data = analyzer.parse_file(file_path, prune_profile)
+            if ast_data:
+                files.append({
+                    'file': os.path.relpath(file_path, component_path),
+                    'ast': ast_data
+                })
         
         if files:
             output_file = os.path.join(output_dir, f"{component_name}_analysis.json")
-            with open(output_file, 'w') as f:
-                json.dump({
-                    'component': component_name,
-                    'files_analyzed': len(files),
-                    'analysis': files
-                }, f, indent=2)
+            compact_schema.dump({
+                'component': component_name,
+                'files_analyzed': len(files),
+                'analysis': files
+            }, output_file, compact)
             print(f"✓ {component_name.capitalize()} analysis completed: {len(files)} files analyzed")
             return len(files)
     return 0
 
-def main():
+def analyze_component_records(analyzer, component_path, writer, component_name, prune_profile=None):
+    """Analyze a component directory into a per-file record writer (shards or archive)."""
+    count = 0
+    with writer:
+        for file_path in discover_files(component_path, ('.go',)):
+            ast_data = analyzer.parse_file(file_path, prune_profile)
+            if ast_data:
+                writer.add(os.path.relpath(file_path, component_path), ast_data)
+                count += 1
+    if count:
+        print(f"✓ {component_name.capitalize()} analysis completed: {count} files analyzed (per-file records)")
+    return count
+
+def main(component_profile=None, project_profile=None, compact=False, sharded=False, archive=None,
+         store_path=None, file_policy=None, parse_budget=None, summary_cache=None, dedupe=False):
+    """
+    Analyze the zeonica project.
+
+    Args:
+        component_profile: AST pruning profile for the per-component dumps
+        project_profile: AST pruning profile for the project-wide CGRA analysis
+        compact: Write component dumps in the compact schema and all other files without indentation
+        sharded: Write component dumps as per-file shards with an offset manifest
+        archive: Codec for writing component dumps as compressed per-file archives
+        store_path: SQLite database that also receives the project analysis, indexed per file
+        file_policy: FilePolicy for generated, vendored and oversized files (None parses everything)
+        parse_budget: ParseBudget limiting the time and size spent on one file (None sets no limits)
+        summary_cache: Cache file for per-directory summaries, added to analysis_summary.json and
+                       recomputed only along the paths of changed files
+        dedupe: Parse identical file contents once and share their AST (see ParseCache)
+    """
     # Get zeonica project path
     zeonica_path = os.path.join(os.getcwd(), 'cgra_analysis', 'zeonica')
     if not os.path.exists(zeonica_path):
@@ -45,7 +94,7 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
 
     # Initialize analyzer
-    analyzer = CGRAAnalyzer()
+    analyzer = CGRAAnalyzer(file_policy=file_policy, dedupe=dedupe, parse_budget=parse_budget)
     
     print("Starting CGRA analysis of zeonica project...")
     print("=" * 50)
@@ -74,7 +123,8 @@ def main():
     }
 
     for component_name, component_path in components.items():
-        files_analyzed = analyze_component(analyzer, component_path, output_dir, component_name)
+        files_analyzed = analyze_component(analyzer, component_path, output_dir, component_name,
+                                           component_profile, compact, sharded, archive)
         total_files += files_analyzed
         analysis_summary['components'][component_name] = {
             'files_analyzed': files_analyzed,
@@ -82,20 +132,29 @@ def main():
         }
 
     analysis_summary['total_files_analyzed'] = total_files
+    if summary_cache:
+        hierarchy = analyzer.summarize_project(zeonica_path, summary_cache, project_profile)
+        analysis_summary['directories'] = hierarchy['directories']
+        print(f"\nDirectory summaries: {hierarchy['stats']['files_summarized']} files and "
+              f"{hierarchy['stats']['directories_computed']} directories recomputed")
 
     # Generate project-wide analysis
-    project_analysis = analyzer.analyze_cgra_project(zeonica_path)
-    with open(os.path.join(output_dir, 'project_analysis.json'), 'w') as f:
-        json.dump(project_analysis, f, indent=2)
+    if store_path:
+        with AnalysisStore(store_path) as store:
+            project_analysis = analyzer.analyze_cgra_project(zeonica_path, project_profile, store)
+    else:
+        project_analysis = analyzer.analyze_cgra_project(zeonica_path, project_profile)
+    serializer.dump(project_analysis, os.path.join(output_dir, 'project_analysis.json'), compact)
 
     # Save analysis summary
-    with open(os.path.join(output_dir, 'analysis_summary.json'), 'w') as f:
-        json.dump(analysis_summary, f, indent=2)
+    serializer.dump(analysis_summary, os.path.join(output_dir, 'analysis_summary.json'), compact)
 
     print("\nAnalysis Summary:")
     print("=" * 50)
     print(f"Total files analyzed: {total_files}")
     print(f"Components processed: {', '.join(components.keys())}")
+    for degraded in project_analysis.get('degraded_files', []):
+        print(f"Degraded ({degraded['reason']}): {degraded['file']}")
     print(f"\nAnalysis results saved to: {output_dir}")
     print("\nGenerated files:")
     for file in os.listdir(output_dir):
@@ -112,5 +171,31 @@ def main():
     print("   - Configuration and control mechanisms")
     print("   - Memory hierarchy and interconnect structure")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="CGRA analysis of the zeonica project")
+    parser.add_argument('--component-profile', help="AST pruning profile for component dumps, e.g. declarations")
+    parser.add_argument('--project-profile', help="AST pruning profile for the project analysis, e.g. named")
+    parser.add_argument('--compact', action='store_true', help="Write compact output (compact schema, no indentation)")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Write component dumps as per-file records with a random-access manifest")
+    parser.add_argument('--archive', choices=list(CODECS),
+                        help="Write component dumps as compressed frame-per-file archives with this codec")
+    parser.add_argument('--store', help="Also index the project analysis into this SQLite database")
+    parser.add_argument('--parse-all', action='store_true',
+                        help="Parse generated, mock, vendored and oversized files like any other file")
+    parser.add_argument('--max-file-size', type=int, default=1024 * 1024,
+                        help="Files above this size in bytes are parsed in the cheap declarations profile")
+    parser.add_argument('--parse-timeout', type=float, default=30.0,
+                        help="Seconds allowed for parsing one file before it gets a degraded result; 0 disables")
+    parser.add_argument('--summary-cache', metavar='PATH',
+                        help="Add per-directory summaries, reusing those of unchanged files from this cache")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="Parse identical file contents (vendored copies, forks) once and share the AST")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    file_policy = None if args.parse_all else FilePolicy(max_size=args.max_file_size)
+    parse_budget = ParseBudget(max_seconds=args.parse_timeout) if args.parse_timeout else None
+    main(args.component_profile, args.project_profile, args.compact, args.sharded, args.archive, args.store,
+         file_policy, parse_budget, args.summary_cache, args.dedupe)
\ No newline at end of file
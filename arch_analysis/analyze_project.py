@@ -1,31 +1,43 @@
 import os
 import sys
-import json
+import argparse
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path to import code_analyzer and arch_analyzer
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from go_analyzer import GoAnalyzer
 from arch_analyzer import ArchitectureAnalyzer
+import compact_schema
+import serializer
+from shard_store import ShardWriter
+from analysis_store import AnalysisStore
+from file_policy import FilePolicy
+from file_discovery import discover_files
 
-def analyze_go_files(project_path: str, output_dir: str):
-    """Generate AST data for all Go files in the project."""
-    analyzer = GoAnalyzer()
+def analyze_go_files(project_path: str, output_dir: str, prune_profile: Optional[str] = None,
+                     compact: bool = False, file_policy: Optional[FilePolicy] = None, sharded: bool = False,
+                     dedupe: bool = False):
+    """
+    Generate AST data for all Go files in the project, optionally pruned and in the compact schema.
+    Files skipped by the file policy are left out of the component dumps.
+    With sharded, each component is written as a <component>_shards record store as files are
+    parsed, which approximate architecture analysis can sample from, and nothing is returned.
+    With dedupe, identical file contents are parsed once and share their AST.
+    """
+    analyzer = GoAnalyzer(prune_profile, file_policy, dedupe=dedupe)
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
     # Find all Go files
-    go_files = []
-    for root, _, files in os.walk(project_path):
-        for file in files:
-            if file.endswith('.go'):
-                go_files.append(os.path.join(root, file))
+    go_files = discover_files(project_path, ('.go',))
     
     print(f"\nFound {len(go_files)} Go files to analyze")
     
     # Generate ASTs for each file
     component_asts = {}
+    writers = {}
     for file_path in go_files:
         rel_path = os.path.relpath(file_path, project_path)
         component = rel_path.split(os.sep)[0]  # Use top-level directory as component name
@@ -38,22 +50,34 @@ def analyze_go_files(project_path: str, output_dir: str):
         
         print(f"Analyzing {rel_path}...")
         ast_data = analyzer.parse_file(file_path)
-        if ast_data:
+        if sharded:
+            if component not in writers:
+                writers[component] = ShardWriter(os.path.join(output_dir, f"{component}_shards"), compact)
+            if ast_data:
+                writers[component].add(rel_path, ast_data)
+        elif ast_data:
             component_asts[component]['analysis'].append({
                 'file': rel_path,
                 'ast': ast_data
             })
     
+    for component, writer in writers.items():
+        writer.close()
+        print(f"Saved {component} analysis to {writer.output_dir}")
+    if sharded:
+        return {}
+    
     # Save ASTs by component
     for component, data in component_asts.items():
         output_file = os.path.join(output_dir, f"{component}_analysis.json")
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        compact_schema.dump(data, output_file, compact)
         print(f"Saved {component} analysis to {output_file}")
     
     return component_asts
 
-def main():
+def main(prune_profile: Optional[str] = None, compact: bool = False, store_path: Optional[str] = None,
+         file_policy: Optional[FilePolicy] = None, sample_fraction: Optional[float] = None, sharded: bool = False,
+         summary_cache: Optional[str] = None, dedupe: bool = False):
     # Set up paths
     zeonica_path = os.path.join(os.getcwd(), 'zeonica')
     current_dir = os.getcwd()
@@ -72,12 +96,29 @@ def main():
     
     # Step 1: Generate ASTs
     print("\nGenerating ASTs for Go files...")
-    component_asts = analyze_go_files(zeonica_path, ast_output_dir)
+    component_asts = analyze_go_files(zeonica_path, ast_output_dir, prune_profile, compact, file_policy, sharded,
+                                      dedupe)
     
     # Step 2: Run architecture analysis
     print("\nPerforming architecture analysis...")
     arch_analyzer = ArchitectureAnalyzer(ast_output_dir)
-    analysis = arch_analyzer.save_analysis(os.path.join(arch_output_dir, 'architecture_analysis.json'))
+    if summary_cache:
+        # Per-directory summaries only, recomputed along the paths of changed files
+        hierarchy = arch_analyzer.summarize_hierarchy(summary_cache)
+        summary_path = os.path.join(arch_output_dir, 'architecture_summary.json')
+        serializer.dump(hierarchy, summary_path, compact)
+        stats = hierarchy['stats']
+        print(f"Summarized {hierarchy['summary']['files']} files: {stats['files_summarized']} files and "
+              f"{stats['directories_computed']} directories recomputed, the rest reused")
+        print(f"Architecture summary saved to {summary_path}")
+        return
+    if store_path:
+        with AnalysisStore(store_path) as store:
+            analysis = arch_analyzer.save_analysis(os.path.join(arch_output_dir, 'architecture_analysis.json'),
+                                                   compact, store)
+    else:
+        analysis = arch_analyzer.save_analysis(os.path.join(arch_output_dir, 'architecture_analysis.json'), compact,
+                                               sample_fraction=sample_fraction)
     
     # Print analysis results
     arch_analyzer.print_analysis_summary(analysis)
@@ -99,5 +140,28 @@ def main():
     print("4. Use the components section to understand module structure")
     print("5. Relationship graphs show dependencies between components")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Architecture analysis of the zeonica project")
+    parser.add_argument('--profile', help="AST pruning profile, e.g. named")
+    parser.add_argument('--compact', action='store_true', help="Write AST dumps in the compact schema")
+    parser.add_argument('--store', help="Also index the architecture analysis into this SQLite database")
+    parser.add_argument('--parse-all', action='store_true',
+                        help="Parse generated, mock, vendored and oversized files like any other file")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Write AST dumps as per-file record stores, which --sample reads selectively")
+    parser.add_argument('--sample', type=float, metavar='FRACTION',
+                        help="Approximate architecture metrics from this fraction of each component's files")
+    parser.add_argument('--summary-cache', metavar='PATH',
+                        help="Only write per-directory summaries, reusing those of unchanged files from this cache")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="Parse identical file contents (vendored copies, forks) once and share the AST")
+    args = parser.parse_args()
+    if args.store and args.sample is not None:
+        # The store indexes every file, so it cannot be filled from a sample
+        parser.error("--store needs the exact analysis and cannot be combined with --sample")
+    return args
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(args.profile, args.compact, args.store, None if args.parse_all else FilePolicy(), args.sample, args.sharded,
+         args.summary_cache, args.dedupe)
\ No newline at end of file
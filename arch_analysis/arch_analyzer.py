@@ -1,10 +1,24 @@
-import json
 import os
+import sys
+import math
+import random
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Set
-from collections import defaultdict
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Set, Iterator, Tuple, Callable
+from collections import defaultdict, Counter
+from functools import partial
 import networkx as nx
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compact_schema
+import serializer
+from shard_store import ShardReader
+from ast_archive import ArchiveReader
+from file_summary import FileSummary, record_summary
+from edge_aggregator import EdgeAggregator, occurrence_count
+from merkle_summary import MerkleSummarizer
+from content_dedup import content_digest
+
 class ArchitectureAnalyzer:
     """
     A general-purpose architecture simulator analyzer that extracts relationships,
@@ -60,10 +74,9 @@ class ArchitectureAnalyzer:
         self.relationship_graph = nx.DiGraph()
 
     def _load_analysis_file(self, filename: str) -> Dict:
-        """Load and parse a JSON analysis file."""
+        """Load and parse a JSON analysis file (full or compact schema)."""
         filepath = os.path.join(self.analysis_dir, filename)
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return compact_schema.load(filepath)
 
     def _extract_name(self, node: Dict) -> Optional[str]:
         """Extract name from a node."""
@@ -85,9 +98,25 @@ class ArchitectureAnalyzer:
             any(id_pattern in node_text for id_pattern in patterns['identifiers'])
         )
 
-    def _extract_relationships(self, node: Dict, parent_info: Optional[Dict] = None) -> List[Dict]:
-        """Extract relationships between architectural components."""
-        relationships = []
+    def _may_match(self, summary: Optional[FileSummary], pattern_type: str) -> bool:
+        """Whether a file with this summary can contain a node matching a pattern type (True without summary)."""
+        if summary is None:
+            return True
+        patterns = self.patterns[pattern_type]
+        return summary.may_have_any_type(patterns['types']) or summary.may_contain_any(patterns['identifiers'])
+
+    def _extract_relationships(self, node: Dict) -> List[Dict]:
+        """
+        Extract relationships between architectural components.
+
+        Returns:
+            Unique edges with their occurrence count and source locations (see EdgeAggregator)
+        """
+        edges = EdgeAggregator()
+        self._collect_relationships(node, None, edges)
+        return edges.edges()
+
+    def _collect_relationships(self, node: Dict, parent_info: Optional[Dict], edges: EdgeAggregator) -> None:
         current_info = None
         
         # Check if current node represents a component
@@ -103,18 +132,13 @@ class ArchitectureAnalyzer:
             
             # Add relationship with parent if exists
             if parent_info:
-                relationships.append({
-                    'from': parent_info['name'],
-                    'to': current_info['name'],
-                    'type': 'contains'
-                })
+                start = node.get('start_point') or {}
+                edges.add(parent_info['name'], current_info['name'], 'contains',
+                          [start.get('row'), start.get('column')])
         
         # Process children
         for child in node.get('children', []):
-            child_rels = self._extract_relationships(child, current_info or parent_info)
-            relationships.extend(child_rels)
-            
-        return relationships
+            self._collect_relationships(child, current_info or parent_info, edges)
 
     def _extract_control_flow(self, node: Dict) -> List[Dict]:
         """Extract control flow patterns."""
@@ -172,75 +196,195 @@ class ArchitectureAnalyzer:
         return 'bidirectional'
 
     def analyze_file(self, ast_data: Dict) -> Dict[str, Any]:
-        """Analyze patterns in a single file."""
+        """
+        Analyze patterns in a single file.
+
+        Pattern types the file's summary rules out (see file_summary) are not
+        searched for.
+        """
         if 'ast' not in ast_data:
             return {}
             
         root_node = ast_data['ast']
+        summary = record_summary(ast_data)
         analysis = {
-            'relationships': self._extract_relationships(root_node),
-            'control_flow': self._extract_control_flow(root_node),
-            'data_flow': self._extract_data_flow(root_node)
+            'relationships': (self._extract_relationships(root_node)
+                              if self._may_match(summary, 'component') else []),
+            'control_flow': (self._extract_control_flow(root_node)
+                             if self._may_match(summary, 'control_flow') else []),
+            'data_flow': (self._extract_data_flow(root_node)
+                          if self._may_match(summary, 'data_flow') else [])
         }
         
         return analysis
 
+    def find_nodes(self, node_types: Optional[List[str]] = None, text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the nodes of given types and/or containing a text across all component dumps.
+
+        Files whose summary rules out a match are skipped, and with sharded or
+        archived dumps their records are not even read, so narrow queries touch
+        only a fraction of the data.
+
+        Args:
+            node_types: Node types to match (any type if None)
+            text: Case-insensitive substring of the node text to match (any node if None)
+
+        Returns:
+            List of matches with component, file, node type, text and location
+        """
+        types = frozenset(node_types) if node_types else None
+        needle = text.lower() if text is not None else None
+        matches = []
+        for component, files, reader in self._component_sources():
+            for file_name, load_ast, _, summary in files:
+                if summary is not None and ((types is not None and not summary.may_have_any_type(types)) or
+                                            (needle is not None and not summary.may_contain(needle))):
+                    continue
+                ast_data = load_ast()
+                stack = [ast_data['ast']] if ast_data and 'ast' in ast_data else []
+                while stack:
+                    node = stack.pop()
+                    if ((types is None or node['type'] in types) and
+                            (needle is None or needle in node.get('text', '').lower())):
+                        matches.append({
+                            'component': component,
+                            'file': file_name,
+                            'node_type': node['type'],
+                            'text': node.get('text'),
+                            'location': {
+                                'start': node.get('start_point'),
+                                'end': node.get('end_point')
+                            }
+                        })
+                    stack.extend(reversed(node.get('children', [])))
+            if reader is not None:
+                reader.close()
+        return matches
+
     def build_relationship_graph(self, relationships: List[Dict]):
-        """Build a directed graph of component relationships."""
+        """Build a directed graph of component relationships, weighted by occurrence count."""
         for rel in relationships:
             if rel.get('from') and rel.get('to'):
+                weight = rel.get('count', 1)
+                if self.relationship_graph.has_edge(rel['from'], rel['to']):
+                    weight += self.relationship_graph[rel['from']][rel['to']].get('weight', 0)
                 self.relationship_graph.add_edge(
                     rel['from'],
                     rel['to'],
-                    type=rel.get('type', 'unknown')
+                    type=rel.get('type', 'unknown'),
+                    weight=weight
                 )
 
-    def analyze_architecture(self) -> Dict[str, Any]:
-        """Perform comprehensive architecture analysis."""
-        analysis_files = [f for f in os.listdir(self.analysis_dir)
-                         if f.endswith('_analysis.json')]
-        
-        architecture_analysis = {
+    def _component_sources(self) -> Iterator[Tuple[str, List[Tuple[str, Callable[[], Dict], int,
+                                                                   Optional[FileSummary]]], Any]]:
+        """
+        Yield (component, [(file, load_ast, size, summary)], reader) for every component dump in analysis_dir.
+
+        Dumps are <component>_analysis.json documents, which are loaded whole, and
+        <component>_shards record stores or <component>_analysis.astar archives,
+        whose records are only read when load_ast is called. size is the stored
+        record size in bytes (1 for JSON documents), summary the record's file
+        summary, if it has one. The caller closes the reader, if any, when done
+        with the component.
+        """
+        for name in sorted(os.listdir(self.analysis_dir)):
+            path = os.path.join(self.analysis_dir, name)
+            if name.endswith('_analysis.json'):
+                data = self._load_analysis_file(name)
+                component = data.get('component') or name[:-len('_analysis.json')]
+                files = [(file_analysis['file'], partial(dict.get, file_analysis, 'ast'), 1,
+                          record_summary(file_analysis['ast'] or {}))
+                         for file_analysis in data.get('analysis', []) if 'ast' in file_analysis]
+                yield component, files, None
+            elif name.endswith('_shards') and os.path.isfile(os.path.join(path, 'manifest.json')):
+                reader = ShardReader(path)
+                yield name[:-len('_shards')], self._reader_files(reader), reader
+            elif name.endswith('_analysis.astar'):
+                reader = ArchiveReader(path)
+                yield name[:-len('_analysis.astar')], self._reader_files(reader), reader
+
+    @staticmethod
+    def _reader_files(reader) -> List[Tuple[str, Callable[[], Dict], int, Optional[FileSummary]]]:
+        return [(f, partial(reader.load, f), entry['length'], reader.summary(f)) for f, entry in reader.entries.items()]
+
+    @staticmethod
+    def _new_architecture_analysis() -> Dict[str, Any]:
+        return {
             'components': set(),
-            'relationships': [],
+            'relationships': EdgeAggregator(),
             'control_flow_patterns': [],
             'data_flow_patterns': [],
             'metrics': {
                 'total_components': 0,
                 'total_relationships': 0,
+                'unique_relationships': 0,
                 'control_flow_count': 0,
                 'data_flow_count': 0
             }
         }
+
+    @staticmethod
+    def _add_file_patterns(architecture_analysis: Dict[str, Any], file_patterns: Dict[str, Any],
+                           file: Optional[str] = None) -> None:
+        """Merge the patterns of one file into an architecture analysis; file prefixes edge locations."""
+        # Update relationships
+        architecture_analysis['relationships'].merge(file_patterns['relationships'], file)
+        
+        # Update control flow patterns
+        architecture_analysis['control_flow_patterns'].extend(file_patterns['control_flow'])
+        
+        # Update data flow patterns
+        architecture_analysis['data_flow_patterns'].extend(file_patterns['data_flow'])
+        
+        # Extract components
+        for rel in file_patterns['relationships']:
+            architecture_analysis['components'].add(rel['from'])
+            architecture_analysis['components'].add(rel['to'])
+
+    def analyze_architecture(self, store=None) -> Dict[str, Any]:
+        """
+        Perform comprehensive architecture analysis.
+
+        Reads every component dump in analysis_dir (see _component_sources).
+
+        Args:
+            store: Optional AnalysisStore that also receives every file's patterns,
+                   keyed by <component>/<file> (dumps store component-relative
+                   paths), one transaction per analysis file
+        """
+        architecture_analysis = self._new_architecture_analysis()
         
         # Analyze each file
-        for analysis_file in analysis_files:
-            data = self._load_analysis_file(analysis_file)
-            for file_analysis in data.get('analysis', []):
-                if 'ast' in file_analysis:
-                    file_patterns = self.analyze_file(file_analysis['ast'])
-                    
-                    # Update relationships
-                    architecture_analysis['relationships'].extend(file_patterns['relationships'])
-                    
-                    # Update control flow patterns
-                    architecture_analysis['control_flow_patterns'].extend(file_patterns['control_flow'])
-                    
-                    # Update data flow patterns
-                    architecture_analysis['data_flow_patterns'].extend(file_patterns['data_flow'])
-                    
-                    # Extract components
-                    for rel in file_patterns['relationships']:
-                        architecture_analysis['components'].add(rel['from'])
-                        architecture_analysis['components'].add(rel['to'])
+        for component, files, reader in self._component_sources():
+            stored = []
+            for file_name, load_ast, _, summary in files:
+                if store is None and not any(self._may_match(summary, pattern_type)
+                                             for pattern_type in ('component', 'control_flow', 'data_flow')):
+                    # Nothing to find in this file; leave its record unread
+                    continue
+                ast_data = load_ast()
+                file_patterns = self.analyze_file(ast_data)
+                if store is not None:
+                    stored.append((f"{component}/{file_name}", file_patterns, ast_data))
+                self._add_file_patterns(architecture_analysis, file_patterns, f"{component}/{file_name}")
+            if stored:
+                store.store_architecture_files(stored)
+            if reader is not None:
+                reader.close()
         
+        # Unique edges with occurrence counts replace the repeated records
+        edges = architecture_analysis['relationships']
+        architecture_analysis['relationships'] = edges.edges()
+
         # Build relationship graph
         self.build_relationship_graph(architecture_analysis['relationships'])
         
         # Calculate metrics
         architecture_analysis['metrics'].update({
             'total_components': len(architecture_analysis['components']),
-            'total_relationships': len(architecture_analysis['relationships']),
+            'total_relationships': edges.occurrences,
+            'unique_relationships': len(edges),
             'control_flow_count': len(architecture_analysis['control_flow_patterns']),
             'data_flow_count': len(architecture_analysis['data_flow_patterns'])
         })
@@ -250,9 +394,261 @@ class ArchitectureAnalyzer:
         
         return architecture_analysis
 
-    def save_analysis(self, output_file: str = 'architecture_analysis.json'):
-        """Generate and save architecture analysis."""
-        analysis = self.analyze_architecture()
+    def summarize_hierarchy(self, cache_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize the architecture per component and directory, bottom-up, reusing
+        the summaries of unchanged files and directories from cache_path (see
+        MerkleSummarizer).
+
+        Files are identified by their record's SHA-256 in sharded and archived
+        dumps, so unchanged records are not read at all; records of JSON dumps
+        are hashed after loading. A file's summary counts its relationship
+        occurrences and control and data flow patterns, and lists its component
+        names and pattern kinds.
+
+        Args:
+            cache_path: JSON file memoizing summaries across runs (None recomputes everything)
+
+        Returns:
+            Dict with the root hash, the overall 'summary' and per-directory
+            'directories', whose paths start with the component name
+        """
+        loaders: Dict[str, Callable[[], Dict]] = {}
+        digests: Dict[str, str] = {}
+        readers = []
+        for component, files, reader in self._component_sources():
+            if reader is not None:
+                readers.append(reader)
+            for file_name, load_ast, _, _ in files:
+                # Dumps store component-relative paths; prefix the component
+                path = f"{component}/{file_name}"
+                loaders[path] = load_ast
+                digests[path] = (reader.entries[file_name]['sha256'] if reader is not None
+                                 else content_digest(serializer.dumps(load_ast(), compact=True)))
+
+        def summarize_file(path: str) -> Optional[Dict[str, Any]]:
+            file_patterns = self.analyze_file(loaders[path]())
+            if not file_patterns:
+                return None
+            patterns: Dict[str, int] = Counter(f"control_flow:{pattern.get('node_type')}"
+                                               for pattern in file_patterns['control_flow'])
+            patterns.update(f"data_flow:{pattern.get('direction')}" for pattern in file_patterns['data_flow'])
+            return {
+                'files': 1,
+                'counts': {
+                    'relationships': occurrence_count(file_patterns['relationships']),
+                    'control_flow': len(file_patterns['control_flow']),
+                    'data_flow': len(file_patterns['data_flow'])
+                },
+                'components': sorted({str(rel[end]) for rel in file_patterns['relationships']
+                                      for end in ('from', 'to') if rel[end] is not None}),
+                'patterns': dict(patterns)
+            }
+
+        try:
+            summarizer = MerkleSummarizer(summarize_file, cache_path, salt='architecture')
+            result = summarizer.summarize(digests)
+        finally:
+            for reader in readers:
+                reader.close()
+        result['stats'] = dict(summarizer.stats)
+        return result
+
+    def iter_approximate_architecture(self,
+                                      fractions=(0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0),
+                                      confidence: float = 0.95,
+                                      seed: Optional[int] = None,
+                                      min_per_stratum: int = 5) -> Iterator[Dict[str, Any]]:
+        """
+        Progressively refined approximate architecture analysis.
+
+        Files are sampled at random within each component (the strata). Every
+        step analyzes only the files it adds to the sample, and metrics are
+        extrapolated to all files with confidence intervals, using each stored
+        record's size as the auxiliary variable of a ratio estimator (counts
+        grow with the size of a file's AST). A final fraction of 1.0 yields the
+        exact metrics.
+
+        Only sampled records are read from sharded or archived dumps, so those
+        make the cost proportional to the sample. JSON dumps must be loaded
+        whole and dominate the runtime.
+
+        Args:
+            fractions: Increasing sample fractions, one step each
+            confidence: Confidence level of the intervals
+            seed: Random seed, for reproducible samples
+            min_per_stratum: Files sampled at least from every component (all if fewer)
+
+        Yields:
+            Architecture analysis of the files sampled so far, with estimated metrics,
+            metrics['confidence_intervals'] and a 'sampling' section
+        """
+        rng = random.Random(seed)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        strata = {}
+        readers = []
+        for component, files, reader in self._component_sources():
+            rng.shuffle(files)
+            # Each step extends the same random permutation, so every prefix is a random sample
+            strata[component] = {'files': files, 'counts': [], 'components': []}
+            if reader is not None:
+                readers.append(reader)
+
+        try:
+            yield from self._refine(strata, fractions, min_per_stratum, z, confidence)
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def _refine(self, strata: Dict[str, Dict[str, Any]], fractions, min_per_stratum: int,
+                z: float, confidence: float) -> Iterator[Dict[str, Any]]:
+        """The sampling steps of iter_approximate_architecture."""
+        architecture_analysis = self._new_architecture_analysis()
+        for fraction in fractions:
+            for component, stratum in strata.items():
+                files = stratum['files']
+                target = min(len(files), max(min_per_stratum, math.ceil(fraction * len(files))))
+                for file_name, load_ast, _, _ in files[len(stratum['counts']):target]:
+                    file_patterns = self.analyze_file(load_ast())
+                    self._add_file_patterns(architecture_analysis, file_patterns, f"{component}/{file_name}")
+                    stratum['counts'].append((occurrence_count(file_patterns['relationships']),
+                                              len(file_patterns['control_flow']),
+                                              len(file_patterns['data_flow'])))
+                    stratum['components'].append({name for rel in file_patterns['relationships']
+                                                  for name in (rel['from'], rel['to'])})
+            yield self._approximate_result(architecture_analysis, strata, z, confidence)
+
+    @staticmethod
+    def _stratified_total(strata: Dict[str, Dict[str, Any]], values: Dict[str, List[float]],
+                          z: float) -> Tuple[float, List[float]]:
+        """
+        Stratified ratio estimate of a per-file total and its confidence interval.
+
+        Within a stratum the total is the sampled values per byte of record times
+        the stratum's bytes, which reduces to the plain mean per file when all
+        sizes are equal.
+        """
+        total = 0.0
+        variance = 0.0
+        for component, stratum in strata.items():
+            files, sample = stratum['files'], values[component]
+            population, n = len(files), len(sample)
+            if n == 0:
+                continue
+            sizes = [size for _, _, size, _ in files]
+            sample_sizes = sizes[:n]
+            if sum(sample_sizes) > 0:
+                ratio = sum(sample) / sum(sample_sizes)
+                total += ratio * sum(sizes)
+            else:
+                ratio = 0.0
+                sample_sizes = [1] * n
+                total += population * sum(sample) / n
+            if 1 < n < population:
+                residual_variance = sum((value - ratio * size) ** 2
+                                        for value, size in zip(sample, sample_sizes)) / (n - 1)
+                variance += population ** 2 * (1 - n / population) * residual_variance / n
+        half_width = z * math.sqrt(variance)
+        return total, [total - half_width, total + half_width]
+
+    def _approximate_result(self, architecture_analysis: Dict[str, Any], strata: Dict[str, Dict[str, Any]],
+                            z: float, confidence: float) -> Dict[str, Any]:
+        """Snapshot of a sampled analysis with metrics extrapolated to all files."""
+        estimates = {}
+        intervals = {}
+        for index, (metric, key) in enumerate([('total_relationships', 'relationships'),
+                                               ('control_flow_count', 'control_flow_patterns'),
+                                               ('data_flow_count', 'data_flow_patterns')]):
+            values = {component: [counts[index] for counts in stratum['counts']]
+                      for component, stratum in strata.items()}
+            estimate, (low, high) = self._stratified_total(strata, values, z)
+            observed = (architecture_analysis[key].occurrences if key == 'relationships'
+                        else len(architecture_analysis[key]))
+            estimates[metric] = estimate
+            intervals[metric] = [max(low, observed), high]
+
+        # Components are counted once however many files mention them, so the total
+        # is not a sum over files: components seen in several sampled files are
+        # counted as they are, those seen in one file are extrapolated like a
+        # per-file count. Exact once every file is sampled.
+        incidence = Counter(name for stratum in strata.values()
+                            for names in stratum['components'] for name in names)
+        shared = sum(1 for count in incidence.values() if count > 1)
+        singletons = {component: [sum(1 for name in names if incidence[name] == 1)
+                                  for names in stratum['components']]
+                      for component, stratum in strata.items()}
+        estimate, (low, high) = self._stratified_total(strata, singletons, z)
+        estimates['total_components'] = shared + estimate
+        intervals['total_components'] = [max(shared + low, len(incidence)), shared + high]
+
+        files_total = sum(len(stratum['files']) for stratum in strata.values())
+        files_sampled = sum(len(stratum['counts']) for stratum in strata.values())
+        metrics = {metric: int(round(value)) for metric, value in estimates.items()}
+        metrics['confidence_intervals'] = {metric: [round(low, 1), round(high, 1)]
+                                           for metric, (low, high) in intervals.items()}
+        return {
+            'components': list(architecture_analysis['components']),
+            'relationships': architecture_analysis['relationships'].edges(),
+            'control_flow_patterns': list(architecture_analysis['control_flow_patterns']),
+            'data_flow_patterns': list(architecture_analysis['data_flow_patterns']),
+            'metrics': metrics,
+            'sampling': {
+                'exact': files_sampled == files_total,
+                'confidence': confidence,
+                'files_sampled': files_sampled,
+                'files_total': files_total,
+                'strata': {component: {'files': len(stratum['files']), 'sampled': len(stratum['counts'])}
+                           for component, stratum in strata.items()}
+            }
+        }
+
+    def analyze_architecture_approx(self,
+                                    sample_fraction: float = 0.05,
+                                    max_relative_error: Optional[float] = None,
+                                    confidence: float = 0.95,
+                                    seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Approximate architecture analysis from a stratified sample of files.
+
+        Args:
+            sample_fraction: Fraction of each component's files to analyze
+            max_relative_error: If set, keep doubling the sample until every metric's
+                                confidence interval is within this fraction of its estimate
+            confidence: Confidence level of the intervals
+            seed: Random seed, for reproducible samples
+
+        Returns:
+            Architecture analysis as from analyze_architecture, over the sampled files,
+            with estimated metrics (see iter_approximate_architecture)
+        """
+        fractions = [sample_fraction]
+        if max_relative_error is not None:
+            while fractions[-1] < 1.0:
+                fractions.append(min(1.0, fractions[-1] * 2))
+
+        analysis = None
+        for analysis in self.iter_approximate_architecture(fractions, confidence, seed):
+            metrics = analysis['metrics']
+            if max_relative_error is None or all(
+                    high - low <= 2 * max_relative_error * max(metrics[metric], 1)
+                    for metric, (low, high) in metrics['confidence_intervals'].items()):
+                break
+        self.build_relationship_graph(analysis['relationships'])
+        return analysis
+
+    def save_analysis(self, output_file: str = 'architecture_analysis.json', compact: bool = False, store=None,
+                      sample_fraction: Optional[float] = None):
+        """
+        Generate and save architecture analysis, indented unless compact is set, optionally also into a store.
+        With sample_fraction, the analysis is approximate (see analyze_architecture_approx); a store
+        needs every file and cannot be combined with sampling.
+        """
+        if sample_fraction is not None:
+            if store is not None:
+                raise ValueError("An analysis store needs the exact analysis, not a sample")
+            analysis = self.analyze_architecture_approx(sample_fraction)
+        else:
+            analysis = self.analyze_architecture(store)
         
         # Add metadata for LLM processing
         analysis['metadata'] = {
@@ -268,8 +664,7 @@ class ArchitectureAnalyzer:
         
         # Save analysis results
         output_path = os.path.join(self.analysis_dir, output_file)
-        with open(output_path, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        serializer.dump(analysis, output_path, compact)
         
         return analysis
 
@@ -277,10 +672,25 @@ class ArchitectureAnalyzer:
         """Print a human-readable summary of the analysis."""
         print("\nArchitecture Analysis Summary")
         print("=" * 50)
-        print(f"Total Components: {analysis['metrics']['total_components']}")
-        print(f"Total Relationships: {analysis['metrics']['total_relationships']}")
-        print(f"Control Flow Patterns: {analysis['metrics']['control_flow_count']}")
-        print(f"Data Flow Patterns: {analysis['metrics']['data_flow_count']}")
+        metrics = analysis['metrics']
+        intervals = metrics.get('confidence_intervals', {})
+
+        def metric(name: str) -> str:
+            if name not in intervals:
+                return str(metrics[name])
+            low, high = intervals[name]
+            return f"~{metrics[name]} ({low:.0f}-{high:.0f})"
+
+        if 'sampling' in analysis:
+            sampling = analysis['sampling']
+            print(f"Approximate: {sampling['files_sampled']} of {sampling['files_total']} files sampled, "
+                  f"{sampling['confidence']:.0%} confidence intervals")
+        print(f"Total Components: {metric('total_components')}")
+        print(f"Total Relationships: {metric('total_relationships')}")
+        if 'unique_relationships' in metrics:
+            print(f"Unique Relationships: {metric('unique_relationships')}")
+        print(f"Control Flow Patterns: {metric('control_flow_count')}")
+        print(f"Data Flow Patterns: {metric('data_flow_count')}")
         
         print("\nKey Components:")
         components = [c for c in analysis.get('components', []) if c is not None]
@@ -309,7 +719,8 @@ class ArchitectureAnalyzer:
             if isinstance(rel, dict) and rel.get('from') and rel.get('to'):
                 source = str(rel['from'])
                 target = str(rel['to'])
-                relationships[source].append(target)
+                count = rel.get('count', 1)
+                relationships[source].append(f"{target} (x{count})" if count > 1 else target)
         
         # Display top 5 components with their relationships
         for source, targets in sorted(relationships.items())[:5]:  # Show top 5
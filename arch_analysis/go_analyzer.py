@@ -1,15 +1,32 @@
 import os
-import json
+import sys
 import subprocess
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from tree_sitter import Language, Parser, Tree, Node
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ast_pruning import PruneProfile, resolve_profile, node_to_dict
+from file_policy import FilePolicy, SKIP
+from source_map import mapped_source, read_callback
+from content_dedup import ParseCache
+import compact_schema
+from ast_index import ASTIndex
+from file_summary import summarize_ast
+from skeleton import go_skeleton
+
 class GoAnalyzer:
     """A simplified analyzer focusing on Go language source code analysis."""
     
-    def __init__(self):
-        """Initialize the Go analyzer with Go language support."""
+    def __init__(self, prune_profile: Union[str, PruneProfile, None] = None, file_policy: Optional[FilePolicy] = None,
+                 dedupe: bool = False):
+        """
+        Initialize the Go analyzer with Go language support, an optional pruning profile and file policy.
+        With dedupe, identical file contents are parsed once and their AST is shared by all copies.
+        """
+        self.prune_profile = resolve_profile(prune_profile)
+        self.file_policy = file_policy
+        self.parse_cache = ParseCache() if dedupe else None
         self.parser = None
         self._setup_parser()
 
@@ -37,25 +54,55 @@ class GoAnalyzer:
             ['tree-sitter-go']
         )
 
-    def _node_to_dict(self, node: Node) -> Dict[str, Any]:
-        """Convert a tree-sitter Node to a dictionary representation."""
-        result = {
-            'type': node.type,
-            'start_point': {'row': node.start_point[0], 'column': node.start_point[1]},
-            'end_point': {'row': node.end_point[0], 'column': node.end_point[1]},
-            'children': []
-        }
+    def parse_file(self, file_path: str,
+                   prune_profile: Union[str, PruneProfile, None] = None) -> Optional[Dict[str, Any]]:
+        """Parse a memory-mapped Go source file and return its AST in JSON format (None if skipped by the policy)."""
+        file_path = Path(file_path)
+        if not file_path.exists():
+            print(f"File not found: {file_path}")
+            return None
 
-        if len(node.children) == 0:
-            result['text'] = node.text.decode('utf-8')
-        else:
-            for child in node.children:
-                result['children'].append(self._node_to_dict(child))
+        if not file_path.suffix == '.go':
+            print(f"Not a Go file: {file_path}")
+            return None
 
-        return result
+        try:
+            with mapped_source(file_path) as source:
+                profile = resolve_profile(prune_profile) if prune_profile is not None else self.prune_profile
+                action, reason = None, None
+                if self.file_policy is not None:
+                    action, reason, profile = self.file_policy.apply(file_path, len(source), source, profile)
+                    if action == SKIP:
+                        print(f"Skipping {reason} file: {file_path}")
+                        return None
+
+                cache_key = None
+                result = None
+                if self.parse_cache is not None:
+                    cache_key = self.parse_cache.key(source, file_path.suffix, profile)
+                    result = self.parse_cache.get(cache_key, file_path)
+
+                if result is None:
+                    tree = self.parser.parse(read_callback(source))
+                    ast = node_to_dict(tree.root_node, profile, 0, source)
+                    result = {
+                        'file_path': str(file_path),
+                        'language': 'go',
+                        'ast': ast,
+                        'summary': summarize_ast(ast)
+                    }
+                    if profile is not None:
+                        result['prune_profile'] = profile.name
+                    if cache_key is not None:
+                        result = self.parse_cache.put(cache_key, result)
+            return FilePolicy.annotate(result, action, reason)
+        except Exception as e:
+            print(f"Error parsing file {file_path}: {str(e)}")
+            return None
 
-    def parse_file(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Parse a Go source file and return its AST in JSON format."""
+    def parse_skeleton(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Parse a Go file into its skeleton (package, imports, types, signatures) without
+        converting the tree or walking function bodies (None if skipped by the policy)."""
         file_path = Path(file_path)
         if not file_path.exists():
             print(f"File not found: {file_path}")
@@ -66,78 +113,45 @@ class GoAnalyzer:
             return None
 
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            
-            tree = self.parser.parse(content)
-            return {
-                'file_path': str(file_path),
-                'language': 'go',
-                'ast': self._node_to_dict(tree.root_node)
-            }
+            with mapped_source(file_path) as source:
+                if self.file_policy is not None:
+                    action, reason = self.file_policy.classify(file_path, len(source), source)
+                    if action == SKIP:
+                        print(f"Skipping {reason} file: {file_path}")
+                        return None
+                tree = self.parser.parse(read_callback(source))
+                return {
+                    'file_path': str(file_path),
+                    'language': 'go',
+                    'skeleton': go_skeleton(tree.root_node, source)
+                }
         except Exception as e:
             print(f"Error parsing file {file_path}: {str(e)}")
             return None
 
-    def extract_types(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _select_declarations(self, ast: Dict[str, Any], selector: str,
+                             kind: Optional[str] = None, index: Optional[ASTIndex] = None) -> List[Dict[str, Any]]:
+        """Nodes matching a selector, as declaration entries labelled kind (the node type if None)."""
+        return [{
+            'type': kind or node['type'],
+            'location': {
+                'start': node['start_point'],
+                'end': node['end_point']
+            },
+            'details': node
+        } for node in (index or ASTIndex(ast['ast'])).select(selector)]
+
+    def extract_types(self, ast: Dict[str, Any], index: Optional[ASTIndex] = None) -> List[Dict[str, Any]]:
         """Extract type declarations from AST."""
-        types = []
-        
-        def traverse(node: Dict[str, Any]):
-            if node['type'] in ['type_declaration', 'struct_type', 'interface_type']:
-                types.append({
-                    'type': node['type'],
-                    'location': {
-                        'start': node['start_point'],
-                        'end': node['end_point']
-                    },
-                    'details': node
-                })
-            for child in node.get('children', []):
-                traverse(child)
-        
-        traverse(ast['ast'])
-        return types
+        return self._select_declarations(ast, 'type_declaration, struct_type, interface_type', None, index)
 
-    def extract_functions(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def extract_functions(self, ast: Dict[str, Any], index: Optional[ASTIndex] = None) -> List[Dict[str, Any]]:
         """Extract function declarations from AST."""
-        functions = []
-        
-        def traverse(node: Dict[str, Any]):
-            if node['type'] == 'function_declaration':
-                functions.append({
-                    'type': 'function',
-                    'location': {
-                        'start': node['start_point'],
-                        'end': node['end_point']
-                    },
-                    'details': node
-                })
-            for child in node.get('children', []):
-                traverse(child)
-        
-        traverse(ast['ast'])
-        return functions
+        return self._select_declarations(ast, 'function_declaration', 'function', index)
 
-    def extract_interfaces(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def extract_interfaces(self, ast: Dict[str, Any], index: Optional[ASTIndex] = None) -> List[Dict[str, Any]]:
         """Extract interface declarations from AST."""
-        interfaces = []
-        
-        def traverse(node: Dict[str, Any]):
-            if node['type'] == 'interface_type':
-                interfaces.append({
-                    'type': 'interface',
-                    'location': {
-                        'start': node['start_point'],
-                        'end': node['end_point']
-                    },
-                    'details': node
-                })
-            for child in node.get('children', []):
-                traverse(child)
-        
-        traverse(ast['ast'])
-        return interfaces
+        return self._select_declarations(ast, 'interface_type', 'interface', index)
 
     def analyze_file(self, file_path: str) -> Dict[str, Any]:
         """Perform comprehensive analysis of a Go file."""
@@ -145,19 +159,19 @@ class GoAnalyzer:
         if not ast_data:
             return {}
         
+        index = ASTIndex(ast_data['ast'])
         analysis = {
             'file_path': ast_data['file_path'],
-            'types': self.extract_types(ast_data),
-            'functions': self.extract_functions(ast_data),
-            'interfaces': self.extract_interfaces(ast_data)
+            'types': self.extract_types(ast_data, index),
+            'functions': self.extract_functions(ast_data, index),
+            'interfaces': self.extract_interfaces(ast_data, index)
         }
         
         return analysis
 
-    def save_analysis(self, analysis: Dict[str, Any], output_path: str) -> None:
-        """Save analysis results to JSON file."""
+    def save_analysis(self, analysis: Dict[str, Any], output_path: str, compact: bool = False) -> None:
+        """Save analysis results to JSON file, optionally in the compact schema."""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis, f, indent=2, ensure_ascii=False)
+            compact_schema.dump(analysis, output_path, compact)
         except Exception as e:
             print(f"Error saving analysis: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,13 @@
-import json
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 from collections import defaultdict
 import networkx as nx
 
+import compact_schema
+import serializer
+from edge_aggregator import EdgeAggregator
+
 class ArchitectureAnalyzer:
     """
     A general-purpose architecture simulator analyzer that extracts relationships,
@@ -60,10 +63,9 @@ class ArchitectureAnalyzer:
         self.relationship_graph = nx.DiGraph()
 
     def _load_analysis_file(self, filename: str) -> Dict:
-        """Load and parse a JSON analysis file."""
+        """Load and parse a JSON analysis file (full or compact schema)."""
         filepath = os.path.join(self.analysis_dir, filename)
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return compact_schema.load(filepath)
 
     def _extract_name(self, node: Dict) -> Optional[str]:
         """Extract name from a node."""
@@ -85,9 +87,13 @@ class ArchitectureAnalyzer:
             any(id_pattern in node_text for id_pattern in patterns['identifiers'])
         )
 
-    def _extract_relationships(self, node: Dict, parent_info: Optional[Dict] = None) -> List[Dict]:
-        """Extract relationships between architectural components."""
-        relationships = []
+    def _extract_relationships(self, node: Dict) -> List[Dict]:
+        """Extract relationships between architectural components, as unique edges with occurrence counts."""
+        edges = EdgeAggregator()
+        self._collect_relationships(node, None, edges)
+        return edges.edges()
+
+    def _collect_relationships(self, node: Dict, parent_info: Optional[Dict], edges: EdgeAggregator) -> None:
         current_info = None
         
         # Check if current node represents a component
@@ -103,18 +109,13 @@ class ArchitectureAnalyzer:
             
             # Add relationship with parent if exists
             if parent_info:
-                relationships.append({
-                    'from': parent_info['name'],
-                    'to': current_info['name'],
-                    'type': 'contains'
-                })
+                start = node.get('start_point') or {}
+                edges.add(parent_info['name'], current_info['name'], 'contains',
+                          [start.get('row'), start.get('column')])
         
         # Process children
         for child in node.get('children', []):
-            child_rels = self._extract_relationships(child, current_info or parent_info)
-            relationships.extend(child_rels)
-            
-        return relationships
+            self._collect_relationships(child, current_info or parent_info, edges)
 
     def _extract_control_flow(self, node: Dict) -> List[Dict]:
         """Extract control flow patterns."""
@@ -191,7 +192,8 @@ class ArchitectureAnalyzer:
             self.relationship_graph.add_edge(
                 rel['from'],
                 rel['to'],
-                type=rel['type']
+                type=rel['type'],
+                weight=rel.get('count', 1)
             )
 
     def analyze_architecture(self) -> Dict[str, Any]:
@@ -201,12 +203,13 @@ class ArchitectureAnalyzer:
         
         architecture_analysis = {
             'components': set(),
-            'relationships': [],
+            'relationships': EdgeAggregator(),
             'control_flow_patterns': [],
             'data_flow_patterns': [],
             'metrics': {
                 'total_components': 0,
                 'total_relationships': 0,
+                'unique_relationships': 0,
                 'control_flow_count': 0,
                 'data_flow_count': 0
             }
@@ -215,12 +218,14 @@ class ArchitectureAnalyzer:
         # Analyze each file
         for analysis_file in analysis_files:
             data = self._load_analysis_file(analysis_file)
+            component = data.get('component') or analysis_file[:-len('_analysis.json')]
             for file_analysis in data.get('analysis', []):
                 if 'ast' in file_analysis:
                     file_patterns = self.analyze_file(file_analysis['ast'])
                     
                     # Update relationships
-                    architecture_analysis['relationships'].extend(file_patterns['relationships'])
+                    architecture_analysis['relationships'].merge(file_patterns['relationships'],
+                                                                  f"{component}/{file_analysis.get('file')}")
                     
                     # Update control flow patterns
                     architecture_analysis['control_flow_patterns'].extend(file_patterns['control_flow'])
@@ -233,13 +238,18 @@ class ArchitectureAnalyzer:
                         architecture_analysis['components'].add(rel['from'])
                         architecture_analysis['components'].add(rel['to'])
         
+        # Unique edges with occurrence counts replace the repeated records
+        edges = architecture_analysis['relationships']
+        architecture_analysis['relationships'] = edges.edges()
+
         # Build relationship graph
         self.build_relationship_graph(architecture_analysis['relationships'])
         
         # Calculate metrics
         architecture_analysis['metrics'].update({
             'total_components': len(architecture_analysis['components']),
-            'total_relationships': len(architecture_analysis['relationships']),
+            'total_relationships': edges.occurrences,
+            'unique_relationships': len(edges),
             'control_flow_count': len(architecture_analysis['control_flow_patterns']),
             'data_flow_count': len(architecture_analysis['data_flow_patterns'])
         })
@@ -249,8 +259,8 @@ class ArchitectureAnalyzer:
         
         return architecture_analysis
 
-    def save_analysis(self, output_file: str = 'architecture_analysis.json'):
-        """Generate and save architecture analysis."""
+    def save_analysis(self, output_file: str = 'architecture_analysis.json', compact: bool = False):
+        """Generate and save architecture analysis, indented unless compact is set."""
         analysis = self.analyze_architecture()
         
         # Add metadata for LLM processing
@@ -267,8 +277,7 @@ class ArchitectureAnalyzer:
         
         # Save analysis results
         output_path = os.path.join(self.analysis_dir, output_file)
-        with open(output_path, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        serializer.dump(analysis, output_path, compact)
         
         return analysis
 
@@ -277,7 +286,8 @@ class ArchitectureAnalyzer:
         print("\nArchitecture Analysis Summary")
         print("=" * 50)
         print(f"Total Components: {analysis['metrics']['total_components']}")
-        print(f"Total Relationships: {analysis['metrics']['total_relationships']}")
+        print(f"Total Relationships: {analysis['metrics']['total_relationships']} "
+              f"({analysis['metrics']['unique_relationships']} unique)")
         print(f"Control Flow Patterns: {analysis['metrics']['control_flow_count']}")
         print(f"Data Flow Patterns: {analysis['metrics']['data_flow_count']}")
         
@@ -0,0 +1,281 @@
+import os
+import lzma
+import zlib
+import struct
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Deque, Iterator, Optional, Tuple, Union
+
+import serializer
+import compact_schema
+from file_summary import FileSummary, stored_summary
+
+try:
+    import zstandard
+except ImportError:  # optional: faster frames at a similar ratio
+    zstandard = None
+
+ARCHIVE_MAGIC = b'ASTARC1\0'
+FOOTER_MAGIC = b'ASTIDX1\0'
+# Footer: index offset, index length, magic
+FOOTER = struct.Struct('<QQ8s')
+
+def _zstd_compress(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+# Codec name -> (compress(data, level), decompress(data), default level)
+CODECS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes], int]] = {
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress, 6),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress, 6),
+    'zstd': (_zstd_compress, _zstd_decompress, 9)
+}
+
+def available_codecs() -> List[str]:
+    """List the codecs usable in this environment."""
+    return [name for name in CODECS if name != 'zstd' or zstandard is not None]
+
+class ArchiveWriter:
+    """
+    Writes per-file analysis records into a compressed archive. Every record is
+    compressed as its own frame, so any file can be read back without touching
+    the others. Frames are compressed on a thread pool (the codecs release the
+    GIL) and written in submission order, followed by a JSON index mapping file
+    paths to frame offsets and file summaries (see file_summary) and a
+    fixed-size footer locating the index.
+
+    Layout: magic | frame... | index | footer(index offset, index length, magic)
+    """
+
+    def __init__(self,
+                 archive_path: Union[str, Path],
+                 codec: str = 'zlib',
+                 level: Optional[int] = None,
+                 compact: bool = True,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            archive_path: Path of the archive file
+            codec: 'zlib', 'lzma' or 'zstd' (falls back to zlib without the zstandard package)
+            level: Compression level; defaults to the codec's default
+            compact: Encode records in the compact schema before compressing
+            max_workers: Compression threads (defaults to the CPU count)
+
+        Raises:
+            ValueError: If the codec is unknown
+        """
+        if codec == 'zstd' and zstandard is None:
+            # The index records the codec used, so readers need no zstandard either
+            logging.warning("zstandard is not installed; writing zlib frames instead of zstd")
+            codec, level = 'zlib', None
+        if codec not in available_codecs():
+            raise ValueError(f"Codec not available: {codec} (available: {', '.join(available_codecs())})")
+        self.archive_path = Path(archive_path)
+        self.codec = codec
+        self.compact = compact
+        self._compress, _, default_level = CODECS[codec]
+        self.level = default_level if level is None else level
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'raw_bytes': 0, 'compressed_bytes': 0}
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._pending: Deque[Tuple[str, int, str, Optional[Dict[str, Any]], Future]] = deque()
+        self._file = open(self.archive_path, 'wb')
+        self._file.write(ARCHIVE_MAGIC)
+
+    def add(self, file_path: str, record: Dict[str, Any]) -> None:
+        """
+        Queue one file's record for compression.
+
+        Args:
+            file_path: Key of the record, usually the project-relative path
+            record: Analysis record, e.g. the output of parse_file
+        """
+        summary = stored_summary(record)
+        if 'summary' in record:
+            # Kept in the index only, so readers can skip the frame without decompressing it
+            record = {key: value for key, value in record.items() if key != 'summary'}
+        if self.compact:
+            record = compact_schema.encode(record)
+        payload = serializer.dumps(record, compact=True)
+        digest = hashlib.sha256(payload).hexdigest()
+        self._pending.append((file_path, len(payload), digest, summary,
+                              self._pool.submit(self._compress, payload, self.level)))
+        # Bound the frames held in memory; the oldest frame is usually done by now
+        while len(self._pending) > 2 * self.max_workers:
+            self._write_frame()
+
+    def _write_frame(self) -> None:
+        file_path, size, digest, summary, future = self._pending.popleft()
+        frame = future.result()
+        offset = self._file.tell()
+        self._file.write(frame)
+        self.entries[file_path] = {'offset': offset, 'length': len(frame), 'size': size, 'sha256': digest}
+        if summary is not None:
+            self.entries[file_path]['summary'] = summary
+        self.stats['raw_bytes'] += size
+        self.stats['compressed_bytes'] += len(frame)
+
+    def close(self) -> None:
+        """Write the remaining frames, the index and the footer."""
+        while self._pending:
+            self._write_frame()
+        self._pool.shutdown()
+
+        index = serializer.dumps({
+            'codec': self.codec,
+            'compact': self.compact,
+            'files': self.entries
+        }, compact=True)
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(index_offset, len(index), FOOTER_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class ArchiveReader:
+    """Random access to the records of an archive written by ArchiveWriter."""
+
+    def __init__(self, archive_path: Union[str, Path], verify: bool = False):
+        """
+        Args:
+            archive_path: Path of the archive file
+            verify: Check each record's SHA-256 after decompression
+
+        Raises:
+            ValueError: If the file is not an archive or its codec is not installed
+        """
+        self.archive_path = Path(archive_path)
+        self.verify_reads = verify
+        self._file = open(self.archive_path, 'rb')
+        try:
+            if self._file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                raise ValueError(f"Not an AST archive: {archive_path}")
+            size = os.fstat(self._file.fileno()).st_size
+            if size < len(ARCHIVE_MAGIC) + FOOTER.size:
+                raise ValueError(f"Truncated AST archive: {archive_path}")
+            self._file.seek(-FOOTER.size, os.SEEK_END)
+            index_offset, index_length, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+            if magic != FOOTER_MAGIC or index_offset + index_length > size - FOOTER.size:
+                raise ValueError(f"Truncated AST archive: {archive_path}")
+            self._file.seek(index_offset)
+            index = serializer.loads(self._file.read(index_length))
+        except Exception:
+            self._file.close()
+            raise
+
+        self.codec = index['codec']
+        if self.codec not in available_codecs():
+            self._file.close()
+            raise ValueError(f"Archive codec not available: {self.codec}")
+        self.compact = index['compact']
+        self.entries: Dict[str, Dict[str, Any]] = index['files']
+        self._decompress = CODECS[self.codec][1]
+        self._lock = threading.Lock()
+
+    def files(self) -> List[str]:
+        """List the file paths stored in the archive."""
+        return list(self.entries)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.entries
+
+    def summary(self, file_path: str) -> Optional[FileSummary]:
+        """File summary of one record, read from the index (None if it has none)."""
+        return FileSummary.from_record(self.entries[file_path].get('summary'))
+
+    def _read_frame(self, entry: Dict[str, Any]) -> bytes:
+        """Compressed bytes of one frame."""
+        if hasattr(os, 'pread'):
+            frame = os.pread(self._file.fileno(), entry['length'], entry['offset'])
+        else:
+            # No pread on Windows: the shared file position is guarded instead
+            with self._lock:
+                self._file.seek(entry['offset'])
+                frame = self._file.read(entry['length'])
+        return frame
+
+    def read_raw(self, file_path: str) -> bytes:
+        """
+        Return the decompressed JSON bytes of one record.
+
+        Raises:
+            KeyError: If the path is not in the archive
+            ValueError: If verification is enabled and the record is corrupt
+        """
+        entry = self.entries[file_path]
+        payload = self._decompress(self._read_frame(entry))
+        if self.verify_reads and hashlib.sha256(payload).hexdigest() != entry['sha256']:
+            raise ValueError(f"Corrupt archive frame for {file_path}")
+        return payload
+
+    def verify(self) -> None:
+        """
+        Decompress every frame and check it against its SHA-256.
+
+        Raises:
+            ValueError: If any frame does not decompress or is corrupt
+        """
+        corrupt = []
+        for file_path, entry in self.entries.items():
+            try:
+                payload = self._decompress(self._read_frame(entry))
+            except Exception:
+                corrupt.append(file_path)
+                continue
+            if hashlib.sha256(payload).hexdigest() != entry['sha256']:
+                corrupt.append(file_path)
+        if corrupt:
+            raise ValueError(f"Corrupt archive frames in {self.archive_path}: {', '.join(corrupt)}")
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        """Load one file's record in the full schema."""
+        record = serializer.loads(self.read_raw(file_path))
+        if self.compact:
+            record = compact_schema.decode(record)
+        if 'summary' in self.entries[file_path]:
+            record['summary'] = self.entries[file_path]['summary']
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for file_path in self.entries:
+            yield self.load(file_path)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def main():
+    """Example usage: list an archive, or print one file's record."""
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python ast_archive.py <archive> [file_path]")
+        return
+
+    with ArchiveReader(sys.argv[1]) as reader:
+        if len(sys.argv) < 3:
+            for file_path in reader.files():
+                entry = reader.entries[file_path]
+                print(f"{file_path}: {entry['size']} bytes, {entry['length']} compressed ({reader.codec})")
+        else:
+            print(serializer.dumps(reader.load(sys.argv[2])).decode('utf-8'))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+class SelectorError(ValueError):
+    """Raised for a selector that does not parse."""
+
+class ASTIndex:
+    """
+    Index over a dict AST (as produced by ast_pruning.node_to_dict), built in one pass.
+
+    Nodes are numbered in pre-order, so the descendants of a node occupy the
+    positions up to its subtree end, and per-type position lists are sorted.
+    Queries then cost a lookup plus the number of matches rather than a walk
+    of the whole tree, and can be scoped to any subtree by bisection.
+
+    The index is a snapshot: the tree must not be mutated while it is in use.
+    Callers that query one tree several times build the index once and pass
+    it along, so it lives exactly as long as their analysis of that tree.
+    """
+
+    def __init__(self, root: Dict):
+        self.root = root
+        self.nodes: List[Dict] = []
+        self.parents: List[int] = []
+        self.ends: List[int] = []
+        self.by_type: Dict[str, List[int]] = {}
+        self.by_text: Dict[str, List[int]] = {}
+        self._positions: Dict[int, int] = {}
+
+        # Local binds: this loop visits every node of the tree
+        nodes, parents, ends = self.nodes, self.parents, self.ends
+        by_type, by_text, positions = self.by_type, self.by_text, self._positions
+        stack: List[Tuple[Dict, int]] = [(root, -1)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node, parent = pop()
+            if node is None:
+                # Subtree end marker of the node at position parent
+                ends[parent] = len(nodes)
+                continue
+            position = len(nodes)
+            nodes.append(node)
+            parents.append(parent)
+            ends.append(position + 1)
+            positions[id(node)] = position
+            found = by_type.get(node['type'])
+            if found is None:
+                by_type[node['type']] = [position]
+            else:
+                found.append(position)
+            text = node.get('text')
+            if text is not None:
+                found = by_text.get(text)
+                if found is None:
+                    by_text[text] = [position]
+                else:
+                    found.append(position)
+            children = node.get('children')
+            if children:
+                push((None, position))
+                for child in reversed(children):
+                    push((child, position))
+
+    def position(self, node: Dict) -> int:
+        """Pre-order position of a node of this tree."""
+        return self._positions[id(node)]
+
+    def parent(self, node: Dict) -> Optional[Dict]:
+        parent = self.parents[self.position(node)]
+        return self.nodes[parent] if parent >= 0 else None
+
+    def ancestor_positions(self, position: int) -> Iterable[int]:
+        """Positions of the ancestors of a node, nearest first."""
+        position = self.parents[position]
+        while position >= 0:
+            yield position
+            position = self.parents[position]
+
+    def closest(self, node: Dict, types: Iterable[str]) -> Optional[Dict]:
+        """Nearest ancestor of a node whose type is one of types."""
+        types = frozenset(types)
+        for position in self.ancestor_positions(self.position(node)):
+            if self.nodes[position]['type'] in types:
+                return self.nodes[position]
+        return None
+
+    def scope(self, within: Optional[Dict] = None) -> Tuple[int, int]:
+        """Position range of the strict descendants of within (the whole tree if None)."""
+        if within is None:
+            return 0, len(self.nodes)
+        position = self.position(within)
+        return position + 1, self.ends[position]
+
+    def of_type(self, node_type: str, within: Optional[Dict] = None) -> List[int]:
+        """Positions of the nodes of one type, in document order."""
+        positions = self.by_type.get(node_type, [])
+        if within is None:
+            return positions
+        start, end = self.scope(within)
+        return positions[bisect_left(positions, start):bisect_left(positions, end)]
+
+    def select_positions(self, selector: str, within: Optional[Dict] = None) -> List[int]:
+        """Positions of the nodes matching a selector (see compile_selector), in document order."""
+        return compile_selector(selector).positions(self, self.scope(within))
+
+    def select(self, selector: str, within: Optional[Dict] = None) -> List[Dict]:
+        """
+        Nodes matching a selector, in document order.
+
+        Args:
+            selector: Selector, e.g. 'method_declaration > field_identifier[text^="Get"]'
+            within: Only match strict descendants of this node
+
+        Raises:
+            SelectorError: If the selector does not parse
+        """
+        return [self.nodes[position] for position in self.select_positions(selector, within)]
+
+# Text predicate operators other than ~= (regex search): equal, contains, prefix, suffix
+_TEXT_OPERATORS: Dict[str, Callable[[str, str], bool]] = {
+    '=': lambda text, value: text == value,
+    '*=': lambda text, value: value in text,
+    '^=': lambda text, value: text.startswith(value),
+    '$=': lambda text, value: text.endswith(value)
+}
+
+_SPACE = re.compile(r'\s+')
+_TOKEN = re.compile(r'''
+    (?:
+      (?P<comma>,)
+    | (?P<child>>)
+    | (?P<type>\*|[A-Za-z_][A-Za-z0-9_]*)
+    | \[\s*text\s*(?:(?P<op>[*^$~]?=)\s*"(?P<value>(?:[^"\\]|\\.)*)"\s*(?P<flag>i)?\s*)?\]
+    )''', re.VERBOSE)
+
+class _TextPredicate:
+    def __init__(self, operator: Optional[str], value: str, ignore_case: bool):
+        self.operator = operator
+        self.ignore_case = ignore_case
+        if operator == '~=':
+            pattern = re.compile(value, re.IGNORECASE if ignore_case else 0)
+            self.test = lambda text: pattern.search(text) is not None
+        elif operator is not None:
+            compare = _TEXT_OPERATORS[operator]
+            value = value.lower() if ignore_case else value
+            self.test = ((lambda text: compare(text.lower(), value)) if ignore_case
+                         else (lambda text: compare(text, value)))
+        self.value = value
+
+    def matches(self, node: Dict) -> bool:
+        text = node.get('text')
+        return text is not None and (self.operator is None or self.test(text))
+
+class _Compound:
+    """One step of a selector: an optional type and text predicates."""
+
+    def __init__(self):
+        self.node_type: Optional[str] = None
+        self.predicates: List[_TextPredicate] = []
+
+    def matches(self, node: Dict) -> bool:
+        return ((self.node_type is None or node['type'] == self.node_type) and
+                all(predicate.matches(node) for predicate in self.predicates))
+
+    def candidates(self, index: ASTIndex, start: int, end: int) -> List[int]:
+        """Smallest indexed position list that contains every match, restricted to [start, end)."""
+        exact = next((predicate for predicate in self.predicates
+                      if predicate.operator == '=' and not predicate.ignore_case), None)
+        if exact is not None:
+            # An exact text is one lookup, and usually rarer than any type
+            positions = index.by_text.get(exact.value, [])
+            if self.node_type is not None and len(index.by_type.get(self.node_type, [])) < len(positions):
+                positions = index.by_type[self.node_type]
+        elif self.node_type is not None:
+            positions = index.by_type.get(self.node_type, [])
+        elif self.predicates:
+            # Other text predicates scan the distinct texts, not the nodes
+            predicate = self.predicates[0]
+            positions = sorted(position for text, found in index.by_text.items()
+                               if predicate.matches({'text': text}) for position in found)
+        else:
+            return list(range(start, end))
+        if start == 0 and end == len(index.nodes):
+            return positions
+        return positions[bisect_left(positions, start):bisect_left(positions, end)]
+
+class Selector:
+    """
+    A compiled selector: comma-separated groups of compounds joined by
+    combinators, matched right to left from the index of the last compound.
+    """
+
+    def __init__(self, groups: List[List[Tuple[Optional[str], _Compound]]]):
+        self.groups = groups
+
+    def _matches_chain(self, index: ASTIndex, position: int, group, step: int) -> bool:
+        """Check the compounds left of step against the ancestors of position."""
+        if step == 0:
+            return True
+        combinator, _ = group[step]
+        _, compound = group[step - 1]
+        if combinator == '>':
+            parent = index.parents[position]
+            return (parent >= 0 and compound.matches(index.nodes[parent]) and
+                    self._matches_chain(index, parent, group, step - 1))
+        return any(compound.matches(index.nodes[ancestor]) and
+                   self._matches_chain(index, ancestor, group, step - 1)
+                   for ancestor in index.ancestor_positions(position))
+
+    def positions(self, index: ASTIndex, scope: Tuple[int, int]) -> List[int]:
+        start, end = scope
+        found = set()
+        for group in self.groups:
+            _, last = group[-1]
+            last_step = len(group) - 1
+            for position in last.candidates(index, start, end):
+                if last.matches(index.nodes[position]) and self._matches_chain(index, position, group, last_step):
+                    found.add(position)
+        return sorted(found)
+
+def quote_value(value: str) -> str:
+    """Escape the quotes of a text predicate value, e.g. a re.escape'd pattern, for a selector string."""
+    return value.replace('"', '\\"')
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Selector:
+    """
+    Compile a selector.
+
+    Grammar, in the spirit of CSS:
+      type or *                 node type (any type)
+      [text]                    node has text (leaves)
+      [text="v"]                text equals v; also *= contains, ^= prefix, $= suffix, ~= regex
+                                (\" is a literal quote; other backslashes are kept for regexes)
+      [text*="v" i]             case-insensitive comparison
+      a > b                     b is a child of a
+      a b                       b is a descendant of a
+      s1, s2                    union
+
+    Raises:
+        SelectorError: If the selector does not parse
+    """
+    groups: List[List[Tuple[Optional[str], _Compound]]] = []
+    group: List[Tuple[Optional[str], _Compound]] = []
+    compound: Optional[_Compound] = None
+    combinator: Optional[str] = None
+    after_space = False
+    position = 0
+
+    def close_compound():
+        nonlocal compound, combinator
+        if compound is not None:
+            group.append((combinator, compound))
+            # Compounds separated by nothing but whitespace are joined by the descendant combinator
+            compound, combinator = None, ' '
+
+    while position < len(selector):
+        space = _SPACE.match(selector, position)
+        if space:
+            position, after_space = space.end(), True
+            continue
+        match = _TOKEN.match(selector, position)
+        if not match:
+            raise SelectorError(f"Invalid selector at {position}: {selector!r}")
+        if match.group('comma'):
+            close_compound()
+            if not group:
+                raise SelectorError(f"Empty selector group in {selector!r}")
+            groups.append(group)
+            group, combinator = [], None
+        elif match.group('child'):
+            close_compound()
+            if not group:
+                raise SelectorError(f"Combinator without a left side in {selector!r}")
+            combinator = '>'
+        elif match.group('type'):
+            if compound is not None:
+                if not after_space:
+                    raise SelectorError(f"Type must start a compound at {position}: {selector!r}")
+                close_compound()
+            compound = _Compound()
+            if match.group('type') != '*':
+                compound.node_type = match.group('type')
+        else:
+            if compound is not None and after_space:
+                close_compound()
+            if compound is None:
+                compound = _Compound()
+            value = match.group('value')
+            value = value.replace('\\"', '"') if value is not None else ''
+            compound.predicates.append(_TextPredicate(match.group('op'), value, bool(match.group('flag'))))
+        after_space = False
+        position = match.end()
+
+    close_compound()
+    if not group or combinator == '>':
+        raise SelectorError(f"Incomplete selector: {selector!r}")
+    groups.append(group)
+    return Selector(groups)
@@ -0,0 +1,168 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from source_map import node_text
+
+KEEP = 'keep'
+SPLICE = 'splice'
+DROP = 'drop'
+
+class PruneProfile:
+    """
+    Rules applied while a tree-sitter tree is converted to its dict form.
+    Pruned nodes are never materialized, so conversion time and output size
+    shrink together.
+    """
+
+    def __init__(self,
+                 name: str = 'custom',
+                 named_only: bool = False,
+                 node_types: Optional[Iterable[str]] = None,
+                 max_depth: Optional[int] = None,
+                 drop_comments: bool = False,
+                 skip_types: Optional[Iterable[str]] = None):
+        """
+        Args:
+            name: Profile name, recorded in the parse output
+            named_only: Drop anonymous nodes such as punctuation and keywords
+            node_types: Allowlist of node types to keep; nodes of other types are
+                        removed and their kept descendants are spliced into the parent
+            max_depth: Maximum depth below the root (root is depth 0)
+            drop_comments: Drop comment nodes
+            skip_types: Node types whose whole subtree is dropped (e.g. function bodies)
+        """
+        self.name = name
+        self.named_only = named_only
+        self.node_types = frozenset(node_types) if node_types is not None else None
+        self.max_depth = max_depth
+        self.drop_comments = drop_comments
+        self.skip_types = frozenset(skip_types or ())
+
+    def classify(self, node) -> str:
+        """Decide whether a node is kept, dropped, or replaced by its kept descendants."""
+        if self.named_only and not node.is_named:
+            return DROP
+        if (self.drop_comments and node.type == 'comment') or node.type in self.skip_types:
+            return DROP
+        if self.node_types is not None and node.type not in self.node_types:
+            return SPLICE if node.child_count else DROP
+        return KEEP
+
+    def allows_depth(self, depth: int) -> bool:
+        """Check whether nodes at the given depth are converted."""
+        return self.max_depth is None or depth <= self.max_depth
+
+    def __repr__(self) -> str:
+        return f"PruneProfile({self.name!r})"
+
+# Declarations and the identifiers that name them, enough for structural analyses
+DECLARATION_NODE_TYPES = [
+    'source_file', 'translation_unit', 'module',
+    'package_clause', 'package_identifier', 'import_declaration', 'import_spec',
+    'interpreted_string_literal',
+    'type_declaration', 'type_spec', 'struct_type', 'interface_type',
+    'field_declaration_list', 'field_declaration', 'method_spec', 'method_elem',
+    'function_declaration', 'method_declaration', 'parameter_list', 'parameter_declaration',
+    'class_declaration', 'class_definition', 'class_specifier', 'function_definition',
+    'identifier', 'field_identifier', 'type_identifier', 'qualified_type', 'pointer_type'
+]
+
+PRUNE_PROFILES: Dict[str, Optional[PruneProfile]] = {
+    'full': None,
+    'named': PruneProfile('named', named_only=True),
+    'no_comments': PruneProfile('no_comments', drop_comments=True),
+    'named_no_comments': PruneProfile('named_no_comments', named_only=True, drop_comments=True),
+    'declarations': PruneProfile('declarations', node_types=DECLARATION_NODE_TYPES, drop_comments=True,
+                                 skip_types=['block', 'compound_statement']),
+    'outline': PruneProfile('outline', named_only=True, drop_comments=True, max_depth=3)
+}
+
+def node_to_dict(node,
+                 profile: Optional[PruneProfile] = None,
+                 depth: int = 0,
+                 source=None,
+                 deadline=None) -> Dict[str, Any]:
+    """
+    Convert a tree-sitter node to its dict form, applying a pruning profile.
+
+    Args:
+        node: Tree-sitter node
+        profile: Pruning rules applied while converting; None converts everything
+        depth: Depth of the node below the root
+        source: Source buffer the tree was parsed from; node texts are sliced from it
+                (trees parsed through a read callback carry no text of their own)
+        deadline: parse_budget.Deadline checked while converting, if any
+
+    Returns:
+        Dict with the node type, start and end points, children and leaf text
+    """
+    start_row, start_column = node.start_point
+    end_row, end_column = node.end_point
+    children: List[Any] = []
+    result = {
+        'type': node.type,
+        'start_point': {'row': start_row, 'column': start_column},
+        'end_point': {'row': end_row, 'column': end_column},
+        'children': children
+    }
+
+    if not node.child_count:
+        result['text'] = (source[node.start_byte:node.end_byte] if source is not None else node.text).decode('utf-8')
+        return result
+    # Leaves are cheap and bounded by their parent, so only internal nodes count against the deadline
+    if deadline is not None:
+        deadline.check()
+    if profile is None:
+        for child in node.children:
+            children.append(node_to_dict(child, None, 0, source, deadline))
+    else:
+        append_pruned_children(children, node, profile, depth + 1, source, deadline)
+        # Nodes whose only children were pruned (e.g. string literals) keep their text
+        if not children and node.named_child_count == 0:
+            result['text'] = node_text(node, source) if source is not None else node.text.decode('utf-8')
+
+    return result
+
+def append_pruned_children(children: List[Any],
+                           node,
+                           profile: PruneProfile,
+                           depth: int,
+                           source=None,
+                           deadline=None,
+                           convert: Optional[Callable[..., Any]] = None) -> None:
+    """
+    Convert the children of a node that survive the pruning profile, splicing the
+    kept descendants of SPLICE children in their place.
+
+    Args:
+        children: List receiving the converted children
+        node: Tree-sitter node whose children are converted
+        profile: Pruning rules
+        depth: Depth of the children below the root
+        source: Source buffer the tree was parsed from
+        deadline: parse_budget.Deadline checked while converting, if any
+        convert: Converter called as convert(child, profile, depth, source, deadline);
+                 node_to_dict by default
+    """
+    if not profile.allows_depth(depth):
+        return
+    convert = convert or node_to_dict
+    # Anonymous children are never materialized when the profile drops them anyway
+    for child in (node.named_children if profile.named_only else node.children):
+        action = profile.classify(child)
+        if action == KEEP:
+            children.append(convert(child, profile, depth, source, deadline))
+        elif action == SPLICE:
+            append_pruned_children(children, child, profile, depth, source, deadline, convert)
+
+def resolve_profile(profile: Union[str, PruneProfile, None]) -> Optional[PruneProfile]:
+    """
+    Resolve a profile name or instance. None and 'full' mean no pruning.
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    if profile is None or isinstance(profile, PruneProfile):
+        return profile
+    if profile not in PRUNE_PROFILES:
+        raise ValueError(f"Unknown prune profile: {profile} (choose from {', '.join(PRUNE_PROFILES)})")
+    return PRUNE_PROFILES[profile]
@@ -0,0 +1,363 @@
+import os
+import time
+import signal
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Optional, Tuple
+
+from cgra_analyzer import CGRAAnalyzer
+from file_policy import FilePolicy
+from parse_budget import ParseBudget, ParseTimeout, TIMEOUT, degraded_result
+from file_discovery import FileDiscovery
+from content_dedup import content_digest
+from source_map import mapped_source
+import serializer
+
+# Analyzer owned by each pool worker, created once by _init_worker
+_worker_analyzer: Optional[CGRAAnalyzer] = None
+# Wall time a worker may spend on one file before its watchdog fires; None disables it
+_watchdog_seconds: Optional[float] = None
+# Set only while a task runs, so a late alarm cannot hit the pool's own code
+_watchdog_armed = False
+
+def _watchdog_fired(signum, frame) -> None:
+    if _watchdog_armed:
+        raise ParseTimeout(TIMEOUT, f"worker watchdog fired after {_watchdog_seconds}s")
+
+def _init_worker(prune_profile: Optional[str],
+                 file_policy: Optional[FilePolicy],
+                 parse_budget: Optional[ParseBudget] = None,
+                 watchdog_seconds: Optional[float] = None) -> None:
+    """Warm up a pool worker: build its parsers once for all the files it will see."""
+    global _worker_analyzer, _watchdog_seconds
+    _worker_analyzer = CGRAAnalyzer(prune_profile, file_policy, parse_budget=parse_budget)
+    # SIGALRM is POSIX only; elsewhere the parse budget is the only limit
+    if watchdog_seconds and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _watchdog_fired)
+        _watchdog_seconds = watchdog_seconds
+
+def _analyze_file_task(repo_name: str, repo_path: str, file_path: str) -> Tuple[str, str, Optional[Dict], Optional[str]]:
+    """
+    Analyze one file in a pool worker. Errors are returned, never raised, so one file cannot fail a batch.
+
+    The parse budget bounds parsing; the watchdog also bounds the analysis of the
+    parsed tree. A file stopped by the watchdog gets an empty, degraded analysis.
+    """
+    global _watchdog_armed
+    try:
+        if _watchdog_seconds:
+            _watchdog_armed = True
+            signal.setitimer(signal.ITIMER_REAL, _watchdog_seconds)
+        try:
+            return repo_name, file_path, _worker_analyzer.analyze_cgra_file(file_path, repo_path), None
+        finally:
+            _watchdog_armed = False
+            if _watchdog_seconds:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except ParseTimeout as e:
+        language = _worker_analyzer.languages.get(os.path.splitext(file_path)[1], 'unknown')
+        degraded = degraded_result(file_path, language, e)
+        return repo_name, file_path, _worker_analyzer.analyze_cgra_ast(degraded, os.path.relpath(file_path, repo_path)), None
+    except Exception as e:
+        return repo_name, file_path, None, f"{type(e).__name__}: {str(e)}"
+
+def content_key(file_path: str, file_policy: Optional[FilePolicy]) -> Tuple:
+    """
+    Group key of a file: its content digest and extension, plus the file policy
+    action, since identical content may be skipped at one path and parsed at another.
+    """
+    with mapped_source(file_path) as source:
+        action = None
+        if file_policy is not None:
+            action, _ = file_policy.classify(file_path, len(source), source)
+        return content_digest(source), os.path.splitext(file_path)[1], action
+
+def _content_key_task(file_path: str) -> Any:
+    """Content key of one file, computed in a pool worker; unreadable files key by their path."""
+    try:
+        return content_key(file_path, _worker_analyzer.file_policy)
+    except OSError:
+        return file_path
+
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """
+    Load a batch manifest.
+
+    The manifest is JSON: either a list of {"name": ..., "path": ...} entries, an
+    object with a "repositories" list of such entries, or an object mapping names
+    to paths. Relative paths are resolved against the manifest's directory.
+
+    Args:
+        manifest_path: Path to the manifest file
+
+    Returns:
+        List of repositories with 'name' and absolute 'path'
+    """
+    manifest = serializer.load(manifest_path)
+
+    if isinstance(manifest, dict) and 'repositories' in manifest:
+        entries = manifest['repositories']
+    elif isinstance(manifest, dict):
+        entries = [{'name': name, 'path': path} for name, path in manifest.items()]
+    else:
+        entries = manifest
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    repositories = []
+    for entry in entries:
+        path = os.path.join(base_dir, entry['path'])
+        repositories.append({
+            'name': entry.get('name') or os.path.basename(os.path.normpath(path)),
+            'path': os.path.abspath(path)
+        })
+    return repositories
+
+class BatchAnalyzer:
+    """
+    Analyzes a fleet of simulator repositories with one shared, warm worker pool.
+
+    Files from all repositories are scheduled together, largest first, so every
+    worker stays busy until the whole fleet is done. Identical files (vendored
+    copies, forks) are analyzed once and the result is fanned out to every path.
+    Results are written as one shard per repository, and a failure in one
+    repository never affects another.
+    """
+
+    def __init__(self,
+                 output_dir: str,
+                 max_workers: Optional[int] = None,
+                 prune_profile: Optional[str] = None,
+                 extensions: Tuple[str, ...] = ('.go',),
+                 file_policy: Optional[FilePolicy] = None,
+                 walk_workers: int = 1,
+                 dedupe: bool = True,
+                 parse_budget: Optional[ParseBudget] = None,
+                 watchdog_seconds: Optional[float] = None):
+        """
+        Args:
+            output_dir: Directory receiving one subdirectory per repository
+            max_workers: Size of the worker pool (defaults to the CPU count)
+            prune_profile: AST pruning profile used by every worker
+            extensions: Source file extensions to analyze
+            file_policy: Policy for generated, vendored and oversized files, applied in every worker
+            walk_workers: Threads walking each repository during discovery
+            dedupe: Analyze each distinct file content once across the whole fleet
+            parse_budget: Per-file size and time limits applied in every worker
+            watchdog_seconds: Hard per-file limit enforced with SIGALRM in every worker,
+                              covering analysis as well as parsing; None disables it
+        """
+        self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.prune_profile = prune_profile
+        self.extensions = extensions
+        self.file_policy = file_policy
+        self.discovery = FileDiscovery(extensions, max_workers=walk_workers)
+        self.dedupe = dedupe
+        self.parse_budget = parse_budget
+        self.watchdog_seconds = watchdog_seconds
+
+    def _discover(self, repo_path: str) -> List[str]:
+        """List the source files of a repository, honoring its .gitignore files."""
+        return self.discovery.discover(repo_path)
+
+    def _write_shard(self, repo: Dict[str, Any], file_results: List[Dict[str, Any]]) -> str:
+        """Assemble a repository's file results into a project analysis and write its shard."""
+        project_analysis = CGRAAnalyzer.new_project_analysis()
+        for file_analysis in sorted(file_results, key=lambda r: r['file']):
+            CGRAAnalyzer.merge_file_analysis(project_analysis, file_analysis)
+        CGRAAnalyzer.link_dataflow(project_analysis)
+
+        shard_dir = os.path.join(self.output_dir, repo['name'])
+        os.makedirs(shard_dir, exist_ok=True)
+        shard_path = os.path.join(shard_dir, 'project_analysis.json')
+        serializer.dump(project_analysis, shard_path)
+        return shard_path
+
+    def run(self, repositories: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Analyze all repositories.
+
+        Args:
+            repositories: Entries with 'name' and 'path', e.g. from load_manifest
+
+        Returns:
+            Batch report with per-repository status, counts, errors and shard paths
+
+        Raises:
+            ValueError: If two repositories share a name, since each name owns a shard directory
+        """
+        names = [repo['name'] for repo in repositories]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            # Each name owns a shard directory, so duplicates would overwrite each other's results
+            raise ValueError(f"Duplicate repository names: {', '.join(duplicates)}")
+
+        started = time.time()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        report = {'repositories': {}, 'total_files': 0, 'failed_repositories': 0}
+        pending: Dict[str, int] = {}
+        file_results: Dict[str, List[Dict[str, Any]]] = {}
+        # Every discovered file as (size, repository name, repository path, file path)
+        files: List[Tuple[int, str, str, str]] = []
+
+        for repo in repositories:
+            status = {'path': repo['path'], 'status': 'ok', 'files_analyzed': 0, 'degraded_files': 0, 'errors': []}
+            report['repositories'][repo['name']] = status
+            if not os.path.isdir(repo['path']):
+                status['status'] = 'failed'
+                status['errors'].append(f"Repository not found: {repo['path']}")
+                continue
+            try:
+                repo_files = self._discover(repo['path'])
+            except Exception as e:
+                status['status'] = 'failed'
+                status['errors'].append(f"Discovery failed: {type(e).__name__}: {str(e)}")
+                continue
+            pending[repo['name']] = len(repo_files)
+            file_results[repo['name']] = []
+            for file_path in repo_files:
+                try:
+                    size = os.path.getsize(file_path)
+                except OSError:
+                    size = 0
+                files.append((size, repo['name'], repo['path'], file_path))
+
+        # Largest files first across all repositories, so no worker idles at the tail
+        files.sort(key=lambda entry: entry[0], reverse=True)
+        repos_by_name = {repo['name']: repo for repo in repositories}
+
+        def finish_repo(name: str) -> None:
+            status = report['repositories'][name]
+            try:
+                status['shard'] = self._write_shard(repos_by_name[name], file_results.pop(name))
+            except Exception as e:
+                status['status'] = 'failed'
+                status['errors'].append(f"Writing shard failed: {str(e)}")
+            if status['errors'] and status['status'] == 'ok':
+                status['status'] = 'partial'
+
+        def deliver(copy: Tuple[str, str, str], result: Optional[Dict], error: Optional[str], first: bool) -> None:
+            name, path, file_path = copy
+            status = report['repositories'][name]
+            if result:
+                file_results[name].append(result if first else
+                                          CGRAAnalyzer.rewrite_file_analysis(result, os.path.relpath(file_path, path)))
+                status['files_analyzed'] += 1
+                if 'degraded' in result:
+                    status['degraded_files'] += 1
+            elif error:
+                status['errors'].append(f"{os.path.relpath(file_path, path)}: {error}")
+            pending[name] -= 1
+            if pending[name] == 0:
+                finish_repo(name)
+
+        for name, count in list(pending.items()):
+            if count == 0:
+                finish_repo(name)
+
+        # Copies of one content: (repository name, repository path, file path), representative first
+        groups: Dict[Any, List[Tuple[str, str, str]]] = {}
+        # Outcome of each analyzed group, for copies whose content key arrives after it
+        outcomes: Dict[Any, Tuple[Optional[Dict], Optional[str]]] = {}
+        if files:
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     initializer=_init_worker,
+                                     initargs=(self.prune_profile, self.file_policy,
+                                               self.parse_budget, self.watchdog_seconds)) as pool:
+                # Each future maps to ('key', copy) or ('analyze', group key)
+                futures: Dict[Any, Tuple[str, Any]] = {}
+
+                def add_copy(key: Any, copy: Tuple[str, str, str]) -> None:
+                    if key in groups:
+                        groups[key].append(copy)
+                        if key in outcomes:
+                            deliver(copy, *outcomes[key], False)
+                    else:
+                        groups[key] = [copy]
+                        futures[pool.submit(_analyze_file_task, *copy)] = ('analyze', key)
+
+                # Content keys are hashed by the workers too, in size order, so the analysis
+                # of each new content is submitted as soon as its key is known
+                for _, name, path, file_path in files:
+                    if self.dedupe:
+                        futures[pool.submit(_content_key_task, file_path)] = ('key', (name, path, file_path))
+                    else:
+                        add_copy(file_path, (name, path, file_path))
+
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, value = futures.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            # A crashed worker takes its task down with it; the pool reports it here
+                            logging.error(f"Worker failure: {str(e)}")
+                            continue
+                        if kind == 'key':
+                            add_copy(outcome, value)
+                            continue
+                        _, _, result, error = outcome
+                        outcomes[value] = (result, error)
+                        for index, copy in enumerate(groups[value]):
+                            deliver(copy, result, error, index == 0)
+
+            # Repositories whose tasks were lost to a broken pool still get their partial shard
+            for name in [n for n, count in pending.items() if count > 0]:
+                report['repositories'][name]['errors'].append(f"{pending[name]} files were not analyzed")
+                finish_repo(name)
+        report['duplicate_files'] = sum(len(copies) - 1 for copies in groups.values())
+
+        for status in report['repositories'].values():
+            report['total_files'] += status['files_analyzed']
+            if status['status'] == 'failed':
+                report['failed_repositories'] += 1
+        report['elapsed_seconds'] = round(time.time() - started, 3)
+
+        serializer.dump(report, os.path.join(self.output_dir, 'batch_report.json'))
+        return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyze a fleet of simulator repositories")
+    parser.add_argument('manifest', help="JSON manifest listing repositories")
+    parser.add_argument('--output-dir', default='batch_results', help="Directory for per-repository shards")
+    parser.add_argument('--workers', type=int, help="Worker pool size (defaults to the CPU count)")
+    parser.add_argument('--profile', help="AST pruning profile, e.g. named")
+    parser.add_argument('--walk-workers', type=int, default=1,
+                        help="Threads walking each repository during file discovery")
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help="Analyze identical files separately instead of once per content")
+    parser.add_argument('--file-timeout', type=float, default=30.0,
+                        help="Seconds allowed for parsing one file (the worker watchdog allows twice that "
+                             "for its whole analysis); 0 disables both")
+    parser.add_argument('--parse-all', action='store_true',
+                        help="Parse generated, mock, vendored and oversized files like any other file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    timeout = args.file_timeout or None
+    batch = BatchAnalyzer(args.output_dir, args.workers, args.profile,
+                          file_policy=None if args.parse_all else FilePolicy(),
+                          walk_workers=args.walk_workers, dedupe=not args.no_dedupe,
+                          parse_budget=ParseBudget(max_seconds=timeout) if timeout else None,
+                          watchdog_seconds=2 * timeout if timeout else None)
+    try:
+        report = batch.run(load_manifest(args.manifest))
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
+
+    print("\nBatch Analysis Summary")
+    print("=" * 50)
+    for name, status in report['repositories'].items():
+        print(f"- {name}: {status['status']}, {status['files_analyzed']} files "
+              f"({status['degraded_files']} degraded), {len(status['errors'])} errors")
+    print(f"Total files analyzed: {report['total_files']} ({report['duplicate_files']} duplicates reused) "
+          f"in {report['elapsed_seconds']}s")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,12 +1,30 @@
 import os
-import json
-from typing import Dict, List, Any, Optional, Set
+import re
+import logging
+from typing import Dict, List, Any, Optional, Set, Union
 import sys
 from pathlib import Path
 
 # Import base analyzer
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from code_analyzer import TreeSitterAnalyzer
+import serializer
+from ast_pruning import PruneProfile, resolve_profile
+from file_policy import FilePolicy
+from parse_budget import ParseBudget
+from file_discovery import FileDiscovery
+from channel_linker import ChannelLinker
+from ast_index import ASTIndex, quote_value
+from file_summary import record_summary
+from merkle_summary import MerkleSummarizer
+from grid_topology import GridTopology, GridTopologyExtractor
+
+# Node types opening a function scope for channel resolution
+FUNCTION_TYPES = frozenset(['function_declaration', 'method_declaration'])
+# Nested functions whose declarations do not belong to the enclosing scope
+NESTED_FUNCTION_TYPES = frozenset(['func_literal', 'function_declaration', 'method_declaration'])
+# Node types of channel operations; '<-' is the operator token of receive expressions
+CHANNEL_OPERATION_TYPES = frozenset(['send_statement', 'receive_statement', '<-'])
 
 class CGRAAnalyzer(TreeSitterAnalyzer):
     """
@@ -14,8 +32,10 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
     to understand CGRA architectural patterns and relationships.
     """
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, prune_profile: Union[str, PruneProfile, None] = None, file_policy: Optional[FilePolicy] = None,
+                 dedupe: bool = False, parse_budget: Optional[ParseBudget] = None):
+        super().__init__(prune_profile=prune_profile, file_policy=file_policy, dedupe=dedupe,
+                         parse_budget=parse_budget)
         # CGRA-specific component patterns
         self.cgra_patterns = {
             'processing_elements': [
@@ -47,6 +67,10 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
                 'Setting'
             ]
         }
+        # Every node whose text mentions a pattern, as one index query; patterns are literal text
+        self._component_texts = [pattern.lower() for patterns in self.cgra_patterns.values() for pattern in patterns]
+        self._component_selector = '[text~="{}" i]'.format(
+            quote_value('|'.join(re.escape(text) for text in self._component_texts)))
 
     def _identify_component_type(self, node_dict: Dict) -> Optional[str]:
         """Identify CGRA component type from node name and structure."""
@@ -146,12 +170,13 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
                 receiver['type'] = child.get('text', '')
         return receiver
 
-    def analyze_cgra_components(self, ast_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_cgra_components(self, ast_data: Dict[str, Any], index: Optional[ASTIndex] = None) -> Dict[str, Any]:
         """
         Analyze CGRA components from AST data.
         
         Args:
             ast_data: AST data from parse_file or parse_directory
+            index: Index of ast_data['ast'] shared with other passes over the same tree
             
         Returns:
             Dict containing analyzed CGRA components and their relationships
@@ -165,42 +190,175 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
             'relationships': []
         }
 
-        def traverse_node(node: Dict, parent_type: Optional[str] = None):
+        summary = record_summary(ast_data)
+        if summary is not None and not summary.may_contain_any(self._component_texts):
+            return components
+
+        index = index or ASTIndex(ast_data['ast'])
+        component_types: Dict[int, str] = {}
+        for position in index.select_positions(self._component_selector):
+            node = index.nodes[position]
             component_type = self._identify_component_type(node)
+            component_types[position] = component_type
+            component_info = {
+                'type': component_type,
+                'name': node.get('text', ''),
+                'location': {
+                    'start': node.get('start_point', {}),
+                    'end': node.get('end_point', {})
+                },
+                'interface': self._extract_interface_info(node)
+            }
             
-            if component_type:
-                component_info = {
-                    'type': component_type,
-                    'name': node.get('text', ''),
-                    'location': {
-                        'start': node.get('start_point', {}),
-                        'end': node.get('end_point', {})
-                    },
-                    'interface': self._extract_interface_info(node)
-                }
-                
-                if parent_type:
-                    components['relationships'].append({
-                        'from': parent_type,
-                        'to': component_type,
-                        'type': 'contains'
-                    })
-                
-                # Use the component type directly as key since it's already pluralized
-                components[component_type].append(component_info)
+            # The containing component is the nearest ancestor that is a component itself
+            parent_type = next((component_types[ancestor] for ancestor in index.ancestor_positions(position)
+                                if ancestor in component_types), None)
+            if parent_type:
+                components['relationships'].append({
+                    'from': parent_type,
+                    'to': component_type,
+                    'type': 'contains'
+                })
             
-            for child in node.get('children', []):
-                traverse_node(child, component_type or parent_type)
+            # Use the component type directly as key since it's already pluralized
+            components[component_type].append(component_info)
 
-        traverse_node(ast_data['ast'])
         return components
 
-    def analyze_dataflow(self, ast_data: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _is_token(node: Dict) -> bool:
+        """Anonymous tokens (punctuation, keywords, operators) are leaves whose type is their text."""
+        return not node.get('children') and node.get('text') == node['type']
+
+    def _named_children(self, node: Dict) -> List[Dict]:
+        return [child for child in node.get('children', []) if not self._is_token(child)]
+
+    def _channel_path(self, node: Dict) -> Optional[List[str]]:
+        """
+        Normalize a channel expression into path segments, e.g. t.ports[side] -> ['t', '.ports', '[]'].
+        Returns None for expressions that do not name a channel (calls, literals).
+        """
+        node_type = node['type']
+        named = self._named_children(node)
+        if node_type == 'identifier':
+            return [node.get('text', '')]
+        if node_type == 'parenthesized_expression' and named:
+            return self._channel_path(named[0])
+        if node_type == 'selector_expression' and len(named) == 2:
+            operand = self._channel_path(named[0])
+            return operand + ['.' + named[1].get('text', '')] if operand else None
+        if node_type == 'index_expression' and named:
+            operand = self._channel_path(named[0])
+            return operand + ['[]'] if operand else None
+        return None
+
+    def _function_scope(self, node: Dict, index: Optional[ASTIndex] = None) -> Dict[str, Any]:
+        """Collect the receiver, parameters and local variables of a function or method."""
+        index = index or ASTIndex(node)
+        scope = {'name': '', 'receiver': None, 'types': {}, 'locals': set()}
+        parameter_lists = []
+        for child in node.get('children', []):
+            if child['type'] in ('identifier', 'field_identifier') and not scope['name']:
+                scope['name'] = child.get('text', '')
+            elif child['type'] == 'parameter_list':
+                parameter_lists.append(child)
+
+        for list_position, parameter_list in enumerate(parameter_lists):
+            for declaration in parameter_list.get('children', []):
+                if declaration['type'] != 'parameter_declaration':
+                    continue
+                names = [c.get('text', '') for c in declaration['children'] if c['type'] == 'identifier']
+                type_names = self._leaf_texts_of_type(declaration, 'type_identifier', index)
+                for name in names:
+                    scope['locals'].add(name)
+                    if type_names:
+                        scope['types'][name] = type_names[0]
+                if list_position == 0 and node['type'] == 'method_declaration':
+                    if names:
+                        scope['receiver'] = names[0]
+                    if type_names:
+                        # Methods of different types may share a name: qualify it (A.Run)
+                        scope['name'] = f"{type_names[0]}.{scope['name']}"
+
+        function_position = index.position(node)
+        for position in index.select_positions('short_var_declaration, var_spec, range_clause, receive_statement',
+                                               within=node):
+            # Declarations of nested function literals belong to their own scope
+            nested = False
+            for ancestor in index.ancestor_positions(position):
+                if ancestor == function_position:
+                    break
+                if index.nodes[ancestor]['type'] in NESTED_FUNCTION_TYPES:
+                    nested = True
+                    break
+            if nested:
+                continue
+            current = index.nodes[position]
+            first = current['children'][0] if current['children'] else None
+            if first is not None and first['type'] == 'expression_list':
+                scope['locals'].update(c.get('text', '') for c in first['children'] if c['type'] == 'identifier')
+            elif current['type'] == 'var_spec':
+                scope['locals'].update(c.get('text', '') for c in current['children'] if c['type'] == 'identifier')
+        return scope
+
+    @staticmethod
+    def _leaf_texts_of_type(node: Dict, leaf_type: str, index: Optional[ASTIndex] = None) -> List[str]:
+        """Texts of the leaves of one type in a subtree, in document order."""
+        index = index or ASTIndex(node)
+        texts = [node['text']] if node['type'] == leaf_type and 'text' in node else []
+        for position in index.of_type(leaf_type, within=node):
+            if 'text' in index.nodes[position]:
+                texts.append(index.nodes[position]['text'])
+        return texts
+
+    @staticmethod
+    def _package_namespace(relative_path: Optional[str], package: str) -> str:
+        """
+        Prefix of the channel keys of a file: its package qualified by the package
+        directory (cmd/tool/main), since package names repeat across directories.
+        """
+        directory = os.path.dirname(relative_path).replace(os.sep, '/') if relative_path else ''
+        return f"{directory}/{package}" if directory else package
+
+    def _resolve_channel(self, expression: Dict, package: str, scope: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Resolve a channel expression to a project-wide key.
+
+        Fields reached through a receiver or a typed parameter are keyed by the
+        struct type (pkg.Type.field), function locals by the function or method
+        (pkg.Func:name, pkg.Type.Method:name), and anything else by the package
+        (pkg.name), where pkg is the namespace from _package_namespace.
+        """
+        path = self._channel_path(expression)
+        if not path:
+            return None
+        root, rest = path[0], ''.join(path[1:])
+        if scope:
+            if root == scope['receiver'] and root in scope['types']:
+                return f"{package}.{scope['types'][root]}{rest}"
+            if root in scope['types'] and rest:
+                return f"{package}.{scope['types'][root]}{rest}"
+            if root in scope['locals']:
+                return f"{package}.{scope['name']}:{root}{rest}"
+        return f"{package}.{root}{rest}"
+
+    def analyze_dataflow(self,
+                         ast_data: Dict[str, Any],
+                         index: Optional[ASTIndex] = None,
+                         relative_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze data flow patterns in CGRA design.
         
+        Sends and receives are keyed by their resolved channel expression and
+        linked within the file; analyze_cgra_project links them project-wide.
+        Receive expressions (<-ch) are recognized by their operator token, so
+        profiles that drop anonymous nodes only keep receives inside select.
+        
         Args:
             ast_data: AST data from parse_file or parse_directory
+            index: Index of ast_data['ast'] shared with other passes over the same tree
+            relative_path: Path of the file relative to the project root; its directory
+                qualifies the package in channel keys
             
         Returns:
             Dict containing data flow analysis results
@@ -210,35 +368,87 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
             'connections': [],
             'patterns': []
         }
-        
-        def find_dataflow_patterns(node: Dict):
-            if node['type'] in ['send_statement', 'receive_statement']:
-                channel_info = {
-                    'type': node['type'],
-                    'location': {
-                        'start': node.get('start_point', {}),
-                        'end': node.get('end_point', {})
-                    }
-                }
-                dataflow['channels'].append(channel_info)
-            
-            for child in node.get('children', []):
-                find_dataflow_patterns(child)
-        
-        find_dataflow_patterns(ast_data['ast'])
+
+        summary = record_summary(ast_data)
+        if summary is not None and not summary.may_have_any_type(CHANNEL_OPERATION_TYPES):
+            # Most files have no channel operations; skip indexing them
+            dataflow.update(ChannelLinker().link())
+            return dataflow
+
+        root = ast_data['ast']
+        index = index or ASTIndex(root)
+        package = ''
+        for child in root.get('children', []):
+            if child['type'] == 'package_clause':
+                package = ''.join(self._leaf_texts_of_type(child, 'package_identifier', index))
+                break
+        package = self._package_namespace(relative_path, package)
+
+        def record(node: Dict, direction: str, expression: Optional[Dict], scope: Optional[Dict]):
+            channel_info = {
+                'type': node['type'],
+                'location': {
+                    'start': node.get('start_point', {}),
+                    'end': node.get('end_point', {})
+                },
+                'direction': direction,
+                'function': scope['name'] if scope else None
+            }
+            if expression is not None:
+                channel_info['channel'] = self._resolve_channel(expression, package, scope)
+            dataflow['channels'].append(channel_info)
+
+        scopes: Dict[int, Dict[str, Any]] = {}
+
+        def scope_of(position: int) -> Optional[Dict]:
+            """Scope of the nearest enclosing function, computed once per function."""
+            function = next((ancestor for ancestor in index.ancestor_positions(position)
+                             if index.nodes[ancestor]['type'] in FUNCTION_TYPES), None)
+            if function is None:
+                return None
+            if function not in scopes:
+                scopes[function] = self._function_scope(index.nodes[function], index)
+            return scopes[function]
+
+        # Receive expressions are found through their operator token
+        operations = set(index.select_positions('send_statement, receive_statement'))
+        for position in index.select_positions('unary_expression > [text="<-"]'):
+            parent = index.parents[position]
+            node = index.nodes[parent]
+            if node['children'][0] is index.nodes[position] and (
+                    index.parents[parent] < 0 or index.nodes[index.parents[parent]]['type'] != 'receive_statement'):
+                operations.add(parent)
+
+        for position in sorted(operations):
+            node = index.nodes[position]
+            scope = scope_of(position)
+            if node['type'] == 'send_statement':
+                named = self._named_children(node)
+                record(node, 'send', named[0] if named else None, scope)
+            elif node['type'] == 'receive_statement':
+                receive = next((c for c in node['children'] if c['type'] == 'unary_expression'), None)
+                operand = self._named_children(receive) if receive else []
+                record(node, 'receive', operand[0] if operand else None, scope)
+            else:
+                operand = self._named_children(node)
+                record(node, 'receive', operand[0] if operand else None, scope)
+
+        linker = ChannelLinker()
+        linker.add(dataflow['channels'])
+        dataflow.update(linker.link())
         return dataflow
 
-    def analyze_cgra_project(self, project_path: str) -> Dict[str, Any]:
-        """
-        Analyze entire CGRA project and generate comprehensive analysis.
-        
-        Args:
-            project_path: Path to CGRA project root directory
-            
-        Returns:
-            Dict containing complete project analysis
-        """
-        project_analysis = {
+    @staticmethod
+    def link_dataflow(project_analysis: Dict[str, Any]) -> None:
+        """Link the channel operations of all files of a project into one producer-consumer graph."""
+        linker = ChannelLinker()
+        linker.add(project_analysis['dataflow'].get('channels', []))
+        project_analysis['dataflow'].update(linker.link())
+
+    @staticmethod
+    def new_project_analysis() -> Dict[str, Any]:
+        """Create an empty project analysis, the structure analyze_cgra_project returns."""
+        return {
             'components': {},
             'dataflow': {},
             'configurations': {},
@@ -249,48 +459,265 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
                 'samples': []
             }
         }
+
+    @staticmethod
+    def categorize_file(relative_path: str) -> str:
+        """Categorize a project file into a project_structure bucket based on its path."""
+        if 'test' in os.path.basename(relative_path):
+            return 'tests'
+        elif 'samples' in relative_path:
+            return 'samples'
+        elif any(key in relative_path.lower() for key in ['core', 'cgra', 'pe']):
+            return 'core_components'
+        return 'utilities'
+
+    def analyze_cgra_file(self,
+                          file_path: str,
+                          project_path: str,
+                          prune_profile: Union[str, PruneProfile, None] = None) -> Optional[Dict[str, Any]]:
+        """
+        Analyze one file of a CGRA project.
+        
+        Args:
+            file_path: Path to the source file
+            project_path: Path to the project root, used for the relative path
+            prune_profile: Pruning profile for the AST (defaults to the analyzer's)
+            
+        Returns:
+            Dict with the relative path, category, components and dataflow, or None
+        """
+        ast_data = self.parse_file(file_path, prune_profile)
+        if not ast_data:
+            return None
+        return self.analyze_cgra_ast(ast_data, os.path.relpath(file_path, project_path))
+
+    @staticmethod
+    def _shared_index(ast_data: Dict[str, Any]) -> Optional[ASTIndex]:
+        """
+        Index shared by the component and dataflow passes over one record. Records
+        with a summary get none: each pass indexes the tree only if the summary
+        does not rule it out.
+        """
+        return ASTIndex(ast_data['ast']) if record_summary(ast_data) is None else None
+
+    def analyze_cgra_ast(self, ast_data: Dict[str, Any], relative_path: str) -> Dict[str, Any]:
+        """
+        Analyze the parsed AST of one project file; see analyze_cgra_file.
+        
+        Args:
+            ast_data: AST data from parse_file
+            relative_path: Path of the file relative to the project root
+            
+        Returns:
+            Dict with the relative path, category, components and dataflow, plus the
+            'degraded' entry of files parsed over budget
+        """
+        index = self._shared_index(ast_data)
+        dataflow = self.analyze_dataflow(ast_data, index, relative_path)
+        for entry in dataflow['channels']:
+            entry['file'] = relative_path
+        components = self.analyze_cgra_components(ast_data, index)
+        for comp_type, entries in components.items():
+            if comp_type != 'relationships':
+                for entry in entries:
+                    entry['file'] = relative_path
+        file_analysis = {
+            'file': relative_path,
+            'category': self.categorize_file(relative_path),
+            'components': components,
+            'dataflow': dataflow
+        }
+        if 'degraded' in ast_data:
+            file_analysis['degraded'] = ast_data['degraded']
+        return file_analysis
+
+    @staticmethod
+    def rewrite_file_analysis(file_analysis: Dict[str, Any], relative_path: str) -> Dict[str, Any]:
+        """
+        Reuse the analysis of one file for an identical copy at another path.
+        
+        Path-dependent fields (file, category, the file of each component and
+        channel operation, channel keys qualified by the package directory) are
+        rewritten and the channels relinked; everything else is shared with the original.
+        """
+        old_directory = os.path.dirname(file_analysis['file']).replace(os.sep, '/')
+        new_directory = os.path.dirname(relative_path).replace(os.sep, '/')
+
+        def rekey(channel: Optional[str]) -> Optional[str]:
+            # Channel keys are qualified by the package directory (see _package_namespace)
+            if not channel or old_directory == new_directory:
+                return channel
+            bare = channel[len(old_directory) + 1:] if old_directory else channel
+            return f"{new_directory}/{bare}" if new_directory else bare
+
+        dataflow = dict(file_analysis['dataflow'])
+        dataflow['channels'] = [{**entry, 'file': relative_path, 'channel': rekey(entry.get('channel'))}
+                                if 'channel' in entry else {**entry, 'file': relative_path}
+                                for entry in dataflow.get('channels', [])]
+        linker = ChannelLinker()
+        linker.add(dataflow['channels'])
+        dataflow.update(linker.link())
+        components = {comp_type: entries if comp_type == 'relationships'
+                      else [{**entry, 'file': relative_path} for entry in entries]
+                      for comp_type, entries in file_analysis['components'].items()}
+        return {
+            **file_analysis,
+            'file': relative_path,
+            'category': CGRAAnalyzer.categorize_file(relative_path),
+            'components': components,
+            'dataflow': dataflow
+        }
+
+    @staticmethod
+    def merge_file_analysis(project_analysis: Dict[str, Any], file_analysis: Dict[str, Any]) -> None:
+        """Merge the result of analyze_cgra_file into a project analysis."""
+        project_analysis['project_structure'][file_analysis['category']].append(file_analysis['file'])
+        if 'degraded' in file_analysis:
+            project_analysis.setdefault('degraded_files', []).append(
+                {'file': file_analysis['file'], **file_analysis['degraded']})
+
+        # Merge component and dataflow analysis
+        components = file_analysis['components']
+        for comp_type in components:
+            if comp_type not in project_analysis['components']:
+                project_analysis['components'][comp_type] = []
+            project_analysis['components'][comp_type].extend(components[comp_type])
+
+        dataflow = file_analysis['dataflow']
+        for flow_type in dataflow:
+            if flow_type not in project_analysis['dataflow']:
+                project_analysis['dataflow'][flow_type] = []
+            project_analysis['dataflow'][flow_type].extend(dataflow[flow_type])
+
+    def analyze_cgra_project(self,
+                             project_path: str,
+                             prune_profile: Union[str, PruneProfile, None] = None,
+                             store=None,
+                             store_batch_size: int = 500,
+                             discovery: Optional[FileDiscovery] = None) -> Dict[str, Any]:
+        """
+        Analyze entire CGRA project and generate comprehensive analysis.
+        
+        Args:
+            project_path: Path to CGRA project root directory
+            prune_profile: Pruning profile for the project ASTs (defaults to the analyzer's)
+            store: Optional AnalysisStore that also receives every file's results
+            store_batch_size: Files written to the store per transaction
+            discovery: File discovery settings (defaults to .go files, honoring .gitignore)
+            
+        Returns:
+            Dict containing complete project analysis; files parsed over budget are
+            listed under 'degraded_files'
+        """
+        project_analysis = self.new_project_analysis()
+        pending = []
         
-        for root, _, files in os.walk(project_path):
-            for file in files:
-                if file.endswith('.go'):
-                    file_path = os.path.join(root, file)
-                    ast_data = self.parse_file(file_path)
-                    
-                    if ast_data:
-                        relative_path = os.path.relpath(file_path, project_path)
-                        components = self.analyze_cgra_components(ast_data)
-                        dataflow = self.analyze_dataflow(ast_data)
-                        
-                        # Categorize file based on path
-                        if 'test' in file:
-                            project_analysis['project_structure']['tests'].append(relative_path)
-                        elif 'samples' in relative_path:
-                            project_analysis['project_structure']['samples'].append(relative_path)
-                        elif any(key in relative_path.lower() for key in ['core', 'cgra', 'pe']):
-                            project_analysis['project_structure']['core_components'].append(relative_path)
-                        else:
-                            project_analysis['project_structure']['utilities'].append(relative_path)
-                        
-                        # Merge component and dataflow analysis
-                        for comp_type in components:
-                            if comp_type not in project_analysis['components']:
-                                project_analysis['components'][comp_type] = []
-                            project_analysis['components'][comp_type].extend(components[comp_type])
-                        
-                        for flow_type in dataflow:
-                            if flow_type not in project_analysis['dataflow']:
-                                project_analysis['dataflow'][flow_type] = []
-                            project_analysis['dataflow'][flow_type].extend(dataflow[flow_type])
+        self.cancel_event.clear()
+        discovery = discovery or FileDiscovery(('.go',))
+        for file_path in discovery.discover(project_path):
+            if self.cancel_event.is_set():
+                logging.warning(f"Analysis of {project_path} cancelled")
+                break
+            ast_data = self.parse_file(file_path, prune_profile)
+            if not ast_data:
+                continue
+            file_analysis = self.analyze_cgra_ast(ast_data, os.path.relpath(file_path, project_path))
+            self.merge_file_analysis(project_analysis, file_analysis)
+            if store is not None:
+                pending.append((file_analysis, ast_data))
+                if len(pending) >= store_batch_size:
+                    store.store_cgra_files(pending)
+                    pending = []
         
+        self.link_dataflow(project_analysis)
+        if store is not None:
+            store.store_cgra_files(pending)
+            store.link_channels()
         return project_analysis
 
-    def save_cgra_analysis(self, analysis: Dict[str, Any], output_path: str):
+    def summarize_project(self,
+                          project_path: str,
+                          cache_path: Optional[str] = None,
+                          prune_profile: Union[str, PruneProfile, None] = None,
+                          discovery: Optional[FileDiscovery] = None) -> Dict[str, Any]:
+        """
+        Summarize a CGRA project per directory, bottom-up, reusing the summaries of
+        unchanged files and directories from cache_path (see MerkleSummarizer).
+        
+        A file's summary counts its components by type and its channel operations,
+        and lists its component names and dataflow pattern types.
+        
+        Args:
+            project_path: Path to CGRA project root directory
+            cache_path: JSON file memoizing summaries across runs (None recomputes everything)
+            prune_profile: Pruning profile for the ASTs (defaults to the analyzer's)
+            discovery: File discovery settings (defaults to .go files, honoring .gitignore)
+            
+        Returns:
+            Dict with the root hash, the project 'summary' and per-directory 'directories'
+        """
+        profile = resolve_profile(prune_profile) if prune_profile is not None else self.prune_profile
+
+        def summarize_file(relative_path: str) -> Optional[Dict[str, Any]]:
+            ast_data = self.parse_file(os.path.join(project_path, relative_path), profile)
+            if not ast_data:
+                return None
+            index = self._shared_index(ast_data)
+            components = self.analyze_cgra_components(ast_data, index)
+            dataflow = self.analyze_dataflow(ast_data, index, relative_path)
+            counts = {kind: len(entries) for kind, entries in components.items() if kind != 'relationships'}
+            counts['channel_operations'] = len(dataflow['channels'])
+            patterns: Dict[str, int] = {}
+            for pattern in dataflow['patterns']:
+                patterns[pattern['type']] = patterns.get(pattern['type'], 0) + 1
+            return {
+                'files': 1,
+                'counts': counts,
+                'components': sorted({entry['name'] for kind, entries in components.items()
+                                      if kind != 'relationships' for entry in entries}),
+                'patterns': patterns
+            }
+
+        policy = self.file_policy.fingerprint() if self.file_policy is not None else 'none'
+        summarizer = MerkleSummarizer(summarize_file, cache_path,
+                                      salt=f"cgra:{profile.name if profile is not None else 'full'}:{policy}")
+        discovery = discovery or FileDiscovery(('.go',))
+        result = summarizer.summarize_files(project_path, discovery.discover(project_path))
+        result['stats'] = dict(summarizer.stats)
+        return result
+
+    def analyze_grid_topology(self,
+                              config_path: str,
+                              width: Optional[int] = None,
+                              height: Optional[int] = None,
+                              sample_paths: Optional[List[str]] = None) -> GridTopology:
+        """
+        Rebuild the PE grid described by a configuration file (e.g. zeonica's config/config.go).
+        
+        Args:
+            config_path: Source file that connects the tiles
+            width: Grid width, if not set by a literal WithWidth call in the sources
+            height: Grid height, if not set by a literal WithHeight call in the sources
+            sample_paths: Further files (e.g. samples) searched for the grid size
+            
+        Returns:
+            GridTopology answering neighbor, region and route queries
+        """
+        # Connection rules need the full tree: tokens such as '[' and '+' carry the tile offsets
+        config_ast = self.parse_file(config_path, 'full')
+        if not config_ast:
+            raise ValueError(f"Cannot parse {config_path}")
+        other_asts = [ast for ast in (self.parse_file(path, 'full') for path in sample_paths or []) if ast]
+        return GridTopologyExtractor().build(config_ast, width, height, other_asts)
+
+    def save_cgra_analysis(self, analysis: Dict[str, Any], output_path: str, compact: bool = False):
         """
         Save CGRA analysis results in a structured format suitable for LLM processing.
         
         Args:
             analysis: Analysis results from analyze_cgra_project
             output_path: Path to save the analysis results
+            compact: Write without indentation
         """
         # Add LLM-friendly metadata
         analysis['metadata'] = {
@@ -308,5 +735,4 @@ class CGRAAnalyzer(TreeSitterAnalyzer):
         }
         
         # Save to JSON with proper formatting
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+        serializer.dump(analysis, output_path, compact)
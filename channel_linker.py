@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Dict, List, Any, Iterable, Tuple
+
+SEND = 'send'
+RECEIVE = 'receive'
+
+class ChannelLinker:
+    """
+    Joins channel sends and receives into a producer-consumer graph.
+
+    Every send and receive recorded by CGRAAnalyzer.analyze_dataflow carries a
+    resolved channel key. The linker buckets them by key in a hash index and
+    joins each bucket once, so linking is linear in the number of channel
+    operations plus the number of distinct producer/consumer function pairs.
+    """
+
+    def __init__(self):
+        self._producers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._consumers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    def add(self, channels: Iterable[Dict[str, Any]]) -> None:
+        """Index channel operations; entries without a resolved channel are ignored."""
+        for entry in channels:
+            key = entry.get('channel')
+            if not key:
+                continue
+            if entry.get('direction') == SEND:
+                self._producers[key].append(entry)
+            elif entry.get('direction') == RECEIVE:
+                self._consumers[key].append(entry)
+
+    @staticmethod
+    def _endpoint(entry: Dict[str, Any]) -> Tuple[Any, Any]:
+        return entry.get('file'), entry.get('function')
+
+    @staticmethod
+    def _classify(producers: int, consumers: int) -> str:
+        if producers and not consumers:
+            return 'unconsumed'
+        if consumers and not producers:
+            return 'unproduced'
+        if producers == 1 and consumers == 1:
+            return 'point_to_point'
+        if consumers == 1:
+            return 'fan_in'
+        if producers == 1:
+            return 'fan_out'
+        return 'many_to_many'
+
+    def link(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Build the producer-consumer graph.
+
+        Returns:
+            Dict with 'connections' (one per channel and producer/consumer function
+            pair, with occurrence counts) and 'patterns' (per-channel topology and
+            pipeline stages that consume one channel and produce another)
+        """
+        connections = []
+        patterns = []
+        consumed_by: Dict[Tuple[Any, Any], set] = defaultdict(set)
+        produced_by: Dict[Tuple[Any, Any], set] = defaultdict(set)
+
+        for key in sorted(set(self._producers) | set(self._consumers)):
+            producer_counts: Dict[Tuple[Any, Any], int] = defaultdict(int)
+            consumer_counts: Dict[Tuple[Any, Any], int] = defaultdict(int)
+            for entry in self._producers.get(key, []):
+                producer_counts[self._endpoint(entry)] += 1
+            for entry in self._consumers.get(key, []):
+                consumer_counts[self._endpoint(entry)] += 1
+
+            for producer, sends in producer_counts.items():
+                produced_by[producer].add(key)
+                for consumer, receives in consumer_counts.items():
+                    connections.append({
+                        'channel': key,
+                        'from': {'file': producer[0], 'function': producer[1]},
+                        'to': {'file': consumer[0], 'function': consumer[1]},
+                        'sends': sends,
+                        'receives': receives
+                    })
+            for consumer in consumer_counts:
+                consumed_by[consumer].add(key)
+
+            patterns.append({
+                'type': self._classify(len(producer_counts), len(consumer_counts)),
+                'channel': key,
+                'producers': len(producer_counts),
+                'consumers': len(consumer_counts)
+            })
+
+        for endpoint in sorted(set(consumed_by) & set(produced_by), key=str):
+            inputs = consumed_by[endpoint]
+            outputs = produced_by[endpoint] - inputs
+            if outputs:
+                patterns.append({
+                    'type': 'pipeline_stage',
+                    'file': endpoint[0],
+                    'function': endpoint[1],
+                    'inputs': sorted(inputs),
+                    'outputs': sorted(outputs)
+                })
+
+        return {'connections': connections, 'patterns': patterns}
@@ -1,10 +1,35 @@
 import os
-import json
-from typing import Dict, List, Union, Optional, Any
+from typing import Dict, List, Union, Optional, Any, Iterable, NamedTuple
 from tree_sitter import Language, Parser, Tree, Node
 from pathlib import Path
 import subprocess
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ast_pruning import PruneProfile, resolve_profile, node_to_dict, append_pruned_children
+from file_policy import FilePolicy, SKIP
+from source_map import mapped_source, node_text
+from file_discovery import FileDiscovery, matches_pattern
+from content_dedup import ParseCache
+from parse_budget import ParseBudget, ParseTimeout, Deadline, degraded_result, SIZE
+from file_summary import summarize_strings
+from skeleton import extract_skeleton
+import compact_schema
+
+# Output forms of parse_file/parse_files
+DICT = 'dict'        # the full JSON-style record
+COMPACT = 'compact'  # a compact_schema document, packed straight from the tree
+TREE = 'tree'        # the native tree-sitter tree (ParsedTree), no conversion at all
+SKELETON = 'skeleton'  # declarations and signatures only, bodies never walked (see skeleton)
+OUTPUTS = (DICT, COMPACT, TREE, SKELETON)
+
+class ParsedTree(NamedTuple):
+    """A native parse result. Node texts are sliced from source (the tree holds none)."""
+    file_path: str
+    language: str
+    tree: Optional[Tree]
+    source: bytes
+    degraded: Optional[Dict[str, str]] = None
 
 class TreeSitterAnalyzer:
     """
@@ -12,26 +37,55 @@ class TreeSitterAnalyzer:
     Provides easy-to-use APIs for code analysis and outputs AST in JSON format.
     """
 
-    def __init__(self, languages: Dict[str, str] = None):
+    def __init__(self,
+                 languages: Dict[str, str] = None,
+                 prune_profile: Union[str, PruneProfile, None] = None,
+                 file_policy: Optional[FilePolicy] = None,
+                 dedupe: bool = False,
+                 parse_budget: Optional[ParseBudget] = None):
         """
         Initialize the TreeSitterAnalyzer with supported programming languages.
         
         Args:
             languages (Dict[str, str]): Dictionary mapping file extensions to language names
                                       e.g., {'.py': 'python', '.js': 'javascript'}
+            prune_profile (Union[str, PruneProfile, None]): Default pruning profile applied
+                                      during AST conversion (see ast_pruning.PRUNE_PROFILES)
+            file_policy (Optional[FilePolicy]): Policy skipping or cheaply parsing generated,
+                                      vendored and oversized files; None parses everything
+            dedupe (bool): Parse identical file contents once per analyzer and share the AST
+                                      among all copies (see content_dedup.ParseCache)
+            parse_budget (Optional[ParseBudget]): Per-file size and time limits; files over
+                                      budget get a degraded result. None sets no limits
         """
         self.languages = languages or {
             '.py': 'python',
             '.js': 'javascript',
             '.java': 'java',
             '.cpp': 'cpp',
+            '.cc': 'cpp',
+            '.cxx': 'cpp',
             '.c': 'cpp',
             '.h': 'cpp',
+            '.hh': 'cpp',
             '.hpp': 'cpp',
+            '.hxx': 'cpp',
             '.go': 'go'
         }
         
+        self.prune_profile = resolve_profile(prune_profile)
+        self.file_policy = file_policy
+        self.parse_cache = ParseCache() if dedupe else None
+        self.parse_budget = parse_budget
+        self.cancel_event = threading.Event()
         self.parsers = {}
+        self._language_objects: Dict[str, Language] = {}
+        # Parsers are not thread-safe: self.parsers belong to the creating thread,
+        # every other thread builds its own set on first use
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_size = 0
         self._setup_parsers()
 
     def _setup_parsers(self) -> None:
@@ -48,9 +102,24 @@ class TreeSitterAnalyzer:
                 parser = Parser()
                 parser.set_language(lang)
                 self.parsers[ext] = parser
+                self._language_objects[ext] = lang
             except Exception as e:
                 logging.error(f"Failed to set up parser for {lang_name}: {str(e)}")
 
+    def _parser_for(self, ext: str) -> Parser:
+        """Parser for a file extension owned by the calling thread."""
+        if threading.get_ident() == self._owner_thread:
+            return self.parsers[ext]
+        parsers = getattr(self._local, 'parsers', None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+        parser = parsers.get(ext)
+        if parser is None:
+            parser = Parser()
+            parser.set_language(self._language_objects[ext])
+            parsers[ext] = parser
+        return parser
+
     def _build_languages(self) -> None:
         """Build tree-sitter language parsers."""
         os.makedirs('build', exist_ok=True)
@@ -74,52 +143,98 @@ class TreeSitterAnalyzer:
             [f'tree-sitter-{lang}' for lang in language_repos.keys()]
         )
 
-    def _node_to_dict(self, node: Node) -> Dict[str, Any]:
+    def cancel(self) -> None:
         """
-        Convert a tree-sitter Node to a dictionary representation.
+        Cancel the run in progress from another thread: the file being parsed gets a
+        degraded result and parse_directory stops. The flag is cleared when the next
+        parse_directory run starts, or by calling cancel_event.clear().
+        """
+        self.cancel_event.set()
+
+    def _tree_to_json(self,
+                      tree: Tree,
+                      profile: Optional[PruneProfile] = None,
+                      source=None,
+                      deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Convert a tree-sitter Tree to JSON format.
         
         Args:
-            node (Node): Tree-sitter AST node
+            tree (Tree): Tree-sitter AST
+            profile (Optional[PruneProfile]): Pruning rules applied while converting
+            source: Source buffer the tree was parsed from
+            deadline (Optional[Deadline]): Budget checked while converting
             
         Returns:
-            Dict[str, Any]: Dictionary representation of the node
+            Dict[str, Any]: JSON representation of the AST
         """
-        result = {
-            'type': node.type,
-            'start_point': {'row': node.start_point[0], 'column': node.start_point[1]},
-            'end_point': {'row': node.end_point[0], 'column': node.end_point[1]},
-            'children': []
-        }
-
-        if len(node.children) == 0:
-            result['text'] = node.text.decode('utf-8')
-        else:
-            for child in node.children:
-                result['children'].append(self._node_to_dict(child))
-
-        return result
+        return node_to_dict(tree.root_node, profile, 0, source, deadline)
 
-    def _tree_to_json(self, tree: Tree) -> Dict[str, Any]:
+    def _tree_to_packed(self,
+                        tree: Tree,
+                        table: compact_schema.StringTable,
+                        profile: Optional[PruneProfile] = None,
+                        source=None,
+                        deadline: Optional[Deadline] = None) -> List[Any]:
         """
-        Convert a tree-sitter Tree to JSON format.
+        Pack a tree-sitter Tree straight into the compact_schema node layout.
+        
+        Produces what compact_schema.encode makes of _tree_to_json's output,
+        without building the intermediate dicts.
         
         Args:
             tree (Tree): Tree-sitter AST
+            table (compact_schema.StringTable): String table receiving node types and texts
+            profile (Optional[PruneProfile]): Pruning rules applied while converting
+            source: Source buffer the tree was parsed from
+            deadline (Optional[Deadline]): Budget checked while converting
             
         Returns:
-            Dict[str, Any]: JSON representation of the AST
+            List[Any]: The packed root node
         """
-        return self._node_to_dict(tree.root_node)
+        intern = table.intern
+
+        def pack(node: Node, profile: Optional[PruneProfile], depth: int, source, deadline) -> List[Any]:
+            if deadline is not None:
+                deadline.check()
+            start, end = node.start_point, node.end_point
+            packed = [intern(node.type), start[0], start[1], end[0], end[1]]
+            children = []
+            if node.child_count == 0:
+                has_text = True
+            elif profile is None:
+                children = [pack(child, None, 0, source, deadline) for child in node.children]
+                has_text = False
+            else:
+                append_pruned_children(children, node, profile, depth + 1, source, deadline, pack)
+                has_text = not children and node.named_child_count == 0
+            if children:
+                packed.append(children)
+            if has_text:
+                packed.append(intern(node_text(node, source) if source is not None else node.text.decode('utf-8')))
+            return packed
 
-    def parse_file(self, file_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        return pack(tree.root_node, profile, 0, source, deadline)
+
+    def parse_file(self,
+                   file_path: Union[str, Path],
+                   prune_profile: Union[str, PruneProfile, None] = None,
+                   output: str = DICT) -> Union[Dict[str, Any], ParsedTree, None]:
         """
         Parse a single file and return its AST in JSON format.
         
+        The file is memory-mapped and fed to the parser through a read callback,
+        so it is never copied into a bytes object as a whole.
+        
         Args:
             file_path (Union[str, Path]): Path to the source code file
+            prune_profile (Union[str, PruneProfile, None]): Pruning profile for this call,
+                                      overriding the analyzer default
+            output (str): Result form, one of OUTPUTS (see parse_source)
             
         Returns:
-            Optional[Dict[str, Any]]: JSON representation of the AST or None if parsing fails
+            Union[Dict[str, Any], ParsedTree, None]: JSON representation of the AST, or None
+                                      if parsing fails or the file policy skips the file
         """
         file_path = Path(file_path)
         if not file_path.exists():
@@ -132,30 +247,218 @@ class TreeSitterAnalyzer:
             return None
 
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            with mapped_source(file_path) as source:
+                return self.parse_source(source, file_path, prune_profile, output)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading file {file_path}: {str(e)}")
+            return None
+
+    def parse_source(self,
+                     content: bytes,
+                     file_path: Union[str, Path],
+                     prune_profile: Union[str, PruneProfile, None] = None,
+                     output: str = DICT) -> Union[Dict[str, Any], ParsedTree, None]:
+        """
+        Parse source code that is already in memory, e.g. a blob read from git.
+        
+        Safe to call from several threads at once: each thread parses with its own parsers.
+        
+        Args:
+            content (bytes): Source code, as bytes or a memory-mapped buffer
+            file_path (Union[str, Path]): Path recorded in the result; its suffix selects the language
+                                      and the file policy matches on it
+            prune_profile (Union[str, PruneProfile, None]): Pruning profile for this call,
+                                      overriding the analyzer default
+            output (str): DICT for the JSON-style record, COMPACT for the same record as a
+                                      compact_schema document packed straight from the tree,
+                                      TREE for a ParsedTree holding the native tree (no
+                                      conversion, no pruning, no deduplication), SKELETON
+                                      for a record whose 'skeleton' holds imports, types and
+                                      signatures read straight off the tree (see skeleton)
             
-            tree = self.parsers[ext].parse(content)
-            return {
-                'file_path': str(file_path),
-                'language': self.languages[ext],
-                'ast': self._tree_to_json(tree)
-            }
+        Returns:
+            Union[Dict[str, Any], ParsedTree, None]: The parse result in the requested form, or
+                                      None if parsing fails or the file policy skips the file.
+                                      COMPACT records carry a 'summary' that lets analysis passes
+                                      skip the file (see file_summary); shard and archive writers
+                                      add one to DICT records as they store them. Files over the parse budget
+                                      or cancelled get a degraded result (see
+                                      parse_budget.degraded_result)
+        """
+        ext = Path(file_path).suffix
+        if ext not in self.parsers:
+            logging.error(f"Unsupported file extension: {ext}")
+            return None
+
+        try:
+            profile = resolve_profile(prune_profile) if prune_profile is not None else self.prune_profile
+            action, reason = None, None
+            if self.file_policy is not None:
+                action, reason, profile = self.file_policy.apply(file_path, len(content), content, profile)
+                if action == SKIP:
+                    logging.info(f"Skipping {reason} file {file_path}")
+                    return None
+
+            cache_key = None
+            result = None
+            if self.parse_cache is not None and output == DICT:
+                cache_key = self.parse_cache.key(content, ext, profile)
+                result = self.parse_cache.get(cache_key, file_path)
+
+            table = None
+            if result is None:
+                if self.parse_budget is not None and self.parse_budget.exceeds_size(len(content)):
+                    raise ParseTimeout(SIZE, f"{len(content)} bytes exceeds {self.parse_budget.max_size}")
+                deadline = Deadline(self.parse_budget, self.cancel_event)
+                tree = deadline.parse(self._parser_for(ext), content)
+                if output == TREE:
+                    return ParsedTree(str(file_path), self.languages[ext], tree, bytes(content))
+                if output == SKELETON:
+                    return {
+                        'file_path': str(file_path),
+                        'language': self.languages[ext],
+                        'skeleton': extract_skeleton(tree.root_node, content, self.languages[ext])
+                    }
+                if output == COMPACT:
+                    table = compact_schema.StringTable()
+                    ast = {compact_schema.NODE_MARKER: self._tree_to_packed(tree, table, profile, content, deadline)}
+                else:
+                    ast = self._tree_to_json(tree, profile, content, deadline)
+                result = {
+                    'file_path': str(file_path),
+                    'language': self.languages[ext],
+                    'ast': ast
+                }
+                if table is not None:
+                    # The string table already holds every type and text, so this summary is cheap
+                    result['summary'] = summarize_strings(table.strings)
+                if profile is not None:
+                    result['prune_profile'] = profile.name
+                if cache_key is not None:
+                    result = self.parse_cache.put(cache_key, result)
+            FilePolicy.annotate(result, action, reason)
+            return compact_schema.document(result, table) if table is not None else result
+        except ParseTimeout as e:
+            logging.warning(f"Degraded result for {file_path}: {str(e)}")
+            if output == TREE:
+                return ParsedTree(str(file_path), self.languages[ext], None, b'',
+                                  {'reason': e.reason, 'detail': e.detail})
+            result = degraded_result(str(file_path), self.languages[ext], e)
+            return compact_schema.encode(result) if output == COMPACT else result
         except Exception as e:
             logging.error(f"Error parsing file {file_path}: {str(e)}")
             return None
 
+    def tree_to_record(self,
+                       parsed: ParsedTree,
+                       prune_profile: Union[str, PruneProfile, None] = None) -> Dict[str, Any]:
+        """
+        Convert a ParsedTree (output=TREE) into the record parse_file returns by default.
+        
+        Lets callers that parse once for a cheap native-tree pass (e.g. a tree-sitter
+        query) build the dict AST later without parsing again.
+        
+        Args:
+            parsed (ParsedTree): Result of parse_file or parse_source with output=TREE
+            prune_profile (Union[str, PruneProfile, None]): Pruning profile for the conversion,
+                                      overriding the analyzer default
+            
+        Returns:
+            Dict[str, Any]: The JSON-style record, or a degraded result for degraded trees
+        """
+        if parsed.degraded is not None:
+            return degraded_result(parsed.file_path, parsed.language,
+                                   ParseTimeout(parsed.degraded['reason'], parsed.degraded['detail']))
+        profile = resolve_profile(prune_profile) if prune_profile is not None else self.prune_profile
+        try:
+            ast = self._tree_to_json(parsed.tree, profile, parsed.source, Deadline(self.parse_budget, self.cancel_event))
+        except ParseTimeout as e:
+            logging.warning(f"Degraded result for {parsed.file_path}: {str(e)}")
+            return degraded_result(parsed.file_path, parsed.language, e)
+        result = {
+            'file_path': parsed.file_path,
+            'language': parsed.language,
+            'ast': ast
+        }
+        if profile is not None:
+            result['prune_profile'] = profile.name
+        return result
+
+    def language_for(self, ext: str) -> Optional[Language]:
+        """Tree-sitter Language of a file extension, e.g. for queries over ParsedTree trees."""
+        return self._language_objects.get(ext)
+
+    def parse_files(self,
+                    file_paths: Iterable[Union[str, Path]],
+                    prune_profile: Union[str, PruneProfile, None] = None,
+                    max_workers: Optional[int] = None,
+                    output: str = DICT) -> List[Union[Dict[str, Any], ParsedTree, None]]:
+        """
+        Parse many files on the analyzer's thread pool.
+        
+        Each pool thread keeps its own parser per language for the lifetime of the
+        analyzer, and the pool itself is reused across calls, so fanning out even a
+        handful of files (a watch event, a server request) costs no more than
+        submitting them. Parsing itself runs in tree-sitter's C code; converting
+        to dicts is Python work, which is why COMPACT and TREE outputs exist.
+        
+        Args:
+            file_paths (Iterable[Union[str, Path]]): Files to parse
+            prune_profile (Union[str, PruneProfile, None]): Pruning profile applied to every file
+            max_workers (Optional[int]): Pool threads (defaults to the CPU count); 1 parses
+                                      on the calling thread
+            output (str): Result form, one of OUTPUTS (see parse_source)
+            
+        Returns:
+            List[Union[Dict[str, Any], ParsedTree, None]]: One result per path, in order;
+                                      None for files that failed, were skipped or were
+                                      not reached before a cancel()
+        """
+        if output not in OUTPUTS:
+            raise ValueError(f"Unknown output: {output}")
+        file_paths = list(file_paths)
+        max_workers = max_workers or os.cpu_count() or 1
+
+        def parse(file_path):
+            return None if self.cancel_event.is_set() else self.parse_file(file_path, prune_profile, output)
+
+        if max_workers == 1 or len(file_paths) <= 1:
+            return [parse(file_path) for file_path in file_paths]
+        return list(self._thread_pool(max_workers).map(parse, file_paths))
+
+    def _thread_pool(self, max_workers: int) -> ThreadPoolExecutor:
+        """The analyzer's parse pool, created on first use and kept warm between calls."""
+        if self._pool is None or self._pool_size != max_workers:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='parse')
+            self._pool_size = max_workers
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the parse pool, if parse_files started one."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def parse_directory(self, 
                        directory_path: Union[str, Path], 
                        recursive: bool = True,
-                       file_pattern: str = "*") -> List[Dict[str, Any]]:
+                       file_pattern: str = "*",
+                       prune_profile: Union[str, PruneProfile, None] = None,
+                       max_workers: int = 1) -> List[Dict[str, Any]]:
         """
         Parse all supported files in a directory and return their ASTs.
         
+        Vendored, build and VCS directories and anything matched by a .gitignore
+        file are not visited (see file_discovery).
+        
         Args:
             directory_path (Union[str, Path]): Path to the directory
             recursive (bool): Whether to scan subdirectories recursively
             file_pattern (str): Pattern to match files (e.g., "*.py" for Python files only)
+            prune_profile (Union[str, PruneProfile, None]): Pruning profile applied to every file
+            max_workers (int): Threads parsing in parallel (see parse_files)
             
         Returns:
             List[Dict[str, Any]]: List of JSON representations of ASTs
@@ -165,33 +468,46 @@ class TreeSitterAnalyzer:
             logging.error(f"Directory not found: {directory_path}")
             return []
 
-        results = []
-        pattern = "**/*" if recursive else "*"
-        for file_path in directory_path.glob(pattern + file_pattern):
-            if file_path.is_file() and file_path.suffix in self.parsers:
-                ast = self.parse_file(file_path)
-                if ast:
-                    results.append(ast)
-
+        self.cancel_event.clear()
+        discovery = FileDiscovery(tuple(self.parsers), max_depth=None if recursive else 0)
+        file_paths = [file_path for file_path in discovery.discover(str(directory_path))
+                      if matches_pattern(file_path, file_pattern)]
+        results = [ast for ast in self.parse_files(file_paths, prune_profile, max_workers) if ast]
+        if self.cancel_event.is_set():
+            logging.warning(f"Parsing of {directory_path} cancelled")
         return results
 
     def save_ast_to_json(self, 
                         ast_data: Union[Dict[str, Any], List[Dict[str, Any]]], 
-                        output_path: Union[str, Path]) -> None:
+                        output_path: Union[str, Path],
+                        compact: bool = False) -> None:
         """
         Save AST data to a JSON file.
         
         Args:
             ast_data (Union[Dict[str, Any], List[Dict[str, Any]]]): AST data to save
             output_path (Union[str, Path]): Path to save the JSON file
+            compact (bool): Write the string-interned compact schema (see compact_schema)
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(ast_data, f, indent=2, ensure_ascii=False)
+            compact_schema.dump(ast_data, output_path, compact)
             logging.info(f"AST data saved to {output_path}")
         except Exception as e:
             logging.error(f"Error saving AST data: {str(e)}")
 
+    @staticmethod
+    def load_ast_json(input_path: Union[str, Path]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Load AST data saved by save_ast_to_json, in either the full or compact schema.
+        
+        Args:
+            input_path (Union[str, Path]): Path of the JSON file
+            
+        Returns:
+            Union[Dict[str, Any], List[Dict[str, Any]]]: AST data in the full schema
+        """
+        return compact_schema.load(input_path)
+
 def main():
     """Example usage of the TreeSitterAnalyzer."""
     # Initialize the analyzer
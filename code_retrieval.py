@@ -0,0 +1,342 @@
+import os
+import re
+import hashlib
+import tempfile
+import math
+import heapq
+import logging
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import serializer
+from code_analyzer import TreeSitterAnalyzer, ParsedTree, TREE
+from content_dedup import content_digest
+from file_discovery import discover_files
+from source_map import mapped_source, node_text
+
+INDEX_VERSION = 1
+CHUNK_TYPES = ('function_declaration', 'method_declaration', 'type_declaration')
+# Okapi BM25 parameters: term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+# Name terms count this many times, so a query naming a declaration ranks it first
+NAME_WEIGHT = 3
+
+_CAMEL = re.compile(r'([a-z0-9])([A-Z])')
+_ACRONYM = re.compile(r'([A-Z]+)([A-Z][a-z])')
+_SEPARATORS = re.compile(r'[^A-Za-z0-9]+')
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+def tokenize(text: str) -> List[str]:
+    """Split identifiers and prose into lowercase terms (camelCase and snake_case aware)."""
+    text = _ACRONYM.sub(r'\1 \2', _CAMEL.sub(r'\1 \2', text))
+    return [term for term in _SEPARATORS.split(text.lower()) if term]
+
+def _identifier_terms(text: str) -> List[str]:
+    """Whole lowercased identifiers that tokenize splits, so 'NewServer' also matches as one term."""
+    return [identifier.lower() for identifier in _IDENTIFIER.findall(text) if len(tokenize(identifier)) > 1]
+
+def _declaration_name(node, source: bytes) -> str:
+    if node.type == 'type_declaration':
+        # A grouped declaration, type ( A ...; B ... ), is one chunk named after all its types
+        names = [spec.child_by_field_name('name') for spec in node.named_children
+                 if spec.type in ('type_spec', 'type_alias')]
+        return ', '.join(node_text(name, source) for name in names if name is not None)
+    name = node.child_by_field_name('name')
+    return node_text(name, source) if name is not None else ''
+
+def _doc_comment(node, source: bytes) -> Tuple[str, int]:
+    """Text and first row of the comment block directly above a declaration."""
+    comments = []
+    row = node.start_point[0]
+    sibling = node.prev_named_sibling
+    while sibling is not None and sibling.type == 'comment' and sibling.end_point[0] == row - 1:
+        comments.append(node_text(sibling, source))
+        row = sibling.start_point[0]
+        sibling = sibling.prev_named_sibling
+    return '\n'.join(reversed(comments)), row
+
+def chunk_tree(parsed: ParsedTree, chunk_types: Iterable[str] = CHUNK_TYPES) -> List[Dict[str, Any]]:
+    """
+    Split a parsed file into declaration-level chunks.
+
+    Args:
+        parsed: Native parse of the file (parse_file with output=TREE)
+        chunk_types: Top-level node types that become chunks
+
+    Returns:
+        List of chunks with the declaration 'kind', 'name', 'receiver' (methods),
+        first and last 'lines' (1-based, doc comment included) and 'text'
+    """
+    if parsed.tree is None:
+        return []
+    chunk_types = frozenset(chunk_types)
+    source = parsed.source
+    chunks = []
+    for node in parsed.tree.root_node.named_children:
+        if node.type not in chunk_types:
+            continue
+        comment, first_row = _doc_comment(node, source)
+        chunk = {
+            'kind': node.type,
+            'name': _declaration_name(node, source),
+            'lines': [first_row + 1, node.end_point[0] + 1],
+            'text': (comment + '\n' if comment else '') + node_text(node, source)
+        }
+        receiver = node.child_by_field_name('receiver') if node.type == 'method_declaration' else None
+        if receiver is not None:
+            chunk['receiver'] = node_text(receiver, source)
+        chunks.append(chunk)
+    return chunks
+
+class CodeIndex:
+    """
+    BM25 retrieval over the function, method and type declarations of a project.
+
+    Every declaration is a document whose terms are the identifiers and words
+    of its source and doc comment, split on camelCase and snake_case, with its
+    name and its file's path weighted in. Postings map each term to the
+    documents containing it and their term frequencies, so a query only
+    touches the postings of its own terms: top-k takes milliseconds however
+    large the project.
+
+    The index persists as one JSON file and is updated per file: a file whose
+    size, modification time and then content digest are unchanged is not
+    parsed again, and a changed or deleted file's documents are replaced in
+    place. Everything runs offline on the tree-sitter parse.
+    """
+
+    def __init__(self,
+                 index_path: Union[str, Path, None] = None,
+                 analyzer: Optional[TreeSitterAnalyzer] = None,
+                 chunk_types: Iterable[str] = CHUNK_TYPES):
+        """
+        Args:
+            index_path: JSON file the index is loaded from and saved to
+            analyzer: Analyzer parsing the files; a default TreeSitterAnalyzer if None
+            chunk_types: Top-level node types indexed as documents
+        """
+        self.index_path = Path(index_path) if index_path is not None else None
+        self.analyzer = analyzer
+        self.chunk_types = tuple(chunk_types)
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self.next_id = 0
+        self.stats = {'files_indexed': 0, 'files_unchanged': 0, 'files_removed': 0, 'files_read': 0}
+        if self.index_path is not None and self.index_path.exists():
+            self.load()
+
+    def load(self) -> None:
+        """Load the index from index_path; an unreadable or outdated index starts empty."""
+        try:
+            data = serializer.load(self.index_path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable index {self.index_path}: {str(e)}")
+            return
+        if data.get('version') != INDEX_VERSION or data.get('chunk_types') != list(self.chunk_types):
+            return
+        self.docs = {int(doc_id): doc for doc_id, doc in data['docs'].items()}
+        # Postings are stored flat, [doc, tf, doc, tf, ...], to keep the file small
+        self.postings = {term: dict(zip(flat[::2], flat[1::2])) for term, flat in data['postings'].items()}
+        self.files = data['files']
+        self.total_length = data['total_length']
+        self.next_id = data['next_id']
+
+    def save(self) -> None:
+        """Write the index to index_path."""
+        if self.index_path is None:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'chunk_types': list(self.chunk_types),
+            'docs': {str(doc_id): doc for doc_id, doc in self.docs.items()},
+            'postings': {term: [value for pair in docs.items() for value in pair]
+                         for term, docs in self.postings.items()},
+            'files': self.files,
+            'total_length': self.total_length,
+            'next_id': self.next_id
+        }
+        tmp_path = self.index_path.with_suffix('.tmp')
+        serializer.dump(data, tmp_path, compact=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _remove_file(self, rel_path: str) -> None:
+        entry = self.files.pop(rel_path, None)
+        if entry is None:
+            return
+        for doc_id in entry['docs']:
+            doc = self.docs.pop(doc_id)
+            self.total_length -= doc['length']
+            for term in doc['terms']:
+                postings = self.postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self.postings[term]
+
+    def _add_chunk(self, rel_path: str, chunk: Dict[str, Any]) -> int:
+        frequencies: Dict[str, int] = {}
+        for term in tokenize(chunk['text']) + tokenize(rel_path):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term in (tokenize(chunk['name']) + _identifier_terms(chunk['name'])) * (NAME_WEIGHT - 1):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        doc_id = self.next_id
+        self.next_id += 1
+        length = sum(frequencies.values())
+        doc = {key: value for key, value in chunk.items() if key != 'text'}
+        doc.update({'file': rel_path, 'length': length, 'terms': list(frequencies)})
+        self.docs[doc_id] = doc
+        self.total_length += length
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        return doc_id
+
+    def index_file(self, root: Union[str, Path], file_path: Union[str, Path]) -> bool:
+        """
+        Bring the documents of one file up to date.
+
+        Args:
+            root: Project root; documents record paths relative to it
+            file_path: Source file to index
+
+        Returns:
+            bool: Whether the file was (re)indexed; False if it was unchanged or failed to parse
+        """
+        rel_path = os.path.relpath(file_path, root)
+        st = os.stat(file_path)
+        entry = self.files.get(rel_path)
+        if entry is not None and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            self.stats['files_unchanged'] += 1
+            return False
+        with mapped_source(file_path) as source:
+            digest = content_digest(source)
+        self.stats['files_read'] += 1
+        if entry is not None and entry['digest'] == digest:
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            self.stats['files_unchanged'] += 1
+            return False
+
+        if self.analyzer is None:
+            self.analyzer = TreeSitterAnalyzer()
+        parsed = self.analyzer.parse_file(file_path, output=TREE)
+        if parsed is None:
+            # The old documents describe content that is gone
+            self._remove_file(rel_path)
+            return False
+        self._remove_file(rel_path)
+        self.files[rel_path] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'digest': digest,
+            'docs': [self._add_chunk(rel_path, chunk) for chunk in chunk_tree(parsed, self.chunk_types)]
+        }
+        self.stats['files_indexed'] += 1
+        return True
+
+    def update(self, root: Union[str, Path], file_paths: Optional[Iterable[str]] = None,
+               extensions: Tuple[str, ...] = ('.go',)) -> int:
+        """
+        Index the source files of a project incrementally and save the index.
+
+        Files indexed earlier but no longer present are removed.
+
+        Args:
+            root: Project root directory
+            file_paths: Files to index; every file with one of extensions under root if None
+            extensions: File extensions discovered when file_paths is None
+
+        Returns:
+            int: Number of files (re)indexed
+        """
+        if file_paths is None:
+            file_paths = discover_files(str(root), extensions)
+        present = set()
+        count = 0
+        for file_path in file_paths:
+            present.add(os.path.relpath(file_path, root))
+            try:
+                count += self.index_file(root, file_path)
+            except (OSError, ValueError) as e:
+                logging.error(f"Error indexing {file_path}: {str(e)}")
+        for rel_path in [path for path in self.files if path not in present]:
+            self._remove_file(rel_path)
+            self.stats['files_removed'] += 1
+        self.save()
+        return count
+
+    def search(self, query: str, k: int = 10, root: Union[str, Path, None] = None) -> List[Dict[str, Any]]:
+        """
+        The k declarations most relevant to a query, by BM25 score.
+
+        Args:
+            query: Natural-language or identifier query
+            k: Number of results
+            root: Project root; when given, each result carries its source 'text'
+
+        Returns:
+            List of documents (file, kind, name, lines, ...) with their 'score', best first
+        """
+        if not self.docs:
+            return []
+        count = len(self.docs)
+        average_length = self.total_length / count
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query) + _identifier_terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = K1 * (1 - B + B * self.docs[doc_id]['length'] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+
+        results = []
+        for doc_id, score in heapq.nlargest(k, scores.items(), key=lambda pair: pair[1]):
+            doc = {key: value for key, value in self.docs[doc_id].items() if key != 'terms'}
+            doc['score'] = round(score, 4)
+            if root is not None:
+                doc['text'] = self._source_lines(os.path.join(root, doc['file']), doc['lines'])
+            results.append(doc)
+        return results
+
+    @staticmethod
+    def _source_lines(file_path: str, lines: List[int]) -> str:
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                return ''.join(line for number, line in enumerate(f, 1) if lines[0] <= number <= lines[1])
+        except OSError as e:
+            logging.error(f"Error reading {file_path}: {str(e)}")
+            return ''
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Retrieve the declarations of a project most relevant to a query')
+    parser.add_argument('root', help='Project directory')
+    parser.add_argument('query', help='Natural-language or identifier query')
+    parser.add_argument('-k', type=int, default=10, help='Number of results')
+    parser.add_argument('--index', help='Index file (default: one per project in the temp directory)')
+    parser.add_argument('--source', action='store_true', help='Print the source of each result')
+    return parser.parse_args()
+
+def main():
+    """Example usage: update a project's index and print the best matches of a query."""
+    import time
+
+    args = parse_args()
+    # Kept out of the project by default, so the index never shows up in its sources or status
+    project_key = hashlib.blake2b(os.path.abspath(args.root).encode('utf-8'), digest_size=8).hexdigest()
+    index = CodeIndex(args.index or os.path.join(tempfile.gettempdir(), f"code_index_{project_key}.json"))
+    index.update(args.root)
+    print(f"Index: {len(index.docs)} declarations in {len(index.files)} files, {index.stats}")
+
+    start = time.perf_counter()
+    results = index.search(args.query, args.k, args.root if args.source else None)
+    print(f"Top {len(results)} in {(time.perf_counter() - start) * 1000:.1f} ms:")
+    for result in results:
+        print(f"{result['score']:8.3f}  {result['file']}:{result['lines'][0]}  {result['kind']} {result['name']}")
+        if args.source:
+            print(result['text'])
+
+if __name__ == "__main__":
+    main()
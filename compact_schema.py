@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Dict, List, Any, Union
+
+import serializer
+
+# Schema tag written into compact documents; full documents carry no tag
+COMPACT_SCHEMA = 'compact-ast'
+COMPACT_VERSION = 1
+
+NODE_KEYS = frozenset(['type', 'start_point', 'end_point', 'children', 'text'])
+NODE_MARKER = '$ast'
+
+class StringTable:
+    """Interns node types and leaf texts into a list of unique strings."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self.strings)
+            self._ids[value] = index
+            self.strings.append(value)
+        return index
+
+def _is_ast_node(value: Any) -> bool:
+    """Check whether a dict is an AST node as produced by _node_to_dict."""
+    return (
+        isinstance(value, dict) and
+        'type' in value and 'start_point' in value and
+        'end_point' in value and 'children' in value and
+        value.keys() <= NODE_KEYS
+    )
+
+def _pack_node(node: Dict[str, Any], table: StringTable) -> List[Any]:
+    """
+    Pack a node as [type, start_row, start_col, end_row, end_col(, children)(, text)].
+
+    Children are a nested list of packed nodes and text is a string table index,
+    so the arity and element types are enough to decode the node again.
+    """
+    start = node['start_point']
+    end = node['end_point']
+    packed = [table.intern(node['type']), start['row'], start['column'], end['row'], end['column']]
+    if node['children']:
+        packed.append([_pack_node(child, table) for child in node['children']])
+    if 'text' in node:
+        packed.append(table.intern(node['text']))
+    return packed
+
+def _unpack_node(packed: List[Any], strings: List[str]) -> Dict[str, Any]:
+    """Inverse of _pack_node."""
+    node = {
+        'type': strings[packed[0]],
+        'start_point': {'row': packed[1], 'column': packed[2]},
+        'end_point': {'row': packed[3], 'column': packed[4]},
+        'children': []
+    }
+    for extra in packed[5:]:
+        if isinstance(extra, list):
+            node['children'] = [_unpack_node(child, strings) for child in extra]
+        else:
+            node['text'] = strings[extra]
+    return node
+
+def _encode_value(value: Any, table: StringTable) -> Any:
+    if _is_ast_node(value):
+        return {NODE_MARKER: _pack_node(value, table)}
+    if isinstance(value, dict):
+        return {key: _encode_value(item, table) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode_value(item, table) for item in value]
+    return value
+
+def _decode_value(value: Any, strings: List[str]) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and NODE_MARKER in value:
+            return _unpack_node(value[NODE_MARKER], strings)
+        return {key: _decode_value(item, strings) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item, strings) for item in value]
+    return value
+
+def encode(data: Any) -> Dict[str, Any]:
+    """
+    Convert analysis data to the compact schema.
+
+    Every AST node found anywhere in the data is packed into an array, and node
+    types and leaf texts are replaced by indexes into a shared string table.
+
+    Args:
+        data: Output of parse_file/parse_directory or any structure embedding ASTs
+
+    Returns:
+        Compact document
+    """
+    table = StringTable()
+    return document(_encode_value(data, table), table)
+
+def document(encoded: Any, table: StringTable) -> Dict[str, Any]:
+    """
+    Wrap already encoded data, e.g. nodes packed straight from a tree-sitter tree
+    as {NODE_MARKER: packed}, into a compact document.
+    """
+    return {
+        'schema': COMPACT_SCHEMA,
+        'version': COMPACT_VERSION,
+        'strings': table.strings,
+        'data': encoded
+    }
+
+def is_compact(document: Any) -> bool:
+    """Check whether a loaded document uses the compact schema."""
+    return isinstance(document, dict) and document.get('schema') == COMPACT_SCHEMA
+
+def decode(document: Dict[str, Any]) -> Any:
+    """
+    Restore the full schema from a compact document.
+
+    Raises:
+        ValueError: If the document uses an unsupported schema version
+    """
+    if document.get('version') != COMPACT_VERSION:
+        raise ValueError(f"Unsupported {COMPACT_SCHEMA} version: {document.get('version')}")
+    return _decode_value(document['data'], document['strings'])
+
+def dump(data: Any, output_path: Union[str, Path], compact: bool = True) -> None:
+    """
+    Write analysis data in the compact schema (default) or the full indented schema.
+
+    Args:
+        data: Analysis data to save
+        output_path: Path of the JSON file
+        compact: Use the compact schema without indentation
+    """
+    serializer.dump(encode(data) if compact else data, output_path, compact)
+
+def load(input_path: Union[str, Path]) -> Any:
+    """
+    Load an analysis JSON file, auto-detecting the compact or full schema.
+
+    Args:
+        input_path: Path of the JSON file
+
+    Returns:
+        Analysis data in the full schema
+    """
+    document = serializer.load(input_path)
+    return decode(document) if is_compact(document) else document
@@ -0,0 +1,74 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple, Union
+
+def content_digest(content) -> str:
+    """Digest of file content (bytes or a mapped buffer) used to detect identical copies."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+# Parse results kept per cache; each holds a whole AST, so the bound caps memory
+DEFAULT_MAX_ENTRIES = 256
+
+class ParseCache:
+    """
+    Parse results keyed by content digest for the duration of a run.
+
+    Identical files (vendored copies, forks analyzed side by side) are parsed
+    once; every later copy gets a new record sharing the first copy's AST, with
+    its own file_path and a duplicate_of pointer to the parsed path. ASTs are
+    shared, not copied, so consumers must treat them as read-only.
+
+    At most max_entries results are kept, least recently used first out, so a
+    copy is only recognized while its original is still cached.
+    """
+
+    def __init__(self, max_entries: Optional[int] = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Results kept at most (None keeps every result for the cache's lifetime)
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self.stats = {'unique': 0, 'duplicates': 0}
+
+    @staticmethod
+    def key(content, *variant: Hashable) -> Tuple:
+        """
+        Cache key of a parse.
+
+        Args:
+            content: Source content
+            variant: Everything else that shapes the result, e.g. language and pruning profile
+        """
+        return (content_digest(content),) + variant
+
+    def get(self, key: Tuple, file_path: Union[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result rewritten for file_path, or None on a miss.
+
+        Path-dependent entries of the cached record (its file_policy decision) are left out.
+        Parsing the cached path again is not a duplicate and returns a plain copy.
+        """
+        record = self._entries.get(key)
+        if record is None:
+            return None
+        self._entries.move_to_end(key)
+        if record['file_path'] == str(file_path):
+            return dict(record)
+        self.stats['duplicates'] += 1
+        result = {**record, 'file_path': str(file_path), 'duplicate_of': record['file_path']}
+        result.pop('file_policy', None)
+        return result
+
+    def put(self, key: Tuple, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a parse result; returns a shallow copy the caller may annotate without touching the cache."""
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.stats['unique'] += 1
+        return dict(record)
+
+    def clear(self) -> None:
+        """Drop all cached results, e.g. between runs."""
+        self._entries.clear()
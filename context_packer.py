@@ -0,0 +1,396 @@
+import os
+import sys
+import math
+import hashlib
+import tempfile
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+from cgra_analyzer import CGRAAnalyzer
+from code_retrieval import tokenize
+from file_discovery import discover_files
+import serializer
+
+SUMMARY_CACHE_VERSION = 1
+
+class ContextPacker:
+    """
+    Packs CGRA and architecture analysis results into a compact context bundle
+    that fits an LLM token budget. Components, interfaces and methods are ranked
+    by relevance to a query, and per-file summaries are cached between runs.
+
+    Cached summaries depend on the analyzer's pruning profile and file policy,
+    so a persisted cache is only reused when it was written with the same
+    settings. They leave out the path they are reported under, which is set
+    on every lookup.
+    """
+
+    # Tie-breaking weight per item kind when scores are otherwise equal
+    KIND_WEIGHTS = {
+        'interface': 1.0,
+        'type': 0.9,
+        'component': 0.8,
+        'method': 0.7,
+        'function': 0.6,
+        'channel': 0.3
+    }
+
+    DECLARATION_TYPES = ['function_declaration', 'method_declaration', 'type_declaration']
+
+    def __init__(self,
+                 analyzer: Optional[CGRAAnalyzer] = None,
+                 cache_path: Optional[str] = None,
+                 chars_per_token: int = 4):
+        """
+        Initialize the packer.
+
+        Args:
+            analyzer: CGRAAnalyzer used to summarize source files
+            cache_path: JSON file holding per-file summaries across runs
+            chars_per_token: Characters per token used for budget estimation
+        """
+        self.analyzer = analyzer
+        self.cache_path = cache_path
+        self.chars_per_token = chars_per_token
+        self.items: List[Dict[str, Any]] = []
+        self._seen: set = set()
+        profile = analyzer.prune_profile if analyzer is not None else None
+        policy = analyzer.file_policy if analyzer is not None else None
+        self.settings = (f"profile={profile.name if profile is not None else 'full'};"
+                         f"policy={policy.fingerprint() if policy is not None else 'none'}")
+        self._summary_cache = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Any]:
+        """Load the per-file summary cache, if any was written with the same settings."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            cache = serializer.load(self.cache_path)
+        except Exception as e:
+            logging.error(f"Error loading summary cache {self.cache_path}: {str(e)}")
+            return {}
+        # Summaries computed with another profile or file policy differ for the same file
+        if cache.get('version') != SUMMARY_CACHE_VERSION or cache.get('settings') != self.settings:
+            return {}
+        return cache.get('files', {})
+
+    def save_cache(self) -> None:
+        """Persist the per-file summary cache together with the settings it was computed with."""
+        if not self.cache_path:
+            return
+        try:
+            serializer.dump({'version': SUMMARY_CACHE_VERSION, 'settings': self.settings,
+                             'files': self._summary_cache}, self.cache_path, compact=True)
+        except Exception as e:
+            logging.error(f"Error saving summary cache: {str(e)}")
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Split identifiers and prose into lowercase terms (camelCase and snake_case aware)."""
+        return tokenize(text)
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Estimate the token count of a piece of text."""
+        return max(1, math.ceil(len(text) / self.chars_per_token))
+
+    @staticmethod
+    def _leaf_text(node: Dict, types: List[str]) -> str:
+        """Return the text of the first direct child with one of the given types."""
+        for child in node.get('children', []):
+            if child.get('type') in types and 'text' in child:
+                return child['text']
+        return ''
+
+    def _declaration_info(self, node: Dict) -> Optional[Dict[str, Any]]:
+        """Summarize a top-level declaration node."""
+        line = node.get('start_point', {}).get('row', 0) + 1
+        if node['type'] == 'function_declaration':
+            return {'kind': 'function', 'name': self._leaf_text(node, ['identifier']), 'line': line}
+        if node['type'] == 'method_declaration':
+            receiver = ''
+            for child in node.get('children', []):
+                if child['type'] == 'parameter_list':
+                    receiver = ' '.join(self._leaf_texts(child, ['type_identifier']))
+                    break
+            return {
+                'kind': 'method',
+                'name': self._leaf_text(node, ['field_identifier']),
+                'line': line,
+                'detail': f"receiver {receiver}" if receiver else ''
+            }
+        if node['type'] == 'type_declaration':
+            for spec in node.get('children', []):
+                if spec['type'] != 'type_spec':
+                    continue
+                kind = 'type'
+                members = []
+                for child in spec.get('children', []):
+                    if child['type'] == 'interface_type':
+                        kind = 'interface'
+                        members = self._leaf_texts(child, ['field_identifier'])
+                    elif child['type'] == 'struct_type':
+                        members = self._leaf_texts(child, ['field_identifier'])
+                return {
+                    'kind': kind,
+                    'name': self._leaf_text(spec, ['type_identifier']),
+                    'line': line,
+                    'detail': ', '.join(members)
+                }
+        return None
+
+    @staticmethod
+    def _leaf_texts(node: Dict, types: List[str]) -> List[str]:
+        """Collect texts of all descendant leaves with one of the given types."""
+        texts = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.get('type') in types and 'text' in current:
+                texts.append(current['text'])
+            stack.extend(reversed(current.get('children', [])))
+        return texts
+
+    def summarize_file(self, file_path: str, relative_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Summarize one source file, reusing the cached summary when the file is unchanged.
+
+        Args:
+            file_path: Path to the source file
+            relative_path: Path recorded in the summary (defaults to file_path)
+
+        Returns:
+            Summary with declarations, CGRA components and channel counts, or None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logging.error(f"Cannot stat {file_path}: {str(e)}")
+            return None
+
+        cache_key = os.path.abspath(file_path)
+        cached = self._summary_cache.get(cache_key)
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return {'file': relative_path or file_path, **cached['summary']}
+
+        if self.analyzer is None:
+            self.analyzer = CGRAAnalyzer()
+        ast_data = self.analyzer.parse_file(file_path)
+        if not ast_data:
+            return None
+
+        summary = {
+            'file': relative_path or file_path,
+            'declarations': [],
+            'components': [],
+            'channels': 0
+        }
+        for node in ast_data['ast'].get('children', []):
+            if node['type'] in self.DECLARATION_TYPES:
+                info = self._declaration_info(node)
+                if info and info['name']:
+                    summary['declarations'].append(info)
+
+        components = self.analyzer.analyze_cgra_components(ast_data)
+        seen_components = set()
+        for comp_type, entries in components.items():
+            if comp_type == 'relationships':
+                continue
+            for entry in entries:
+                name = entry.get('name', '')
+                if not name or name.startswith(('//', '/*')) or (comp_type, name) in seen_components:
+                    continue
+                seen_components.add((comp_type, name))
+                summary['components'].append({
+                    'kind': 'component',
+                    'name': name,
+                    'line': entry['location']['start'].get('row', 0) + 1,
+                    'detail': comp_type
+                })
+        summary['channels'] = len(self.analyzer.analyze_dataflow(ast_data)['channels'])
+
+        # The reported path depends on the caller's root; it is set on lookup instead
+        self._summary_cache[cache_key] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'summary': {key: value for key, value in summary.items() if key != 'file'}
+        }
+        return summary
+
+    def _add_item(self, kind: str, name: str, file: Optional[str] = None,
+                  line: Optional[int] = None, detail: str = '') -> None:
+        """Register a rankable item, ignoring duplicates."""
+        key = (kind, name, file)
+        if not name or key in self._seen:
+            return
+        self._seen.add(key)
+        terms = self._tokenize(' '.join([name, detail, file or '']))
+        self.items.append({
+            'kind': kind,
+            'name': name,
+            'file': file,
+            'line': line,
+            'detail': detail,
+            'terms': terms
+        })
+
+    def add_file_summary(self, summary: Dict[str, Any]) -> None:
+        """Add the declarations and components of a file summary as rankable items."""
+        for entry in summary['declarations'] + summary['components']:
+            self._add_item(entry['kind'], entry['name'], summary['file'],
+                           entry.get('line'), entry.get('detail', ''))
+        if summary.get('channels'):
+            self._add_item('channel', f"{summary['channels']} channel operations",
+                           summary['file'], None, 'send receive dataflow')
+
+    def collect_project(self, project_path: str, extensions: Tuple[str, ...] = ('.go',)) -> int:
+        """
+        Summarize every source file of a project, the same files analyze_cgra_project visits.
+
+        Args:
+            project_path: Path to the project root directory
+            extensions: File extensions to include
+
+        Returns:
+            Number of files summarized
+        """
+        count = 0
+        for file_path in discover_files(project_path, extensions):
+            summary = self.summarize_file(file_path, os.path.relpath(file_path, project_path))
+            if summary:
+                self.add_file_summary(summary)
+                count += 1
+        self.save_cache()
+        return count
+
+    def add_cgra_analysis(self, analysis: Dict[str, Any]) -> None:
+        """Add components from an analyze_cgra_project result."""
+        for comp_type, entries in analysis.get('components', {}).items():
+            if comp_type == 'relationships':
+                continue
+            for entry in entries:
+                name = entry.get('name', '')
+                if name.startswith(('//', '/*')):
+                    continue
+                interface = entry.get('interface', {})
+                for method in interface.get('methods', []):
+                    self._add_item('method', method.get('name', ''), entry.get('file'), None, name)
+                self._add_item('component', name, entry.get('file'),
+                               entry.get('location', {}).get('start', {}).get('row', 0) + 1, comp_type)
+
+    def add_architecture_analysis(self, analysis: Dict[str, Any]) -> None:
+        """Add components and control flow entry points from an ArchitectureAnalyzer result."""
+        for name in analysis.get('components', []):
+            if isinstance(name, str) and not name.startswith(('//', '/*')):
+                self._add_item('component', name)
+        for pattern in analysis.get('control_flow_patterns', []):
+            if pattern.get('node_type') in ('function_declaration', 'method_declaration'):
+                kind = 'method' if pattern['node_type'] == 'method_declaration' else 'function'
+                line = (pattern.get('location', {}).get('start') or {}).get('row')
+                self._add_item(kind, pattern.get('name') or '', None,
+                               line + 1 if line is not None else None, 'control flow')
+
+    def rank(self, query: str) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Rank all items by relevance to a query.
+
+        Exact term matches are weighted by inverse document frequency; prefix
+        matches count for half. Items without any match are dropped.
+        """
+        query_terms = set(self._tokenize(query))
+        if not query_terms:
+            return []
+
+        document_frequency: Dict[str, int] = {}
+        for item in self.items:
+            for term in set(item['terms']):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        total = len(self.items)
+
+        ranked = []
+        for item in self.items:
+            score = 0.0
+            item_terms = set(item['terms'])
+            for term in query_terms:
+                if term in item_terms:
+                    score += math.log(1 + total / document_frequency[term])
+                elif len(term) > 2 and any(t.startswith(term) for t in item_terms):
+                    score += 0.5
+            if score > 0:
+                name_terms = set(self._tokenize(item['name']))
+                if query_terms & name_terms:
+                    score *= 1.5
+                ranked.append((score + self.KIND_WEIGHTS.get(item['kind'], 0.5) * 0.01, item))
+
+        ranked.sort(key=lambda pair: pair[0], reverse=True)
+        return ranked
+
+    @staticmethod
+    def _render_item(item: Dict[str, Any]) -> str:
+        """Render one item as a single line of text."""
+        location = ''
+        if item['file']:
+            location = f" ({item['file']}:{item['line']})" if item['line'] else f" ({item['file']})"
+        detail = f" - {item['detail']}" if item['detail'] else ''
+        return f"{item['kind']} {item['name']}{location}{detail}"
+
+    def pack(self, query: str, token_budget: int = 2000, output_format: str = 'text') -> str:
+        """
+        Emit the most relevant items for a query within a token budget.
+
+        Args:
+            query: Natural-language or identifier query
+            token_budget: Maximum estimated tokens of the bundle
+            output_format: 'text' or 'json'
+
+        Returns:
+            Packed context bundle as a string
+        """
+        header = f"# Context for: {query}"
+        used = self._estimate_tokens(header)
+        selected = []
+        for score, item in self.rank(query):
+            line = self._render_item(item)
+            cost = self._estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                continue
+            used += cost
+            selected.append((score, item, line))
+
+        if output_format == 'json':
+            return serializer.dumps({
+                'query': query,
+                'token_budget': token_budget,
+                'estimated_tokens': used,
+                'items': [
+                    {
+                        'kind': item['kind'],
+                        'name': item['name'],
+                        'file': item['file'],
+                        'line': item['line'],
+                        'detail': item['detail'],
+                        'score': round(score, 3)
+                    }
+                    for score, item, _ in selected
+                ]
+            }, compact=True).decode('utf-8')
+
+        return '\n'.join([header] + [f"- {line}" for _, _, line in selected])
+
+def main():
+    """Pack a project's analysis for a query: context_packer.py <project> <query> [budget]."""
+    if len(sys.argv) < 3:
+        print("Usage: python context_packer.py <project_path> <query> [token_budget]")
+        return
+
+    project_path, query = sys.argv[1], sys.argv[2]
+    budget = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    # The cache lives outside the analyzed tree, one per project
+    project_key = hashlib.blake2b(os.path.abspath(project_path).encode('utf-8'), digest_size=8).hexdigest()
+    packer = ContextPacker(cache_path=os.path.join(tempfile.gettempdir(), f"context_cache_{project_key}.json"))
+    files = packer.collect_project(project_path)
+    logging.info(f"Summarized {files} files")
+    print(packer.pack(query, budget))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,351 @@
+import os
+import logging
+import argparse
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import serializer
+from code_analyzer import TreeSitterAnalyzer, ParsedTree, TREE
+from content_dedup import content_digest
+from edge_aggregator import EdgeAggregator
+from file_discovery import FileDiscovery
+from source_map import mapped_source
+
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx')
+HEADER_EXTENSIONS = ('.h', '.hh', '.hpp', '.hxx')
+# The path of an #include: a string_literal ("a.h"), a system_lib_string (<a.h>)
+# or an identifier for a macro, which cannot be resolved without preprocessing
+INCLUDE_QUERY = '(preproc_include path: (_) @path)'
+INCLUDE_CACHE_VERSION = 1
+
+class CppProject:
+    """
+    Include graph of a C/C++ project.
+
+    Translation units are discovered under the root and their #include
+    directives resolved against the includer's directory (quoted includes
+    only) and then the include paths, in order, like a compiler's -iquote and
+    -I search. Every file reached is parsed at most once per run, however many
+    translation units include it: its directives come from one tree-sitter
+    query over the native tree. Up to keep_trees of those trees (with their
+    source bytes) are kept, most recent first, so that parse() can convert
+    them later without parsing again; the others are released right away.
+
+    Directives are also cached across runs, by content digest, with digests
+    cached by file size and modification time, so an unchanged header is
+    neither parsed nor read on the next run. Resolution is memoized per
+    (directory, name), since thousands of files include the same headers.
+    """
+
+    def __init__(self,
+                 root: Union[str, Path],
+                 include_paths: Optional[Iterable[Union[str, Path]]] = None,
+                 analyzer: Optional[TreeSitterAnalyzer] = None,
+                 cache_path: Union[str, Path, None] = None,
+                 discovery: Optional[FileDiscovery] = None,
+                 keep_trees: Optional[int] = 0):
+        """
+        Args:
+            root: Project directory whose sources are the translation units
+            include_paths: Directories searched for included files, in order;
+                           relative paths are taken from root. Defaults to root
+            analyzer: Analyzer parsing the files; a default TreeSitterAnalyzer if None
+            cache_path: JSON file persisting include directives across runs
+            discovery: Source file discovery; C/C++ sources and headers by default
+            keep_trees: Trees kept from build() for parse(), the most recently parsed
+                        first; 0 keeps none, None keeps all (every source and tree stays resident)
+        """
+        self.root = os.path.realpath(root)
+        self.include_paths = [os.path.realpath(os.path.join(self.root, path))
+                              for path in (include_paths if include_paths is not None else ['.'])]
+        self.analyzer = analyzer or TreeSitterAnalyzer()
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.discovery = discovery or FileDiscovery(SOURCE_EXTENSIONS + HEADER_EXTENSIONS)
+        self.keep_trees = keep_trees
+
+        self._files: Dict[str, List[Any]] = {}
+        self._directives: Dict[str, List[List[Any]]] = {}
+        self._used_digests: Set[str] = set()
+        self._includes: Dict[str, List[Dict[str, Any]]] = {}
+        self._resolved: Dict[Tuple[Optional[str], str], Optional[str]] = {}
+        self._trees: 'OrderedDict[str, ParsedTree]' = OrderedDict()
+        self._records: Dict[Tuple[str, Any], Optional[Dict[str, Any]]] = {}
+        self._queries: Dict[str, Any] = {}
+
+        self.graph: Dict[str, List[str]] = {}
+        self.edges = EdgeAggregator()
+        self.unresolved: List[Dict[str, Any]] = []
+        self._dependents: Optional[Dict[str, List[str]]] = None
+        self.stats = {'files_parsed': 0, 'include_cache_hits': 0, 'files_read': 0,
+                      'resolutions': 0, 'resolution_cache_hits': 0}
+        if self.cache_path is not None and self.cache_path.exists():
+            self._load_cache()
+
+    def _load_cache(self) -> None:
+        try:
+            cache = serializer.load(self.cache_path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable include cache {self.cache_path}: {str(e)}")
+            return
+        if cache.get('version') != INCLUDE_CACHE_VERSION:
+            return
+        self._files = cache.get('files', {})
+        self._directives = cache.get('directives', {})
+
+    def save_cache(self) -> None:
+        """Persist the directives of the files seen this run (older entries are dropped)."""
+        if self.cache_path is None:
+            return
+        cache = {
+            'version': INCLUDE_CACHE_VERSION,
+            'files': {path: entry for path, entry in self._files.items() if entry[2] in self._used_digests},
+            'directives': {digest: self._directives[digest] for digest in self._used_digests
+                           if digest in self._directives}
+        }
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        serializer.dump(cache, tmp_path, compact=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def _name(self, path: str) -> str:
+        """Name of a file in the graph: relative to the root when below it, absolute otherwise."""
+        rel_path = os.path.relpath(path, self.root)
+        return path if rel_path.startswith('..') else rel_path
+
+    def _parsed(self, path: str) -> Optional[ParsedTree]:
+        """Native tree of a file: the one kept from build(), handed over once, or a new parse."""
+        parsed = self._trees.pop(path, None)
+        if parsed is None:
+            parsed = self.analyzer.parse_file(path, output=TREE)
+            if parsed is None:
+                return None
+            self.stats['files_parsed'] += 1
+        return parsed
+
+    def _retain(self, path: str, parsed: ParsedTree) -> None:
+        """Keep a tree for parse(), dropping the oldest beyond keep_trees."""
+        if self.keep_trees is not None and self.keep_trees <= 0:
+            return
+        self._trees[path] = parsed
+        if self.keep_trees is not None and len(self._trees) > self.keep_trees:
+            self._trees.popitem(last=False)
+
+    def _query_directives(self, path: str) -> List[List[Any]]:
+        """[include, system, row, column] of every #include, from one query over the native tree."""
+        parsed = self._parsed(path)
+        if parsed is None or parsed.tree is None:
+            return []
+        ext = Path(path).suffix
+        query = self._queries.get(ext)
+        if query is None:
+            query = self._queries[ext] = self.analyzer.language_for(ext).query(INCLUDE_QUERY)
+        directives = []
+        for node, _ in query.captures(parsed.tree.root_node):
+            text = parsed.source[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+            row, column = node.start_point
+            if node.type == 'system_lib_string':
+                directives.append([text[1:-1], True, row, column])
+            elif node.type == 'string_literal':
+                directives.append([text[1:-1], False, row, column])
+            else:
+                # Computed include (#include MACRO): kept, never resolved
+                directives.append([text, None, row, column])
+        directives.sort(key=lambda directive: (directive[2], directive[3]))
+        self._retain(path, parsed)
+        return directives
+
+    def includes(self, path: Union[str, Path]) -> List[Dict[str, Any]]:
+        """
+        The #include directives of a file, with their resolved targets.
+
+        Args:
+            path: File to read
+
+        Returns:
+            List of dicts with the 'include' as written, whether it is a 'system'
+            include (None for a macro), its 'location' as [row, column] and the
+            'resolved' real path, or None when no include path has the file
+        """
+        path = os.path.realpath(path)
+        found = self._includes.get(path)
+        if found is not None:
+            return found
+        directives: List[List[Any]] = []
+        if Path(path).suffix in self.analyzer.parsers:
+            try:
+                st = os.stat(path)
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                    digest = cached[2]
+                else:
+                    with mapped_source(path) as source:
+                        digest = content_digest(source)
+                    self.stats['files_read'] += 1
+                    self._files[path] = [st.st_size, st.st_mtime_ns, digest]
+                if digest in self._directives:
+                    self.stats['include_cache_hits'] += 1
+                else:
+                    self._directives[digest] = self._query_directives(path)
+                directives = self._directives[digest]
+                self._used_digests.add(digest)
+            except (OSError, ValueError) as e:
+                logging.error(f"Error reading includes of {path}: {str(e)}")
+        # Files without a parser (e.g. extensionless system headers) are leaves
+        includer_dir = os.path.dirname(path)
+        found = [{'include': name, 'system': system, 'location': [row, column],
+                  'resolved': self.resolve(name, system, includer_dir) if system is not None else None}
+                 for name, system, row, column in directives]
+        self._includes[path] = found
+        return found
+
+    def resolve(self, name: str, system: bool, includer_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Find the file an #include names.
+
+        Args:
+            name: Path as written in the directive, e.g. 'sim/core.h'
+            system: Whether it was written <name> (include paths only) or "name"
+                    (the includer's directory first)
+            includer_dir: Directory of the including file
+
+        Returns:
+            Optional[str]: Real path of the included file, or None if it is not found
+        """
+        key = (None if system else includer_dir, name)
+        if key in self._resolved:
+            self.stats['resolution_cache_hits'] += 1
+            return self._resolved[key]
+        self.stats['resolutions'] += 1
+        if os.path.isabs(name):
+            candidates = [name]
+        else:
+            directories = self.include_paths if system or includer_dir is None else [includer_dir] + self.include_paths
+            candidates = [os.path.join(directory, name) for directory in directories]
+        resolved = next((os.path.realpath(candidate) for candidate in candidates if os.path.isfile(candidate)), None)
+        self._resolved[key] = resolved
+        return resolved
+
+    def build(self, files: Optional[Iterable[Union[str, Path]]] = None) -> Dict[str, List[str]]:
+        """
+        Build the include graph from the translation units, following includes
+        breadth first. Headers outside the root are reached through the include
+        paths only; each file is visited once.
+
+        Args:
+            files: Files to start from; every source and header below the root if None
+
+        Returns:
+            Dict[str, List[str]]: Real path of every file reached to the real
+            paths it includes directly, in directive order
+        """
+        if files is None:
+            files = self.discovery.discover(self.root)
+        queue = deque()
+        for file_path in files:
+            path = os.path.realpath(file_path)
+            if path not in self.graph:
+                self.graph[path] = []
+                queue.append(path)
+
+        while queue:
+            path = queue.popleft()
+            targets = self.graph[path]
+            for directive in self.includes(path):
+                target = directive['resolved']
+                if target is None:
+                    self.unresolved.append({'file': self._name(path), 'include': directive['include'],
+                                            'system': directive['system'], 'location': directive['location']})
+                    continue
+                self.edges.add(self._name(path), self._name(target), 'includes', directive['location'])
+                if target not in targets:
+                    targets.append(target)
+                if target not in self.graph:
+                    self.graph[target] = []
+                    queue.append(target)
+        self._dependents = None
+        self.save_cache()
+        return self.graph
+
+    def _closure(self, graph: Dict[str, List[str]], path: Union[str, Path]) -> List[str]:
+        start = os.path.realpath(path)
+        seen = {start}
+        stack = [start]
+        while stack:
+            for target in graph.get(stack.pop(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        seen.discard(start)
+        return sorted(seen)
+
+    def dependencies(self, path: Union[str, Path]) -> List[str]:
+        """Every file a file includes, directly or transitively (include cycles are fine)."""
+        return self._closure(self.graph, path)
+
+    def dependents(self, path: Union[str, Path]) -> List[str]:
+        """Every file that includes a file, directly or transitively: what a change to it affects."""
+        if self._dependents is None:
+            self._dependents = {}
+            for source, targets in self.graph.items():
+                for target in targets:
+                    self._dependents.setdefault(target, []).append(source)
+        return self._closure(self._dependents, path)
+
+    def parse(self, path: Union[str, Path], prune_profile: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Parse record of a file (as TreeSitterAnalyzer.parse_file returns it),
+        shared by every translation unit that includes the file.
+
+        Converts the tree kept from build() when there is one (see keep_trees),
+        so the file is not parsed again; the tree is released once converted.
+        """
+        path = os.path.realpath(path)
+        key = (path, getattr(prune_profile, 'name', prune_profile))
+        if key not in self._records:
+            parsed = self._parsed(path)
+            self._records[key] = self.analyzer.tree_to_record(parsed, prune_profile) if parsed is not None else None
+        return self._records[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form of the graph: files, weighted include edges and unresolved includes."""
+        nodes = []
+        for path, targets in sorted(self.graph.items()):
+            ext = Path(path).suffix
+            nodes.append({
+                'file': self._name(path),
+                'kind': 'source' if ext in SOURCE_EXTENSIONS else 'header',
+                'external': self._name(path) == path,
+                'includes': len(targets)
+            })
+        return {
+            'root': self.root,
+            'include_paths': self.include_paths,
+            'nodes': nodes,
+            'edges': self.edges.edges(),
+            'unresolved': self.unresolved,
+            'stats': self.stats
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the include graph of a C/C++ project')
+    parser.add_argument('root', help='Project directory')
+    parser.add_argument('-I', '--include-path', action='append', dest='include_paths',
+                        help='Include search directory, relative to the root (repeatable; default: the root)')
+    parser.add_argument('--cache', help='JSON file caching include directives across runs')
+    parser.add_argument('--output', default='include_graph.json', help='Output JSON file')
+    return parser.parse_args()
+
+def main():
+    """Example usage: build and save the include graph of a project."""
+    args = parse_args()
+    project = CppProject(args.root, args.include_paths, cache_path=args.cache)
+    project.build()
+    result = project.to_dict()
+    serializer.dump(result, args.output)
+    print(f"{len(result['nodes'])} files, {len(result['edges'])} include edges, "
+          f"{len(result['unresolved'])} unresolved includes")
+    print(f"Stats: {project.stats}")
+    print(f"Include graph saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
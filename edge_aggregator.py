@@ -0,0 +1,70 @@
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+# Source locations kept per edge; occurrences beyond this are only counted
+MAX_LOCATIONS = 16
+
+class EdgeAggregator:
+    """
+    Collapses relationship occurrences into unique weighted edges.
+
+    Every occurrence is hashed into a dict keyed by (from, to, type) as it is
+    extracted, so memory and output grow with the number of distinct edges.
+    Each edge carries its occurrence count and the first max_locations source
+    locations, as compact [row, column] or [file, row, column] lists.
+    """
+
+    def __init__(self, max_locations: int = MAX_LOCATIONS):
+        """
+        Args:
+            max_locations: Source locations kept per edge
+        """
+        self.max_locations = max_locations
+        self._edges: Dict[Tuple[Any, Any, Any], Dict[str, Any]] = {}
+        self.occurrences = 0
+
+    def add(self, source: Any, target: Any, edge_type: str, location: Optional[List[Any]] = None,
+            count: int = 1) -> None:
+        """
+        Record occurrences of an edge.
+
+        Args:
+            source: Name of the source component
+            target: Name of the target component
+            edge_type: Relationship type, e.g. 'contains'
+            location: Compact location of the occurrence, if known
+            count: Number of occurrences recorded at once
+        """
+        key = (source, target, edge_type)
+        edge = self._edges.get(key)
+        if edge is None:
+            edge = self._edges[key] = {'from': source, 'to': target, 'type': edge_type, 'count': 0, 'locations': []}
+        edge['count'] += count
+        self.occurrences += count
+        if location is not None and len(edge['locations']) < self.max_locations:
+            edge['locations'].append(location)
+
+    def merge(self, edges: Iterable[Dict[str, Any]], file: Optional[str] = None) -> None:
+        """
+        Add already aggregated edges, e.g. one file's, prefixing their locations with file.
+
+        Plain relationship records without a count count once.
+        """
+        for edge in edges:
+            key = (edge.get('from'), edge.get('to'), edge.get('type'))
+            self.add(*key, count=edge.get('count', 1))
+            locations = self._edges[key]['locations']
+            for location in edge.get('locations', []):
+                if len(locations) >= self.max_locations:
+                    break
+                locations.append([file] + location if file is not None else location)
+
+    def edges(self) -> List[Dict[str, Any]]:
+        """Unique edges in order of first occurrence."""
+        return list(self._edges.values())
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+def occurrence_count(relationships: Iterable[Dict[str, Any]]) -> int:
+    """Total occurrences of a relationship list, aggregated or not."""
+    return sum(rel.get('count', 1) for rel in relationships)
@@ -0,0 +1,157 @@
+import re
+import fnmatch
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from ast_pruning import PruneProfile, resolve_profile
+
+# Actions a policy can take for a file
+FULL = 'full'
+CHEAP = 'cheap'
+SKIP = 'skip'
+ACTIONS = (FULL, CHEAP, SKIP)
+
+# Header markers of generated code: the Go convention (golang.org/s/generatedcode),
+# which current mockgen follows, the header of older mockgen releases, and the
+# @generated tag used by other generators. A //go:generate directive is not a marker.
+GENERATED_MARKERS = [
+    re.compile(rb'^// Code generated .* DO NOT EDIT\.$', re.MULTILINE),
+    re.compile(rb'^// Automatically generated by MockGen\.', re.MULTILINE),
+    re.compile(rb'@generated\b')
+]
+
+class FilePolicy:
+    """
+    Decides how much effort a source file deserves before it is parsed.
+
+    Files are checked in order for vendored directories, mock file names,
+    generated-code headers (read from the first header_bytes of the file) and
+    size. The first matching rule decides the action: FULL parses normally,
+    CHEAP parses with the cheap pruning profile, SKIP does not parse at all.
+    """
+
+    def __init__(self,
+                 max_size: int = 1024 * 1024,
+                 large_action: str = CHEAP,
+                 generated_action: str = SKIP,
+                 mock_action: str = SKIP,
+                 vendor_action: str = SKIP,
+                 cheap_profile: str = 'declarations',
+                 vendor_dirs: Iterable[str] = ('vendor', 'third_party'),
+                 mock_patterns: Iterable[str] = ('*_mock.go', 'mock_*.go', '*_mock_test.go'),
+                 header_bytes: int = 2048):
+        """
+        Args:
+            max_size: Files larger than this many bytes get large_action
+            large_action: Action for files above max_size
+            generated_action: Action for files with a generated-code header
+            mock_action: Action for files matching mock_patterns
+            vendor_action: Action for files below one of vendor_dirs
+            cheap_profile: Pruning profile used by the CHEAP action
+            vendor_dirs: Directory names holding vendored code
+            mock_patterns: File name patterns of generated mocks
+            header_bytes: Bytes at the start of a file searched for generated-code markers
+        """
+        for action in (large_action, generated_action, mock_action, vendor_action):
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown file policy action: {action}")
+        self.max_size = max_size
+        self.large_action = large_action
+        self.generated_action = generated_action
+        self.mock_action = mock_action
+        self.vendor_action = vendor_action
+        self.cheap_profile = cheap_profile
+        self.vendor_dirs = frozenset(vendor_dirs)
+        self.mock_patterns = list(mock_patterns)
+        self.header_bytes = header_bytes
+        self.stats: Dict[str, int] = {action: 0 for action in ACTIONS}
+
+    def is_vendored(self, file_path: Union[str, Path]) -> bool:
+        """Check whether any directory of the path is a vendor directory."""
+        return any(part in self.vendor_dirs for part in Path(file_path).parts[:-1])
+
+    def is_mock(self, file_path: Union[str, Path]) -> bool:
+        name = Path(file_path).name
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.mock_patterns)
+
+    def is_generated(self, header: bytes) -> bool:
+        """Check the start of a file for generated-code markers."""
+        return any(marker.search(header) for marker in GENERATED_MARKERS)
+
+    def path_action(self, file_path: Union[str, Path]) -> Tuple[str, Optional[str]]:
+        """
+        Decide the action from the rules that only look at the path (vendored, mock).
+
+        The other rules depend on the content and size alone, so results keyed by
+        content stay valid for a path as long as its path_action is the same.
+
+        Returns:
+            (action, reason) where reason is None for FULL
+        """
+        if self.vendor_action != FULL and self.is_vendored(file_path):
+            return self.vendor_action, 'vendored'
+        if self.mock_action != FULL and self.is_mock(file_path):
+            return self.mock_action, 'mock'
+        return FULL, None
+
+    def fingerprint(self) -> str:
+        """Settings that change the decisions of this policy, e.g. to salt caches of parse results."""
+        return repr((self.max_size, self.large_action, self.generated_action, self.mock_action,
+                     self.vendor_action, self.cheap_profile, sorted(self.vendor_dirs),
+                     self.mock_patterns, self.header_bytes))
+
+    def classify(self, file_path: Union[str, Path], size: int, source=None) -> Tuple[str, Optional[str]]:
+        """
+        Decide the action for a file.
+
+        Args:
+            file_path: Path of the file; vendor directories are matched on its parts
+            size: File size in bytes
+            source: File content (bytes or mmap); the header check is skipped without it
+
+        Returns:
+            (action, reason) where reason is None for FULL
+        """
+        checks = [
+            (self.vendor_action, 'vendored', lambda: self.is_vendored(file_path)),
+            (self.mock_action, 'mock', lambda: self.is_mock(file_path)),
+            (self.generated_action, 'generated',
+             lambda: source is not None and self.is_generated(source[:self.header_bytes])),
+            (self.large_action, 'large', lambda: size > self.max_size)
+        ]
+        for action, reason, matches in checks:
+            # Rules configured as FULL are not evaluated at all
+            if action != FULL and matches():
+                self.stats[action] += 1
+                return action, reason
+        self.stats[FULL] += 1
+        return FULL, None
+
+    def apply(self,
+              file_path: Union[str, Path],
+              size: int,
+              source=None,
+              profile: Optional[PruneProfile] = None) -> Tuple[str, Optional[str], Optional[PruneProfile]]:
+        """
+        Classify a file (see classify) and pick the pruning profile it is parsed with.
+
+        Args:
+            file_path: Path of the file
+            size: File size in bytes
+            source: File content, for the generated-code header check
+            profile: Profile the file would be parsed with under FULL
+
+        Returns:
+            (action, reason, profile) where profile is the cheap profile for CHEAP files
+        """
+        action, reason = self.classify(file_path, size, source)
+        if action == CHEAP:
+            profile = resolve_profile(self.cheap_profile)
+        return action, reason, profile
+
+    @staticmethod
+    def annotate(result: Dict, action: str, reason: Optional[str]) -> Dict:
+        """Record a non-FULL decision in a parse result as its 'file_policy' entry."""
+        if reason is not None:
+            result['file_policy'] = {'action': action, 'reason': reason}
+        return result
@@ -0,0 +1,174 @@
+import base64
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SUMMARY_VERSION = 1
+# Node types hash into a fixed bitmap; grammars have a few hundred types, files use far fewer
+TYPE_BITS = 1024
+# Bloom filter sizing: ~1% false positives at 10 bits per trigram and 4 hashes
+BITS_PER_ENTRY = 10
+HASHES = 4
+MIN_BLOOM_BYTES = 32
+
+class FileSummary:
+    """
+    Small per-file summary telling analysis passes which files cannot match.
+
+    Holds a bitmap of the node types in a file's AST and a bloom filter of the
+    lowercased character trigrams of its leaf texts. Both only answer "maybe"
+    or "no": a "no" is exact, so a file can be skipped without changing the
+    result, while a "maybe" just means the file has to be read.
+    """
+
+    def __init__(self, types: bytearray, texts: bytearray, hashes: int = HASHES):
+        self.types = types
+        self.texts = texts
+        self.hashes = hashes
+
+    @classmethod
+    def build(cls, types: Iterable[str], texts: Iterable[str]) -> 'FileSummary':
+        """
+        Summarize the node types and leaf texts of a file.
+
+        Args:
+            types: Node types occurring in the AST
+            texts: Leaf texts occurring in the AST
+        """
+        type_bits = bytearray(TYPE_BITS // 8)
+        for node_type in set(types):
+            bit = _type_bit(node_type)
+            type_bits[bit >> 3] |= 1 << (bit & 7)
+
+        trigrams: Set[str] = set()
+        for text in set(texts):
+            text = text.lower()
+            trigrams.update(text[i:i + 3] for i in range(len(text) - 2))
+        size = max(MIN_BLOOM_BYTES, -(-len(trigrams) * BITS_PER_ENTRY // 64) * 8)
+        text_bits = bytearray(size)
+        bits = size * 8
+        crc32 = zlib.crc32
+        for trigram in trigrams:
+            # _bloom_bits inlined: this loop dominates the cost of a summary
+            h1 = crc32(trigram.encode('utf-8'))
+            h2 = ((h1 * 0x9E3779B1) >> 15 & 0xFFFFFFFF) | 1
+            for i in range(HASHES):
+                bit = (h1 + i * h2) % bits
+                text_bits[bit >> 3] |= 1 << (bit & 7)
+        return cls(type_bits, text_bits)
+
+    def may_have_type(self, node_type: str) -> bool:
+        bit = _type_bit(node_type)
+        return bool(self.types[bit >> 3] & (1 << (bit & 7)))
+
+    def may_have_any_type(self, node_types: Iterable[str]) -> bool:
+        return any(self.may_have_type(node_type) for node_type in node_types)
+
+    def may_contain(self, substring: str) -> bool:
+        """
+        Whether some leaf text may contain substring, ignoring case.
+
+        Substrings shorter than a trigram cannot be ruled out.
+        """
+        substring = substring.lower()
+        size = len(self.texts) * 8
+        for i in range(len(substring) - 2):
+            for bit in _bloom_bits(substring[i:i + 3], size, self.hashes):
+                if not self.texts[bit >> 3] & (1 << (bit & 7)):
+                    return False
+        return True
+
+    def may_contain_any(self, substrings: Iterable[str]) -> bool:
+        return any(self.may_contain(substring) for substring in substrings)
+
+    def to_record(self) -> Dict[str, Any]:
+        """JSON-serializable form, stored as the 'summary' of a parse record."""
+        return {
+            'version': SUMMARY_VERSION,
+            'types': base64.b64encode(bytes(self.types)).decode('ascii'),
+            'texts': base64.b64encode(bytes(self.texts)).decode('ascii'),
+            'hashes': self.hashes
+        }
+
+    @classmethod
+    def from_record(cls, record: Optional[Dict[str, Any]]) -> Optional['FileSummary']:
+        """Inverse of to_record; None for a missing or unsupported summary, which never skips anything."""
+        if not record or record.get('version') != SUMMARY_VERSION:
+            return None
+        return cls(bytearray(base64.b64decode(record['types'])),
+                   bytearray(base64.b64decode(record['texts'])),
+                   record['hashes'])
+
+@lru_cache(maxsize=4096)
+def _type_bit(node_type: str) -> int:
+    return zlib.crc32(node_type.encode('utf-8')) % TYPE_BITS
+
+def _bloom_bits(item: str, size: int, hashes: int) -> List[int]:
+    # Double hashing: bit i is h1 + i * h2 modulo the filter size. CRC-32 is
+    # several times cheaper than a cryptographic hash for the many trigrams of
+    # a file; h2 is mixed from h1 so that it does not depend linearly on it
+    h1 = zlib.crc32(item.encode('utf-8'))
+    h2 = ((h1 * 0x9E3779B1) >> 15 & 0xFFFFFFFF) | 1
+    return [(h1 + i * h2) % size for i in range(hashes)]
+
+def _collect(ast: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+    types: Set[str] = set()
+    texts: Set[str] = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        types.add(node['type'])
+        if 'text' in node:
+            texts.add(node['text'])
+        stack.extend(node.get('children', ()))
+    return types, texts
+
+def summarize_ast(ast: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary record of a dict AST (as produced by _node_to_dict)."""
+    types, texts = _collect(ast)
+    return FileSummary.build(types, texts).to_record()
+
+def summarize_strings(strings: Iterable[str]) -> Dict[str, Any]:
+    """
+    Summary record from a compact_schema string table, which interns node types
+    and leaf texts alike. Every string counts as both, which only adds "maybe"s.
+    """
+    strings = list(strings)
+    return FileSummary.build(strings, strings).to_record()
+
+def stored_summary(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Summary record to store with a parse record: its own 'summary', or one built
+    from its dict AST. Parsing leaves DICT records unsummarized, as a record
+    analyzed right away gains nothing from a summary; stored records are read
+    back many times, so writers summarize them once.
+    """
+    summary = record.get('summary')
+    ast = record.get('ast')
+    if summary is None and isinstance(ast, dict) and 'type' in ast:
+        summary = summarize_ast(ast)
+    return summary
+
+def record_summary(record: Dict[str, Any]) -> Optional[FileSummary]:
+    """Summary stored in a parse record, if any."""
+    return FileSummary.from_record(record.get('summary'))
+
+def main():
+    """Example usage: summarize a source file and test substrings against it."""
+    import sys
+    from code_analyzer import TreeSitterAnalyzer
+
+    if len(sys.argv) < 2:
+        print("Usage: python file_summary.py <source_file> [substring...]")
+        return
+
+    result = TreeSitterAnalyzer().parse_file(sys.argv[1])
+    if not result:
+        return
+    summary = FileSummary.from_record(stored_summary(result))
+    print(f"Summary: {len(summary.types)} type bytes, {len(summary.texts)} bloom bytes")
+    for substring in sys.argv[2:]:
+        print(f"{substring}: {'maybe' if summary.may_contain(substring) else 'no'}")
+
+if __name__ == "__main__":
+    main()
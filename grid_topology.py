@@ -0,0 +1,329 @@
+from array import array
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# Port sides recognized in connection calls, e.g. cgra.East
+SIDES = ['North', 'East', 'South', 'West', 'NorthEast', 'SouthEast', 'SouthWest', 'NorthWest']
+
+Coordinate = Tuple[int, int]
+
+# Bases of the prefixed Go integer literals, keyed by their lowercased prefix
+GO_INT_PREFIXES = {'0x': 16, '0o': 8, '0b': 2}
+
+def parse_go_int(text: str) -> int:
+    """
+    Value of a Go integer literal: decimal, 0x/0o/0b prefixed, or octal with a
+    bare leading zero (010 is 8), with optional _ digit separators.
+
+    Raises:
+        ValueError: If the text is not a Go integer literal
+    """
+    digits = text.replace('_', '')
+    base = GO_INT_PREFIXES.get(digits[:2].lower())
+    if base is not None:
+        return int(digits[2:], base)
+    if len(digits) > 1 and digits[0] == '0':
+        return int(digits[1:], 8)
+    if not digits.isdigit():
+        raise ValueError(f"Not a Go integer literal: {text!r}")
+    return int(digits)
+
+class GridTopology:
+    """
+    Array-backed PE grid. Tile (x, y) is stored at index y * width + x, and a
+    flat neighbor table holds, per tile and side, the index of the tile linked
+    to that port (or -1). Neighbor lookups, bounds checks and region sizes are
+    O(1); region listings, routes and route lengths are linear in their output.
+    """
+
+    def __init__(self, width: int, height: int, links: List[Dict[str, Any]]):
+        """
+        Args:
+            width: Number of tile columns
+            height: Number of tile rows
+            links: Connection rules from GridTopologyExtractor.extract_links, each with
+                   'src_side', 'dst_side', 'dx' and 'dy'. Links are bidirectional.
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Invalid grid size: {width}x{height}")
+        self.width = width
+        self.height = height
+        self.links = links
+        self.sides = [side for side in SIDES if any(side in (l['src_side'], l['dst_side']) for l in links)]
+        self._side_index = {side: i for i, side in enumerate(self.sides)}
+        self._neighbors = array('i', [-1]) * (width * height * max(1, len(self.sides)))
+
+        stride = len(self.sides)
+        for link in links:
+            src_side = self._side_index[link['src_side']]
+            dst_side = self._side_index[link['dst_side']]
+            dx, dy = link['dx'], link['dy']
+            x_lo, x_hi = max(0, -dx), min(width, width - dx)
+            count = x_hi - x_lo
+            if count <= 0:
+                continue
+            # One strided slice assignment per row and direction instead of a per-tile loop
+            for y in range(max(0, -dy), min(height, height - dy)):
+                src = y * width + x_lo
+                dst = (y + dy) * width + x_lo + dx
+                self._neighbors[src * stride + src_side:(src + count) * stride:stride] = array('i', range(dst, dst + count))
+                self._neighbors[dst * stride + dst_side:(dst + count) * stride:stride] = array('i', range(src, src + count))
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x: int, y: int) -> int:
+        """Flat index of a tile."""
+        if not self.contains(x, y):
+            raise IndexError(f"Tile ({x}, {y}) is outside the {self.width}x{self.height} grid")
+        return y * self.width + x
+
+    def coordinate(self, index: int) -> Coordinate:
+        return index % self.width, index // self.width
+
+    def neighbor(self, x: int, y: int, side: str) -> Optional[Coordinate]:
+        """Return the tile connected to a port of tile (x, y), or None."""
+        side_index = self._side_index.get(side)
+        if side_index is None:
+            return None
+        target = self._neighbors[self.index(x, y) * len(self.sides) + side_index]
+        return self.coordinate(target) if target >= 0 else None
+
+    def neighbors(self, x: int, y: int) -> Dict[str, Coordinate]:
+        """Return all connected ports of tile (x, y) by side."""
+        base = self.index(x, y) * len(self.sides)
+        return {
+            side: self.coordinate(self._neighbors[base + i])
+            for i, side in enumerate(self.sides)
+            if self._neighbors[base + i] >= 0
+        }
+
+    def _clip(self, x0: int, y0: int, x1: int, y1: int) -> Tuple[int, int, int, int]:
+        return max(0, min(x0, x1)), max(0, min(y0, y1)), min(self.width - 1, max(x0, x1)), min(self.height - 1, max(y0, y1))
+
+    def region_size(self, x0: int, y0: int, x1: int, y1: int) -> int:
+        """Number of tiles in the inclusive rectangle (x0, y0)-(x1, y1), clipped to the grid."""
+        x0, y0, x1, y1 = self._clip(x0, y0, x1, y1)
+        return max(0, x1 - x0 + 1) * max(0, y1 - y0 + 1)
+
+    def region(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[Coordinate]:
+        """Iterate the tiles of the inclusive rectangle (x0, y0)-(x1, y1), row by row."""
+        x0, y0, x1, y1 = self._clip(x0, y0, x1, y1)
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                yield x, y
+
+    def route_length(self, src: Coordinate, dst: Coordinate) -> int:
+        """
+        Hop count of the dimension-ordered route over the extracted links (see route).
+
+        Raises:
+            ValueError: If a hop has no link in the required direction
+        """
+        return len(self.route(src, dst))
+
+    def route(self, src: Coordinate, dst: Coordinate) -> List[Tuple[Coordinate, str]]:
+        """
+        Dimension-ordered (X then Y) route between two tiles over the extracted links.
+
+        Returns:
+            List of (tile, outgoing side) hops, excluding the destination
+
+        Raises:
+            ValueError: If a hop has no link in the required direction
+        """
+        x, y = src
+        self.index(x, y)
+        self.index(*dst)
+        hops = []
+        while (x, y) != tuple(dst):
+            if x != dst[0]:
+                side = 'East' if dst[0] > x else 'West'
+            else:
+                side = 'South' if dst[1] > y else 'North'
+            nxt = self.neighbor(x, y, side)
+            if nxt is None:
+                raise ValueError(f"No {side} link from tile ({x}, {y})")
+            hops.append(((x, y), side))
+            x, y = nxt
+        return hops
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'sides': self.sides,
+            'links': self.links,
+            'tile_count': len(self)
+        }
+
+class GridTopologyExtractor:
+    """
+    Rebuilds the tile grid of a CGRA from the dict AST of its configuration
+    code (zeonica's config/config.go): the port connection rules from calls
+    such as connectTilePorts(currentTile, cgra.East, eastTile, cgra.West), and
+    the grid size from WithWidth/WithHeight builder calls when they use literals.
+    """
+
+    @staticmethod
+    def _leaves(node: Dict) -> List[Dict]:
+        leaves = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if not current.get('children'):
+                leaves.append(current)
+            stack.extend(reversed(current.get('children', [])))
+        return leaves
+
+    def _iter_nodes(self, node: Dict, node_type: str) -> Iterator[Dict]:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current['type'] == node_type:
+                yield current
+            stack.extend(reversed(current.get('children', [])))
+
+    @staticmethod
+    def _arguments(call: Dict) -> List[Dict]:
+        for child in call.get('children', []):
+            if child['type'] == 'argument_list':
+                return [c for c in child['children'] if c.get('text') not in ('(', ')', ',')]
+        return []
+
+    @staticmethod
+    def _callee_name(call: Dict) -> str:
+        callee = call['children'][0] if call.get('children') else {}
+        if callee.get('type') == 'selector_expression':
+            return callee['children'][-1].get('text', '')
+        return callee.get('text', '')
+
+    def _side_of(self, node: Dict) -> Optional[str]:
+        """Return the side named by an argument such as cgra.East."""
+        if node['type'] != 'selector_expression':
+            return None
+        field = node['children'][-1].get('text')
+        return field if field in SIDES else None
+
+    def _offsets(self, expression: Dict) -> Optional[Tuple[int, int]]:
+        """
+        Offset (dx, dy) of a tile expression such as dev.Tiles[y][x+1], relative to (x, y).
+
+        The bracket groups are read from the leaf tokens, because the Go grammar
+        parses dev.Tiles[y][x] as either an index or a generic type instantiation.
+        """
+        indexes: List[List[str]] = []
+        depth = 0
+        for leaf in self._leaves(expression):
+            text = leaf.get('text', '')
+            if text == '[':
+                depth += 1
+                if depth == 1:
+                    indexes.append([])
+            elif text == ']':
+                depth -= 1
+            elif depth == 1:
+                indexes[-1].append(text)
+        if len(indexes) != 2:
+            return None
+
+        offsets = {}
+        for position, tokens in enumerate(indexes):
+            variable = tokens[0] if tokens else ''
+            delta = 0
+            if len(tokens) == 3 and tokens[1] in ('+', '-'):
+                try:
+                    delta = parse_go_int(tokens[2]) * (1 if tokens[1] == '+' else -1)
+                except ValueError:
+                    return None
+            elif len(tokens) != 1:
+                return None
+            # Name the axis by its variable; fall back to [row][column] order
+            axis = 'x' if variable.lower().endswith('x') else 'y' if variable.lower().endswith('y') else 'yx'[position]
+            offsets[axis] = delta
+        if set(offsets) != {'x', 'y'}:
+            return None
+        return offsets['x'], offsets['y']
+
+    def extract_links(self, ast_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Extract port connection rules from a configuration file.
+
+        Args:
+            ast_data: Full (unpruned) AST data from parse_file
+
+        Returns:
+            Unique links with 'src_side', 'dst_side', 'dx', 'dy' and the connecting 'function'
+        """
+        links = []
+        seen = set()
+        for function in self._iter_nodes(ast_data['ast'], 'method_declaration'):
+            assignments = {}
+            for declaration in self._iter_nodes(function, 'short_var_declaration'):
+                sides = [c for c in declaration['children'] if c['type'] == 'expression_list']
+                if len(sides) == 2 and len(sides[0]['children']) == 1 and len(sides[1]['children']) == 1:
+                    assignments[sides[0]['children'][0].get('text')] = sides[1]['children'][0]
+
+            for call in self._iter_nodes(function, 'call_expression'):
+                arguments = self._arguments(call)
+                side_positions = [i for i, arg in enumerate(arguments) if self._side_of(arg)]
+                if len(side_positions) != 2 or min(side_positions) == 0:
+                    continue
+                tiles = []
+                for position in side_positions:
+                    tile = arguments[position - 1]
+                    tile = assignments.get(tile.get('text'), tile)
+                    tiles.append(self._offsets(tile))
+                if None in tiles:
+                    continue
+                (sx, sy), (tx, ty) = tiles
+                link = {
+                    'src_side': self._side_of(arguments[side_positions[0]]),
+                    'dst_side': self._side_of(arguments[side_positions[1]]),
+                    'dx': tx - sx,
+                    'dy': ty - sy
+                }
+                key = tuple(link.values())
+                if key not in seen:
+                    seen.add(key)
+                    links.append({**link, 'function': self._callee_name(call)})
+        return links
+
+    def extract_dimensions(self, ast_list: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Collect literal WithWidth/WithHeight builder arguments across files (last one wins)."""
+        dimensions = {}
+        for ast_data in ast_list:
+            for call in self._iter_nodes(ast_data['ast'], 'call_expression'):
+                name = self._callee_name(call)
+                if name in ('WithWidth', 'WithHeight'):
+                    arguments = self._arguments(call)
+                    if len(arguments) == 1 and arguments[0]['type'] == 'int_literal':
+                        dimensions[name[4:].lower()] = parse_go_int(arguments[0]['text'])
+        return dimensions
+
+    def build(self, config_ast: Dict[str, Any], width: Optional[int] = None, height: Optional[int] = None,
+              other_asts: Optional[List[Dict[str, Any]]] = None) -> GridTopology:
+        """
+        Build the grid for a configuration file.
+
+        Args:
+            config_ast: AST data of the file that connects the tiles
+            width: Grid width; defaults to a literal WithWidth call found in the ASTs
+            height: Grid height; defaults to a literal WithHeight call found in the ASTs
+            other_asts: Further files (e.g. samples) searched for grid dimensions
+
+        Raises:
+            ValueError: If no connection rules are found or the size is unknown
+        """
+        links = self.extract_links(config_ast)
+        if not links:
+            raise ValueError(f"No tile connections found in {config_ast.get('file_path')}")
+        if width is None or height is None:
+            dimensions = self.extract_dimensions([config_ast] + (other_asts or []))
+            width = width if width is not None else dimensions.get('width')
+            height = height if height is not None else dimensions.get('height')
+        if width is None or height is None:
+            raise ValueError("Grid size not found in the sources; pass width and height explicitly")
+        return GridTopology(width, height, links)
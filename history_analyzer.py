@@ -0,0 +1,223 @@
+import os
+import logging
+import argparse
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+import git
+
+from cgra_analyzer import CGRAAnalyzer
+from arch_analyzer import ArchitectureAnalyzer
+import serializer
+from edge_aggregator import occurrence_count
+
+BLOB_CACHE_VERSION = 1
+
+class HistoryAnalyzer:
+    """
+    Computes architecture metrics across the commit history of a repository.
+
+    File contents are read straight from git objects, so nothing is checked out.
+    Every unique blob SHA is parsed and analyzed exactly once; each commit's
+    metrics are then assembled from the cached per-blob results, and tree
+    listings are memoized per tree SHA so unchanged subtrees cost nothing.
+
+    A blob's result also depends on the analysis settings and, through the
+    file policy, on the path it appears at. Cache entries are keyed by blob
+    SHA, extension and path-based policy decision, and a persisted cache is
+    only reused when it was written with the same settings.
+    """
+
+    def __init__(self,
+                 repo_path: str,
+                 analyzer: Optional[CGRAAnalyzer] = None,
+                 extensions: Tuple[str, ...] = ('.go',),
+                 cache_path: Optional[str] = None):
+        """
+        Args:
+            repo_path: Path to the git repository
+            analyzer: CGRAAnalyzer used to parse blobs (an unpruned one by default, so the
+                      metrics match those of analyze_cgra_project)
+            extensions: Source file extensions to analyze
+            cache_path: JSON file persisting per-blob results between runs
+        """
+        self.repo = git.Repo(repo_path)
+        self.analyzer = analyzer or CGRAAnalyzer()
+        self.arch_analyzer = ArchitectureAnalyzer(repo_path)
+        self.extensions = extensions
+        self.cache_path = cache_path
+        self.blob_cache: Dict[str, Dict[str, Any]] = {}
+        self._tree_cache: Dict[str, List[Tuple[str, str]]] = {}
+        self.stats = {'blobs_parsed': 0, 'blob_cache_hits': 0}
+
+        profile = self.analyzer.prune_profile
+        policy = self.analyzer.file_policy
+        self.settings = (f"profile={profile.name if profile is not None else 'full'};"
+                         f"extensions={','.join(sorted(extensions))};"
+                         f"policy={policy.fingerprint() if policy is not None else 'none'}")
+        if cache_path and os.path.exists(cache_path):
+            cache = serializer.load(cache_path)
+            # A cache written with other settings holds different results for the same blobs
+            if cache.get('version') == BLOB_CACHE_VERSION and cache.get('settings') == self.settings:
+                self.blob_cache = cache['blobs']
+
+    def save_cache(self) -> None:
+        """Persist per-blob results together with the settings they were computed with."""
+        if self.cache_path:
+            serializer.dump({'version': BLOB_CACHE_VERSION, 'settings': self.settings, 'blobs': self.blob_cache},
+                            self.cache_path, compact=True)
+
+    def _blob_key(self, sha: str, path: str) -> str:
+        """Cache key of a blob at a path: its SHA, extension and path-based file policy decision."""
+        policy = self.analyzer.file_policy
+        action = policy.path_action(path)[0] if policy is not None else None
+        return f"{sha}:{os.path.splitext(path)[1]}:{action}"
+
+    def _list_blobs(self, tree: git.Tree) -> List[Tuple[str, str]]:
+        """List (path, blob SHA) pairs of matching files below a tree, memoized by tree SHA."""
+        cached = self._tree_cache.get(tree.hexsha)
+        if cached is not None:
+            return cached
+
+        entries = []
+        for blob in tree.blobs:
+            if blob.name.endswith(self.extensions):
+                entries.append((blob.name, blob.hexsha))
+        for subtree in tree.trees:
+            for path, sha in self._list_blobs(subtree):
+                entries.append((f"{subtree.name}/{path}", sha))
+
+        self._tree_cache[tree.hexsha] = entries
+        return entries
+
+    def _analyze_blob(self, sha: str, path: str) -> Dict[str, Any]:
+        """Analyze one blob, or return its cached result."""
+        key = self._blob_key(sha, path)
+        cached = self.blob_cache.get(key)
+        if cached is not None:
+            self.stats['blob_cache_hits'] += 1
+            return cached
+
+        content = self.repo.odb.stream(bytes.fromhex(sha)).read()
+        ast_data = self.analyzer.parse_source(content, path)
+        self.stats['blobs_parsed'] += 1
+        if not ast_data:
+            result = {'parsed': False}
+        else:
+            components = self.analyzer.analyze_cgra_components(ast_data)
+            patterns = self.arch_analyzer.analyze_file(ast_data)
+            result = {
+                'parsed': True,
+                'components': {
+                    comp_type: len(entries)
+                    for comp_type, entries in components.items()
+                    if comp_type != 'relationships'
+                },
+                'component_names': sorted({
+                    rel[end] for rel in patterns['relationships']
+                    for end in ('from', 'to') if rel[end]
+                }),
+                'channels': len(self.analyzer.analyze_dataflow(ast_data)['channels']),
+                'relationships': occurrence_count(patterns['relationships']),
+                'control_flow_count': len(patterns['control_flow']),
+                'data_flow_count': len(patterns['data_flow'])
+            }
+
+        self.blob_cache[key] = result
+        return result
+
+    def analyze_commit(self, commit: git.Commit) -> Dict[str, Any]:
+        """
+        Assemble the metrics of one commit from per-blob results.
+
+        Args:
+            commit: Commit to analyze
+
+        Returns:
+            Dict with commit metadata and aggregated metrics
+        """
+        component_counts: Counter = Counter()
+        component_names = set()
+        metrics = Counter()
+        files = 0
+
+        for path, sha in self._list_blobs(commit.tree):
+            result = self._analyze_blob(sha, path)
+            if not result['parsed']:
+                continue
+            files += 1
+            component_counts.update(result['components'])
+            component_names.update(result['component_names'])
+            for key in ('channels', 'relationships', 'control_flow_count', 'data_flow_count'):
+                metrics[key] += result[key]
+
+        return {
+            'commit': commit.hexsha,
+            'date': commit.committed_datetime.isoformat(),
+            'summary': commit.summary,
+            'files_analyzed': files,
+            'metrics': {
+                'total_components': len(component_names),
+                'total_relationships': metrics['relationships'],
+                'control_flow_count': metrics['control_flow_count'],
+                'data_flow_count': metrics['data_flow_count'],
+                'channel_operations': metrics['channels'],
+                'cgra_components': dict(component_counts)
+            }
+        }
+
+    def analyze_history(self, rev: str = 'HEAD', max_count: Optional[int] = None,
+                        paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Analyze the commits reachable from a revision, newest first.
+
+        Args:
+            rev: Revision or range, e.g. 'HEAD' or 'v1.0..main'
+            max_count: Maximum number of commits
+            paths: Only visit commits touching these paths
+
+        Returns:
+            Dict with per-commit metrics and blob reuse statistics
+        """
+        kwargs = {'max_count': max_count} if max_count else {}
+        if paths:
+            kwargs['paths'] = paths
+
+        commits = []
+        for commit in self.repo.iter_commits(rev, **kwargs):
+            commits.append(self.analyze_commit(commit))
+
+        self.save_cache()
+        return {
+            'repository': self.repo.working_dir,
+            'revision': rev,
+            'commits': commits,
+            'statistics': {
+                'commits_analyzed': len(commits),
+                'unique_blobs': len(self.blob_cache),
+                **self.stats
+            }
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Architecture metrics across git history")
+    parser.add_argument('repo', help="Path to the git repository")
+    parser.add_argument('--rev', default='HEAD', help="Revision or range to walk")
+    parser.add_argument('--max-count', type=int, help="Maximum number of commits")
+    parser.add_argument('--cache', help="JSON file caching per-blob results")
+    parser.add_argument('--output', default='history_analysis.json', help="Output JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    history = HistoryAnalyzer(args.repo, cache_path=args.cache).analyze_history(args.rev, args.max_count)
+    serializer.dump(history, args.output)
+
+    stats = history['statistics']
+    print(f"Analyzed {stats['commits_analyzed']} commits: "
+          f"{stats['blobs_parsed']} blobs parsed, {stats['blob_cache_hits']} reused")
+    print(f"History analysis saved to {args.output}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,216 @@
+import os
+import hashlib
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import serializer
+from content_dedup import content_digest
+from source_map import mapped_source
+
+SUMMARY_CACHE_VERSION = 2
+
+def new_summary() -> Dict[str, Any]:
+    """
+    Empty summary: files summarized, named counts, component names and pattern counts.
+    """
+    return {'files': 0, 'counts': {}, 'components': [], 'patterns': {}}
+
+def merge_summaries(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the summaries of several files or directories into one."""
+    files = 0
+    counts: Counter = Counter()
+    patterns: Counter = Counter()
+    components = set()
+    for summary in summaries:
+        files += summary.get('files', 0)
+        counts.update(summary.get('counts', {}))
+        patterns.update(summary.get('patterns', {}))
+        components.update(summary.get('components', []))
+    return {
+        'files': files,
+        'counts': dict(sorted(counts.items())),
+        'components': sorted(components),
+        'patterns': dict(sorted(patterns.items()))
+    }
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class MerkleSummarizer:
+    """
+    Hierarchical summaries memoized over a Merkle tree of the analyzed files.
+
+    A file's hash covers its relative path and content digest (salted with the
+    analysis settings), a directory's hash is the hash of its children's names
+    and hashes. Summaries are cached by hash: a file is only summarized when it
+    is new or its content changed, and a directory only merged when some file
+    below it changed. After a small change, just the directories on the path
+    from the changed files to the root are recomputed; the root summary is the
+    repository summary.
+
+    The path is part of the hash because leaf summaries may depend on it, e.g.
+    through a file policy that skips vendored or mock files. Content digests
+    themselves are cached by file size and modification time, so unchanged
+    files are not even read.
+    """
+
+    def __init__(self,
+                 summarize_file: Callable[[str], Optional[Dict[str, Any]]],
+                 cache_path: Union[str, Path, None] = None,
+                 salt: str = ''):
+        """
+        Args:
+            summarize_file: Summary of one file, given its path relative to the
+                            summarized root (None if the file yields nothing)
+            cache_path: JSON file persisting hashes and summaries across runs
+            salt: Settings that change leaf summaries, e.g. analyzer and pruning profile
+        """
+        self.summarize_file = summarize_file
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.salt = salt
+        self._digests: Dict[str, List[Any]] = {}
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'files_summarized': 0, 'files_reused': 0,
+                      'directories_computed': 0, 'directories_reused': 0, 'files_read': 0}
+        if self.cache_path is not None and self.cache_path.exists():
+            self._load_cache()
+
+    def _load_cache(self) -> None:
+        try:
+            cache = serializer.load(self.cache_path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable summary cache {self.cache_path}: {str(e)}")
+            return
+        if cache.get('version') != SUMMARY_CACHE_VERSION or cache.get('salt') != self.salt:
+            return
+        self._digests = cache.get('files', {})
+        self._summaries = cache.get('summaries', {})
+
+    def save(self, used: Iterable[str]) -> None:
+        """Persist the digests and the summaries of the hashes in used (older ones are dropped)."""
+        if self.cache_path is None:
+            return
+        cache = {
+            'version': SUMMARY_CACHE_VERSION,
+            'salt': self.salt,
+            'files': self._digests,
+            'summaries': {key: self._summaries[key] for key in used if key in self._summaries}
+        }
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        serializer.dump(cache, tmp_path, compact=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def file_digests(self, root: Union[str, Path], file_paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Content digests of source files keyed by path relative to root, reading
+        only the files whose size or modification time changed since the last run.
+        Files that vanish or cannot be read in the meantime are left out.
+        """
+        digests = {}
+        seen = {}
+        for file_path in file_paths:
+            key = os.path.abspath(file_path)
+            try:
+                st = os.stat(file_path)
+                cached = self._digests.get(key)
+                if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                    digest = cached[2]
+                else:
+                    with mapped_source(file_path) as source:
+                        digest = content_digest(source)
+                    self.stats['files_read'] += 1
+            except OSError as e:
+                logging.warning(f"Skipping unreadable file {file_path}: {str(e)}")
+                continue
+            seen[key] = [st.st_size, st.st_mtime_ns, digest]
+            digests[os.path.relpath(file_path, root)] = digest
+        # Files gone since the last run are forgotten
+        self._digests = seen
+        return digests
+
+    def summarize(self, digests: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Build the summaries of every directory bottom-up.
+
+        Args:
+            digests: Content digest of every file, keyed by relative path (see file_digests)
+
+        Returns:
+            Dict with the root 'hash', the repository 'summary', and 'directories'
+            mapping each directory's relative path ('' for the root) to its summary
+        """
+        tree: Dict[str, Any] = {'dirs': {}, 'files': {}}
+        for rel_path, digest in digests.items():
+            parts = Path(rel_path).parts
+            node = tree
+            for part in parts[:-1]:
+                node = node['dirs'].setdefault(part, {'dirs': {}, 'files': {}})
+            node['files'][parts[-1]] = digest
+
+        used: List[str] = []
+        directories: Dict[str, str] = {}
+
+        def visit(node: Dict[str, Any], path: str) -> str:
+            entries: List[Tuple[str, str, str]] = []
+            for name, digest in sorted(node['files'].items()):
+                rel_path = os.path.join(path, name) if path else name
+                key = _hash('file', self.salt, rel_path, digest)
+                if key in self._summaries:
+                    self.stats['files_reused'] += 1
+                else:
+                    summary = self.summarize_file(rel_path)
+                    self._summaries[key] = summary if summary is not None else new_summary()
+                    self.stats['files_summarized'] += 1
+                used.append(key)
+                entries.append(('file', name, key))
+            for name, child in sorted(node['dirs'].items()):
+                entries.append(('dir', name, visit(child, os.path.join(path, name) if path else name)))
+
+            key = _hash('dir', *(part for entry in entries for part in entry))
+            if key in self._summaries:
+                self.stats['directories_reused'] += 1
+            else:
+                self._summaries[key] = merge_summaries(self._summaries[child] for _, _, child in entries)
+                self.stats['directories_computed'] += 1
+            used.append(key)
+            directories[path] = key
+            return key
+
+        root_hash = visit(tree, '')
+        self.save(used)
+        return {
+            'hash': root_hash,
+            'summary': self._summaries[root_hash],
+            'directories': {path: self._summaries[key] for path, key in sorted(directories.items())}
+        }
+
+    def summarize_files(self, root: Union[str, Path], file_paths: Iterable[str]) -> Dict[str, Any]:
+        """Summarize source files under root; see file_digests and summarize."""
+        return self.summarize(self.file_digests(root, file_paths))
+
+def main():
+    """Example usage: summarize the Go files of a directory, reusing a cache across runs."""
+    import sys
+    from file_discovery import discover_files
+
+    if len(sys.argv) < 2:
+        print("Usage: python merkle_summary.py <directory> [cache_file]")
+        return
+
+    def line_counts(rel_path: str) -> Dict[str, Any]:
+        with open(os.path.join(sys.argv[1], rel_path), 'rb') as f:
+            return {'files': 1, 'counts': {'lines': f.read().count(b'\n')}, 'components': [], 'patterns': {}}
+
+    summarizer = MerkleSummarizer(line_counts, sys.argv[2] if len(sys.argv) > 2 else None, salt='lines')
+    result = summarizer.summarize_files(sys.argv[1], discover_files(sys.argv[1], ('.go',)))
+    print(f"Root {result['hash']}: {result['summary']['files']} files, {result['summary']['counts']}")
+    print(f"Stats: {summarizer.stats}")
+
+if __name__ == "__main__":
+    main()
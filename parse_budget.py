@@ -0,0 +1,138 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from source_map import Source, read_callback
+
+# Reasons a file gets a degraded result
+TIMEOUT = 'timeout'
+SIZE = 'size'
+CANCELLED = 'cancelled'
+
+class ParseTimeout(Exception):
+    """Raised when a file exceeds its parse budget or its parse is cancelled."""
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+        self.detail = detail
+
+class ParseBudget:
+    """
+    Per-file limits on parsing.
+
+    Files larger than max_size bytes are not parsed at all. Parsing and AST
+    conversion together get max_seconds of wall time: the parse itself is
+    bounded by the tree-sitter parser timeout, conversion checks the deadline
+    every check_interval nodes. A file over budget gets a degraded result
+    instead of stalling the run.
+    """
+
+    def __init__(self,
+                 max_seconds: Optional[float] = 30.0,
+                 max_size: Optional[int] = 16 * 1024 * 1024,
+                 check_interval: int = 1024):
+        """
+        Args:
+            max_seconds: Wall time per file for parsing and conversion; None for no limit
+            max_size: Largest file in bytes that is parsed; None for no limit
+            check_interval: Converted nodes between two deadline checks
+        """
+        self.max_seconds = max_seconds
+        self.max_size = max_size
+        self.check_interval = check_interval
+
+    def exceeds_size(self, size: int) -> bool:
+        return self.max_size is not None and size > self.max_size
+
+class Deadline:
+    """
+    The running budget of one parse: its time limit and the analyzer's cancellation flag.
+
+    Works without a budget too, in which case only cancellation is checked.
+    """
+
+    def __init__(self, budget: Optional[ParseBudget], cancel_event: threading.Event):
+        self.max_seconds = budget.max_seconds if budget is not None else None
+        self.expires = time.monotonic() + self.max_seconds if self.max_seconds is not None else None
+        self.check_interval = budget.check_interval if budget is not None else 1024
+        self.cancel_event = cancel_event
+        self._countdown = self.check_interval
+
+    def remaining_micros(self) -> int:
+        """Parser timeout for the rest of the budget; 0 means no limit, as for tree-sitter."""
+        if self.expires is None:
+            return 0
+        return max(1, int((self.expires - time.monotonic()) * 1e6))
+
+    def check(self, force: bool = False) -> None:
+        """
+        Raise ParseTimeout if the parse was cancelled or ran out of time.
+
+        Called once per converted internal node; only every check_interval-th call
+        actually looks at the clock, unless forced.
+        """
+        if not force:
+            self._countdown -= 1
+            if self._countdown > 0:
+                return
+        self._countdown = self.check_interval
+        if self.cancel_event.is_set():
+            raise ParseTimeout(CANCELLED, "parse cancelled")
+        if self.expires is not None and time.monotonic() > self.expires:
+            raise ParseTimeout(TIMEOUT, f"exceeded {self.max_seconds}s")
+
+    def read_callback(self, source: Source) -> Callable[[int, Tuple[int, int]], bytes]:
+        """
+        Read callback that stops feeding the parser once the parse is cancelled.
+
+        The parser then sees the end of input and returns early; parse() raises
+        for the cancellation afterwards.
+        """
+        read = read_callback(source)
+        cancel_event = self.cancel_event
+
+        def guarded_read(byte_offset: int, point: Tuple[int, int]) -> bytes:
+            return b'' if cancel_event.is_set() else read(byte_offset, point)
+        return guarded_read
+
+    def parse(self, parser, source: Source):
+        """
+        Parse a source buffer within the deadline.
+
+        Raises:
+            ParseTimeout: If the parser timed out or the parse was cancelled
+        """
+        parser.set_timeout_micros(self.remaining_micros())
+        try:
+            tree = parser.parse(self.read_callback(source))
+        except ValueError:
+            # A timed-out parser keeps its partial state and would resume it on the next parse
+            parser.reset()
+            raise ParseTimeout(TIMEOUT, f"parser exceeded {self.max_seconds}s")
+        except SystemError as e:
+            # An exception raised inside the read callback, e.g. by a watchdog signal
+            # handler, reaches us wrapped by the binding
+            parser.reset()
+            if isinstance(e.__cause__, ParseTimeout):
+                raise e.__cause__
+            raise
+        self.check(force=True)
+        return tree
+
+def degraded_result(file_path: str, language: str, error: ParseTimeout) -> Dict[str, Any]:
+    """
+    Result for a file that could not be parsed within its budget: an empty root
+    and a 'degraded' entry with the reason, in the shape of a parse_file result.
+    """
+    return {
+        'file_path': file_path,
+        'language': language,
+        'ast': {
+            'type': 'ERROR',
+            'start_point': {'row': 0, 'column': 0},
+            'end_point': {'row': 0, 'column': 0},
+            'children': []
+        },
+        'degraded': {'reason': error.reason, 'detail': error.detail}
+    }
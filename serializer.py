@@ -0,0 +1,138 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Callable, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Backends in order of preference; 'json' (the stdlib) is always available
+BACKENDS = ['orjson', 'msgspec', 'json']
+
+def available_backends() -> List[str]:
+    """List the installed serializer backends, fastest first."""
+    installed = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'json': True}
+    return [name for name in BACKENDS if installed[name]]
+
+def _json_dumps(data: Any, compact: bool) -> bytes:
+    if compact:
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _orjson_dumps(data: Any, compact: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
+def _msgspec_dumps(data: Any, compact: bool) -> bytes:
+    encoded = msgspec.json.encode(data)
+    return encoded if compact else msgspec.json.format(encoded, indent=2)
+
+_ENCODERS: Dict[str, Callable[[Any, bool], bytes]] = {
+    'orjson': _orjson_dumps,
+    'msgspec': _msgspec_dumps,
+    'json': _json_dumps
+}
+
+_DECODERS: Dict[str, Callable[[bytes], Any]] = {
+    'orjson': lambda data: orjson.loads(data),
+    'msgspec': lambda data: msgspec.json.decode(data),
+    'json': lambda data: json.loads(data)
+}
+
+class Serializer:
+    """
+    JSON writer shared by every output path of the analyzers.
+
+    Two modes are supported: indented (indent=2, the historical layout of all
+    analysis files) and compact (no whitespace). For a given mode the output
+    bytes are the same whichever backend is used: UTF-8 without ASCII escaping,
+    stdlib separators, and non-string keys converted to strings. The exceptions
+    are floats: values Python prints in exponent notation (below 1e-4 or from
+    1e16 up) are written by orjson in its own shortest form, and non-finite
+    values become null instead of NaN/Infinity. Values a fast backend cannot
+    encode (e.g. integers beyond 64 bits) fall back to the stdlib encoder.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: 'orjson', 'msgspec' or 'json'; defaults to the fastest installed
+
+        Raises:
+            ValueError: If the backend is unknown or not installed
+        """
+        if backend is None:
+            backend = available_backends()[0]
+        if backend not in available_backends():
+            raise ValueError(f"Serializer backend not available: {backend} (available: {', '.join(available_backends())})")
+        self.backend = backend
+        self._encode = _ENCODERS[backend]
+        self._decode = _DECODERS[backend]
+
+    def dumps(self, data: Any, compact: bool = False) -> bytes:
+        """
+        Encode data as UTF-8 JSON bytes.
+
+        Args:
+            data: JSON-compatible data
+            compact: Omit indentation and whitespace
+
+        Returns:
+            Encoded JSON
+        """
+        if self.backend != 'json':
+            try:
+                return self._encode(data, compact)
+            except (TypeError, ValueError, OverflowError) as e:
+                logging.debug(f"{self.backend} cannot encode data, using the stdlib encoder: {str(e)}")
+        return _json_dumps(data, compact)
+
+    def dump(self, data: Any, output_path: Union[str, Path], compact: bool = False) -> None:
+        """Write data to a JSON file."""
+        with open(output_path, 'wb') as f:
+            f.write(self.dumps(data, compact))
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON bytes or text."""
+        return self._decode(data)
+
+    def load(self, input_path: Union[str, Path]) -> Any:
+        """Read a JSON file."""
+        with open(input_path, 'rb') as f:
+            return self._decode(f.read())
+
+_default_serializer: Optional[Serializer] = None
+
+def get_serializer() -> Serializer:
+    """Return the process-wide serializer, using the fastest installed backend."""
+    global _default_serializer
+    if _default_serializer is None:
+        _default_serializer = Serializer()
+    return _default_serializer
+
+def set_backend(backend: Optional[str]) -> Serializer:
+    """Select the backend of the process-wide serializer (None picks the fastest)."""
+    global _default_serializer
+    _default_serializer = Serializer(backend)
+    return _default_serializer
+
+def dumps(data: Any, compact: bool = False) -> bytes:
+    return get_serializer().dumps(data, compact)
+
+def dump(data: Any, output_path: Union[str, Path], compact: bool = False) -> None:
+    get_serializer().dump(data, output_path, compact)
+
+def loads(data: Union[bytes, str]) -> Any:
+    return get_serializer().loads(data)
+
+def load(input_path: Union[str, Path]) -> Any:
+    return get_serializer().load(input_path)
@@ -0,0 +1,201 @@
+import os
+import mmap
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Union
+
+import serializer
+import compact_schema
+from file_summary import FileSummary, stored_summary
+
+SHARD_FORMAT = 'ast-shards'
+SHARD_VERSION = 1
+DATA_FILE = 'records.jsonl'
+MANIFEST_FILE = 'manifest.json'
+
+class ShardWriter:
+    """
+    Writes per-file analysis records into one data file, one JSON record per
+    line, and a manifest mapping each file path to the byte offset, length and
+    SHA-256 of its record. A record's file summary (see file_summary) is
+    stored in the manifest instead of the record and put back on load.
+    """
+
+    def __init__(self, output_dir: Union[str, Path], compact: bool = True, append: bool = False):
+        """
+        Args:
+            output_dir: Directory receiving the data file and the manifest
+            compact: Encode records in the compact schema (see compact_schema)
+            append: Keep the records of an existing shard directory and add to it
+        """
+        self.output_dir = Path(output_dir)
+        self.compact = compact
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.output_dir / DATA_FILE
+        self.manifest_path = self.output_dir / MANIFEST_FILE
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if append and self.manifest_path.exists():
+            manifest = serializer.load(self.manifest_path)
+            if manifest.get('compact') != compact:
+                raise ValueError(f"Cannot append {'compact' if compact else 'full'} records to {output_dir}")
+            self.entries = manifest['files']
+        self._data = open(self.data_path, 'ab' if append else 'wb')
+
+    def add(self, file_path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Append one file's record.
+
+        Args:
+            file_path: Key of the record, usually the project-relative path
+            record: Analysis record, e.g. the output of parse_file
+
+        Returns:
+            Manifest entry of the record
+        """
+        summary = stored_summary(record)
+        if 'summary' in record:
+            # Kept in the manifest only, so readers can skip the record without loading it
+            record = {key: value for key, value in record.items() if key != 'summary'}
+        if self.compact:
+            record = compact_schema.encode(record)
+        payload = serializer.dumps(record, compact=True) + b'\n'
+        offset = self._data.tell()
+        self._data.write(payload)
+        entry = {
+            'offset': offset,
+            'length': len(payload) - 1,
+            'sha256': hashlib.sha256(payload[:-1]).hexdigest()
+        }
+        if summary is not None:
+            entry['summary'] = summary
+        # A re-added path points at its newest record; the old bytes become garbage
+        self.entries[file_path] = entry
+        return entry
+
+    def close(self) -> None:
+        """Flush the data file and write the manifest."""
+        self._data.close()
+        manifest = {
+            'format': SHARD_FORMAT,
+            'version': SHARD_VERSION,
+            'data_file': DATA_FILE,
+            'compact': self.compact,
+            'files': self.entries
+        }
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        serializer.dump(manifest, tmp_path, compact=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class ShardReader:
+    """
+    Random access to a sharded output directory. The data file is memory-mapped,
+    so loading one file's record only touches that record's bytes.
+    """
+
+    def __init__(self, shard_dir: Union[str, Path], verify: bool = False):
+        """
+        Args:
+            shard_dir: Directory written by ShardWriter
+            verify: Check each record's SHA-256 when it is read
+
+        Raises:
+            ValueError: If the manifest is not a supported shard manifest
+        """
+        self.shard_dir = Path(shard_dir)
+        self.verify_reads = verify
+        manifest = serializer.load(self.shard_dir / MANIFEST_FILE)
+        if manifest.get('format') != SHARD_FORMAT or manifest.get('version') != SHARD_VERSION:
+            raise ValueError(f"Unsupported shard manifest in {shard_dir}")
+        self.compact = manifest['compact']
+        self.entries: Dict[str, Dict[str, Any]] = manifest['files']
+        self._file = open(self.shard_dir / manifest['data_file'], 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def files(self) -> List[str]:
+        """List the file paths stored in the shards."""
+        return list(self.entries)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.entries
+
+    def summary(self, file_path: str) -> Optional[FileSummary]:
+        """File summary of one record, read from the manifest (None if it has none)."""
+        return FileSummary.from_record(self.entries[file_path].get('summary'))
+
+    def read_raw(self, file_path: str) -> bytes:
+        """
+        Return the encoded bytes of one record.
+
+        Raises:
+            KeyError: If the path is not in the manifest
+            ValueError: If verification is enabled and the record is corrupt
+        """
+        entry = self.entries[file_path]
+        payload = self._map[entry['offset']:entry['offset'] + entry['length']]
+        if self.verify_reads and hashlib.sha256(payload).hexdigest() != entry['sha256']:
+            raise ValueError(f"Corrupt shard record for {file_path}")
+        return payload
+
+    def verify(self) -> None:
+        """
+        Check every record against its SHA-256, e.g. after copying or appending to a shard.
+
+        Raises:
+            ValueError: If any record is corrupt or lies beyond the end of the data file
+        """
+        size = len(self._map) if self._map is not None else 0
+        corrupt = [file_path for file_path, entry in self.entries.items()
+                   if entry['offset'] + entry['length'] > size or
+                   hashlib.sha256(self._map[entry['offset']:entry['offset'] + entry['length']]).hexdigest()
+                   != entry['sha256']]
+        if corrupt:
+            raise ValueError(f"Corrupt shard records in {self.shard_dir}: {', '.join(corrupt)}")
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        """Load one file's record in the full schema."""
+        record = serializer.loads(self.read_raw(file_path))
+        if self.compact:
+            record = compact_schema.decode(record)
+        if 'summary' in self.entries[file_path]:
+            record['summary'] = self.entries[file_path]['summary']
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for file_path in self.entries:
+            yield self.load(file_path)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'ShardReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def main():
+    """Example usage: list a shard directory, or print one file's record."""
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python shard_store.py <shard_dir> [file_path]")
+        return
+
+    with ShardReader(sys.argv[1]) as reader:
+        if len(sys.argv) < 3:
+            for file_path in reader.files():
+                entry = reader.entries[file_path]
+                print(f"{file_path}: {entry['length']} bytes at offset {entry['offset']}")
+        else:
+            print(serializer.dumps(reader.load(sys.argv[2])).decode('utf-8'))
+
+if __name__ == "__main__":
+    main()
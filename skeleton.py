@@ -0,0 +1,181 @@
+from typing import Any, Dict, List, Optional
+
+from source_map import node_text
+
+# Generic skeletons: nodes whose body is kept (descended into) rather than cut off
+CONTAINER_KEYWORDS = ('class', 'struct', 'interface', 'namespace', 'enum', 'module', 'impl', 'trait')
+IMPORT_KEYWORDS = ('import', 'include', 'using')
+
+def _text(node, source) -> str:
+    return node_text(node, source) if source is not None else node.text.decode('utf-8')
+
+def _signature(node, source) -> str:
+    """Source of a declaration up to its body, i.e. without the braces and statements."""
+    body = node.child_by_field_name('body')
+    end = body.start_byte if body is not None else node.end_byte
+    text = source[node.start_byte:end] if source is not None else node.text[:end - node.start_byte]
+    return text.decode('utf-8').rstrip()
+
+def _members(node, source) -> List[str]:
+    """Texts of the named children of a struct field list or interface, comments left out."""
+    return [_text(child, source) for child in node.named_children if child.type != 'comment']
+
+def _go_type(spec, source) -> Dict[str, Any]:
+    name = spec.child_by_field_name('name')
+    type_node = spec.child_by_field_name('type')
+    entry = {'name': _text(name, source) if name is not None else '', 'line': spec.start_point[0] + 1}
+    parameters = spec.child_by_field_name('type_parameters')
+    if parameters is not None:
+        entry['type_parameters'] = _text(parameters, source)
+    if spec.type == 'type_alias':
+        entry['kind'] = 'alias'
+        entry['type'] = _text(type_node, source) if type_node is not None else ''
+    elif type_node is not None and type_node.type == 'struct_type':
+        entry['kind'] = 'struct'
+        fields = next((child for child in type_node.named_children if child.type == 'field_declaration_list'), None)
+        entry['fields'] = _members(fields, source) if fields is not None else []
+    elif type_node is not None and type_node.type == 'interface_type':
+        entry['kind'] = 'interface'
+        entry['methods'] = _members(type_node, source)
+    else:
+        entry['kind'] = 'type'
+        entry['type'] = _text(type_node, source) if type_node is not None else ''
+    return entry
+
+def go_skeleton(root, source=None) -> Dict[str, Any]:
+    """
+    Skeleton of a Go file from its tree-sitter root node.
+
+    Only the top-level declarations are visited: function and method bodies are
+    cut off at their start byte and never walked, so the cost is proportional
+    to the number of declarations rather than to the size of the file.
+
+    Args:
+        root: Root node (source_file) of the parse
+        source: Source buffer the tree was parsed from (needed for read-callback parses)
+
+    Returns:
+        Dict with the 'package' name, 'imports' (path and optional alias),
+        'types' (struct fields, interface method sets, other definitions),
+        'functions' and 'methods' as signatures without bodies
+    """
+    skeleton = {'package': None, 'imports': [], 'types': [], 'functions': [], 'methods': []}
+    for node in root.named_children:
+        kind = node.type
+        if kind == 'package_clause':
+            name = node.named_children[0] if node.named_child_count else None
+            skeleton['package'] = _text(name, source) if name is not None else None
+        elif kind == 'import_declaration':
+            specs = node.named_children
+            if specs and specs[0].type == 'import_spec_list':
+                specs = specs[0].named_children
+            for spec in specs:
+                if spec.type != 'import_spec':
+                    continue
+                path = spec.child_by_field_name('path')
+                entry = {'path': _text(path, source).strip('"`') if path is not None else ''}
+                alias = spec.child_by_field_name('name')
+                if alias is not None:
+                    entry['name'] = _text(alias, source)
+                skeleton['imports'].append(entry)
+        elif kind == 'type_declaration':
+            skeleton['types'].extend(_go_type(spec, source) for spec in node.named_children
+                                     if spec.type in ('type_spec', 'type_alias'))
+        elif kind in ('function_declaration', 'method_declaration'):
+            name = node.child_by_field_name('name')
+            entry = {
+                'name': _text(name, source) if name is not None else '',
+                'line': node.start_point[0] + 1,
+                'signature': _signature(node, source)
+            }
+            if kind == 'method_declaration':
+                receiver = node.child_by_field_name('receiver')
+                entry['receiver'] = _text(receiver, source) if receiver is not None else ''
+                skeleton['methods'].append(entry)
+            else:
+                skeleton['functions'].append(entry)
+    return skeleton
+
+def generic_skeleton(root, source=None) -> Dict[str, Any]:
+    """
+    Skeleton of a file in a grammar without a dedicated extractor.
+
+    Imports and includes are kept whole; any other node with a body field is
+    a declaration whose signature is kept, and body-less declarations
+    (prototypes, fields) keep their first line. Bodies of containers (classes,
+    structs, namespaces, ...) are walked for their members, all other bodies
+    are skipped.
+
+    Returns:
+        Dict with 'imports' (texts) and 'declarations' (kind, line, signature,
+        members for containers)
+    """
+    skeleton = {'imports': [], 'declarations': []}
+
+    def visit(node, declarations: List[Dict[str, Any]]) -> None:
+        for child in node.named_children:
+            kind = child.type
+            if any(keyword in kind for keyword in IMPORT_KEYWORDS):
+                skeleton['imports'].append(_text(child, source).strip())
+                continue
+            body = child.child_by_field_name('body')
+            if body is None:
+                wraps = any(grandchild.child_by_field_name('body') is not None
+                            for grandchild in child.named_children)
+                if kind.endswith('declaration') and not wraps:
+                    # Prototypes, fields and variables: their first line is their signature
+                    declarations.append({'kind': kind, 'line': child.start_point[0] + 1,
+                                         'signature': _text(child, source).split('\n', 1)[0].strip()})
+                elif child.named_child_count and not kind.endswith(('statement', 'expression', 'comment', 'list')):
+                    # Wrappers such as export statements, templates or decorators
+                    visit(child, declarations)
+                continue
+            entry = {'kind': kind, 'line': child.start_point[0] + 1, 'signature': _signature(child, source)}
+            if any(keyword in kind for keyword in CONTAINER_KEYWORDS):
+                entry['members'] = []
+                visit(body, entry['members'])
+            declarations.append(entry)
+
+    visit(root, skeleton['declarations'])
+    return skeleton
+
+def extract_skeleton(root, source=None, language: Optional[str] = None) -> Dict[str, Any]:
+    """Skeleton of a parse: go_skeleton for Go, generic_skeleton otherwise."""
+    return go_skeleton(root, source) if language == 'go' else generic_skeleton(root, source)
+
+def render_go_skeleton(skeleton: Dict[str, Any]) -> str:
+    """Render a Go skeleton as compilable-looking Go stubs, e.g. for an LLM prompt."""
+    lines = [f"package {skeleton['package']}"] if skeleton.get('package') else []
+    for entry in skeleton['imports']:
+        lines.append(f"import {entry['name'] + ' ' if 'name' in entry else ''}\"{entry['path']}\"")
+    for entry in skeleton['types']:
+        head = f"type {entry['name']}{entry.get('type_parameters', '')}"
+        if entry['kind'] == 'struct':
+            lines.append(head + ' struct {' + ''.join(f"\n\t{field}" for field in entry['fields']) + '\n}')
+        elif entry['kind'] == 'interface':
+            lines.append(head + ' interface {' + ''.join(f"\n\t{method}" for method in entry['methods']) + '\n}')
+        else:
+            lines.append(f"{head}{' =' if entry['kind'] == 'alias' else ''} {entry['type']}")
+    lines.extend(entry['signature'] for entry in skeleton['functions'] + skeleton['methods'])
+    return '\n'.join(lines) + '\n'
+
+def main():
+    """Example usage: print the skeleton of a source file, as Go stubs for Go files."""
+    import sys
+    import serializer
+    from code_analyzer import TreeSitterAnalyzer, SKELETON
+
+    if len(sys.argv) < 2:
+        print("Usage: python skeleton.py <source_file>")
+        return
+
+    result = TreeSitterAnalyzer().parse_file(sys.argv[1], output=SKELETON)
+    if not result or 'skeleton' not in result:
+        return
+    if result['language'] == 'go':
+        print(render_go_skeleton(result['skeleton']), end='')
+    else:
+        print(serializer.dumps(result['skeleton']).decode('utf-8'))
+
+if __name__ == "__main__":
+    main()
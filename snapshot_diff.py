@@ -0,0 +1,231 @@
+import json
+import hashlib
+import logging
+import argparse
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:  # in requirements.txt; without it snapshots are loaded whole (see SnapshotDiff.diff)
+    ijson = None
+
+import serializer
+
+ARCHITECTURE = 'architecture'
+PROJECT = 'project'
+
+# Top-level keys that identify each snapshot kind
+_KIND_MARKERS = {
+    'control_flow_patterns': ARCHITECTURE,
+    'data_flow_patterns': ARCHITECTURE,
+    'project_structure': PROJECT,
+    'dataflow': PROJECT
+}
+
+Key = Tuple[str, str, str, str, int]
+
+class SnapshotDiff:
+    """
+    Structural diff between two analysis snapshots (architecture_analysis.json
+    or project_analysis.json).
+
+    Every entity gets a key of (section, kind, name, file, ordinal), where the
+    ordinal numbers repeated entities with the same identity. A hash index over
+    the old snapshot maps keys to payload digests, so the new snapshot is diffed
+    in one linear pass. Only one snapshot's entities are ever held in memory,
+    and with ijson installed neither snapshot is loaded whole. Without ijson
+    each snapshot is loaded whole, once, and both are in memory while the new
+    one is probed.
+    """
+
+    def __init__(self, ignore_locations: bool = True):
+        """
+        Args:
+            ignore_locations: Do not report entities as changed when only their
+                              source location moved
+        """
+        self.ignore_locations = ignore_locations
+
+    @staticmethod
+    def _load(path: str) -> Optional[Dict[str, Any]]:
+        """Whole snapshot document when it cannot be streamed (no ijson), None otherwise."""
+        if ijson is not None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def detect_kind(path: str, document: Optional[Dict[str, Any]] = None) -> str:
+        """Detect whether a snapshot is an architecture or a project analysis."""
+        if document is None and ijson is not None:
+            with open(path, 'rb') as f:
+                for prefix, event, value in ijson.parse(f):
+                    if prefix == '' and event == 'map_key' and value in _KIND_MARKERS:
+                        return _KIND_MARKERS[value]
+        else:
+            if document is None:
+                document = SnapshotDiff._load(path)
+            for key in document:
+                if key in _KIND_MARKERS:
+                    return _KIND_MARKERS[key]
+        raise ValueError(f"Not an architecture or project analysis snapshot: {path}")
+
+    @staticmethod
+    def _iter_sections(path: str, kind: str,
+                       document: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, Optional[str], Any]]:
+        """Yield (section, group, item) for every entity, from document or streamed from path."""
+        if kind == ARCHITECTURE:
+            list_sections = ['components', 'relationships', 'control_flow_patterns', 'data_flow_patterns']
+            dict_sections = []
+        else:
+            list_sections = []
+            dict_sections = ['components', 'dataflow', 'project_structure']
+
+        if document is None and ijson is not None:
+            for section in list_sections:
+                with open(path, 'rb') as f:
+                    for item in ijson.items(f, f"{section}.item", use_float=True):
+                        yield section, None, item
+            for section in dict_sections:
+                with open(path, 'rb') as f:
+                    for group, items in ijson.kvitems(f, section, use_float=True):
+                        for item in items:
+                            yield section, group, item
+            return
+
+        if document is None:
+            document = SnapshotDiff._load(path)
+        for section in list_sections:
+            for item in document.get(section, []):
+                yield section, None, item
+        for section in dict_sections:
+            for group, items in document.get(section, {}).items():
+                for item in items:
+                    yield section, group, item
+
+    @staticmethod
+    def _identity(section: str, group: Optional[str], item: Any) -> Tuple[str, str, str]:
+        """Return (kind, name, file) identifying an entity."""
+        if not isinstance(item, dict):
+            # Component names and project_structure paths are plain strings
+            if section == 'project_structure':
+                return f"file:{group}", str(item), str(item)
+            return 'component', str(item), ''
+        file = str(item.get('file') or '')
+        if section == 'relationships':
+            return f"relationship:{item.get('type')}", f"{item.get('from')}->{item.get('to')}", file
+        if section in ('control_flow_patterns', 'data_flow_patterns'):
+            return f"{item.get('type')}:{item.get('node_type')}", str(item.get('name')), file
+        if section == 'components':
+            return f"component:{group}", str(item.get('name')), file
+        return f"{section}:{group or item.get('type')}", str(item.get('name', item.get('channel', ''))), file
+
+    def _digest(self, item: Any) -> bytes:
+        """Hash an entity's payload."""
+        if self.ignore_locations and isinstance(item, dict) and ('location' in item or 'locations' in item):
+            item = {k: v for k, v in item.items() if k not in ('location', 'locations')}
+        canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+    def _iter_keyed(self, path: str, kind: str,
+                    document: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Key, Any]]:
+        """Yield (key, item) for every entity of a snapshot."""
+        ordinals: Dict[Tuple[str, str, str, str], int] = {}
+        for section, group, item in self._iter_sections(path, kind, document):
+            identity = (section,) + self._identity(section, group, item)
+            ordinal = ordinals.get(identity, 0)
+            ordinals[identity] = ordinal + 1
+            yield identity + (ordinal,), item
+
+    @staticmethod
+    def _key_to_dict(key: Key) -> Dict[str, Any]:
+        section, kind, name, file, ordinal = key
+        return {'section': section, 'kind': kind, 'name': name, 'file': file or None, 'occurrence': ordinal}
+
+    def diff(self, old_path: str, new_path: str) -> Dict[str, Any]:
+        """
+        Diff two snapshots of the same kind.
+
+        Args:
+            old_path: Path of the base snapshot
+            new_path: Path of the changed snapshot
+
+        Returns:
+            Dict with 'added', 'removed' and 'changed' entities and per-section counts
+
+        Raises:
+            ValueError: If the snapshots are of different kinds
+        """
+        if ijson is None:
+            logging.warning("ijson is not installed; loading both snapshots whole instead of streaming them")
+        old_document = self._load(old_path)
+        new_document = self._load(new_path)
+        kind = self.detect_kind(old_path, old_document)
+        if self.detect_kind(new_path, new_document) != kind:
+            raise ValueError("Cannot diff an architecture snapshot against a project snapshot")
+
+        # Pass 1: hash index of the old snapshot, digests only
+        old_index: Dict[Key, bytes] = {}
+        for key, item in self._iter_keyed(old_path, kind, old_document):
+            old_index[key] = self._digest(item)
+
+        # Pass 2: probe the index with every new entity
+        added, changed_after = [], {}
+        for key, item in self._iter_keyed(new_path, kind, new_document):
+            old_digest = old_index.pop(key, None)
+            if old_digest is None:
+                added.append({**self._key_to_dict(key), 'entity': item})
+            elif old_digest != self._digest(item):
+                changed_after[key] = item
+        new_document = None
+
+        # Pass 3: whatever is left in the index was removed; fetch old payloads for those and changes
+        removed_keys = set(old_index)
+        removed, changed = [], []
+        if removed_keys or changed_after:
+            for key, item in self._iter_keyed(old_path, kind, old_document):
+                if key in removed_keys:
+                    removed.append({**self._key_to_dict(key), 'entity': item})
+                elif key in changed_after:
+                    changed.append({**self._key_to_dict(key), 'before': item, 'after': changed_after[key]})
+
+        summary: Dict[str, Dict[str, int]] = {}
+        for label, entries in (('added', added), ('removed', removed), ('changed', changed)):
+            for entry in entries:
+                counts = summary.setdefault(entry['section'], {'added': 0, 'removed': 0, 'changed': 0})
+                counts[label] += 1
+
+        return {
+            'kind': kind,
+            'old': old_path,
+            'new': new_path,
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+            'summary': summary
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Diff two analysis snapshots")
+    parser.add_argument('old', help="Base snapshot (architecture_analysis.json or project_analysis.json)")
+    parser.add_argument('new', help="Changed snapshot")
+    parser.add_argument('--include-locations', action='store_true',
+                        help="Report entities whose source location moved as changed")
+    parser.add_argument('--output', help="Write the full diff to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    result = SnapshotDiff(ignore_locations=not args.include_locations).diff(args.old, args.new)
+    if args.output:
+        serializer.dump(result, args.output)
+
+    print(f"\nSnapshot Diff ({result['kind']})")
+    print("=" * 50)
+    for section, counts in sorted(result['summary'].items()):
+        print(f"- {section}: +{counts['added']} -{counts['removed']} ~{counts['changed']}")
+    if not result['summary']:
+        print("No structural changes")
+
+if __name__ == "__main__":
+    main()
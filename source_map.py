@@ -0,0 +1,45 @@
+import os
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Tuple, Union
+
+# Bytes handed to tree-sitter per read callback
+READ_CHUNK = 64 * 1024
+
+Source = Union[bytes, mmap.mmap]
+
+@contextmanager
+def mapped_source(file_path: Union[str, Path]) -> Iterator[Source]:
+    """
+    Memory-map a source file for reading.
+
+    The mapping is only valid inside the with block: node texts must be sliced
+    out of it before the block ends. Empty files yield b'' since they cannot be
+    mapped.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield source
+        finally:
+            source.close()
+
+def read_callback(source: Source) -> Callable[[int, Tuple[int, int]], bytes]:
+    """
+    Build a tree-sitter read callback over a source buffer.
+
+    Parsing through the callback lets tree-sitter pull the source in chunks
+    instead of holding its own copy of the whole file. Trees parsed this way
+    have no node.text; slice texts from the buffer by start_byte/end_byte.
+    """
+    def read(byte_offset: int, point: Tuple[int, int]) -> bytes:
+        return source[byte_offset:byte_offset + READ_CHUNK]
+    return read
+
+def node_text(node, source: Source) -> str:
+    """Text of a tree-sitter node, sliced from the source it was parsed from."""
+    return source[node.start_byte:node.end_byte].decode('utf-8')
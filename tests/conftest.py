@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_analyzer import TreeSitterAnalyzer
+
+GO_SOURCE = b'''package cgra
+
+import (
+\t"fmt"
+\tnet "github.com/sarchlab/zeonica/network"
+)
+
+// ProcessingElement executes one operation per cycle.
+type ProcessingElement struct {
+\tID     int
+\tBuffer []int
+}
+
+type Router interface {
+\tRoute(dst int) int
+}
+
+func NewProcessingElement(id int) *ProcessingElement {
+\treturn &ProcessingElement{ID: id}
+}
+
+func (pe *ProcessingElement) Tick(in chan int, out chan<- int) {
+\tvalue := <-in
+\tout <- value + pe.ID
+\tfmt.Println(net.Version)
+}
+'''
+
+def _language(name):
+    from tree_sitter import Language
+    module = pytest.importorskip(f'tree_sitter_{name}')
+    try:
+        return Language(module.language())
+    except TypeError:
+        # py-tree-sitter before 0.22 also takes the language name
+        return Language(module.language(), name)
+
+def _patch_parsers(monkeypatch, languages):
+    """Make TreeSitterAnalyzer parse with grammar packages instead of a built library."""
+    from tree_sitter import Parser
+
+    def setup_parsers(self):
+        for ext, language in languages.items():
+            parser = Parser()
+            parser.set_language(language)
+            self.parsers[ext] = parser
+            self._language_objects[ext] = language
+
+    # Analyzers created inside the code under test pick up the patch too
+    monkeypatch.setattr(TreeSitterAnalyzer, '_setup_parsers', setup_parsers)
+    return TreeSitterAnalyzer()
+
+@pytest.fixture
+def go_analyzer(monkeypatch):
+    """TreeSitterAnalyzer parsing Go with the tree-sitter-go package instead of a built library."""
+    return _patch_parsers(monkeypatch, {'.go': _language('go')})
+
+@pytest.fixture
+def cpp_analyzer(monkeypatch):
+    """TreeSitterAnalyzer parsing C++ sources and headers with the tree-sitter-cpp package."""
+    language = _language('cpp')
+    return _patch_parsers(monkeypatch, {ext: language for ext in ('.cpp', '.h')})
+
+@pytest.fixture
+def go_file(tmp_path):
+    path = tmp_path / 'pe.go'
+    path.write_bytes(GO_SOURCE)
+    return path
+
+@pytest.fixture
+def records(go_analyzer, go_file):
+    """Parse records of the same file under every pruning profile, keyed like stored paths."""
+    return {f'pkg{i}/pe.go': go_analyzer.parse_file(go_file, prune_profile=profile)
+            for i, profile in enumerate((None, 'named', 'declarations', 'outline'))}
+
+@pytest.fixture
+def check_read_back(records):
+    """Check that a shard or archive reader returns every record as written, summary included."""
+    from file_summary import summarize_ast
+
+    def check(reader):
+        assert reader.files() == list(records)
+        for file_path, record in records.items():
+            loaded = reader.load(file_path)
+            # Writers summarize records that come without a summary
+            assert loaded.pop('summary') == summarize_ast(record['ast'])
+            assert loaded == record
+            assert reader.summary(file_path).may_contain('ProcessingElement')
+    return check
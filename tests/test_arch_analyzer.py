@@ -0,0 +1,94 @@
+import random
+
+import compact_schema
+from analysis_store import AnalysisStore
+from arch_analysis.arch_analyzer import ArchitectureAnalyzer
+from shard_store import ShardWriter
+
+def write_components(go_analyzer, go_file, analysis_dir):
+    """Dump the same file name into a JSON component and a sharded component."""
+    ast_data = go_analyzer.parse_file(str(go_file))
+    analysis_dir.mkdir()
+    compact_schema.dump({'component': 'core', 'files_analyzed': 1,
+                         'analysis': [{'file': 'pe.go', 'ast': ast_data}]},
+                        analysis_dir / 'core_analysis.json', compact=False)
+    with ShardWriter(str(analysis_dir / 'network_shards')) as writer:
+        writer.add('pe.go', ast_data)
+
+def test_same_file_name_in_two_components_is_kept_apart(go_analyzer, go_file, tmp_path):
+    write_components(go_analyzer, go_file, tmp_path / 'analysis')
+    analyzer = ArchitectureAnalyzer(str(tmp_path / 'analysis'))
+
+    with AnalysisStore() as store:
+        analysis = analyzer.analyze_architecture(store)
+        assert sorted(store.files()) == ['core/pe.go', 'network/pe.go']
+
+    locations = {location[0] for edge in analysis['relationships'] for location in edge['locations']}
+    assert locations == {'core/pe.go', 'network/pe.go'}
+
+    hierarchy = analyzer.summarize_hierarchy()
+    assert hierarchy['summary']['files'] == 2
+    assert {'core', 'network'} <= set(hierarchy['directories'])
+
+def generated_file(rng, prefix):
+    """
+    A Go file with a random number of structs, fields and control flow, so counts vary by size.
+    Its types are its own (prefix), as the component estimate assumes for names seen in one file.
+    """
+    lines = ['package core', '']
+    for unit in range(rng.randint(1, 6)):
+        lines.append(f'type Unit{prefix}_{unit} struct {{')
+        lines.extend(f'\tPort{field} chan int' for field in range(rng.randint(0, 4)))
+        lines.append('}')
+        lines.append(f'func (u *Unit{prefix}_{unit}) Tick(n int) {{')
+        lines.extend(f'\tif n > {branch} {{ n-- }}' for branch in range(rng.randint(0, 5)))
+        lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def write_sampled_components(go_analyzer, tmp_path, files_per_component=40):
+    source_dir = tmp_path / 'src'
+    source_dir.mkdir()
+    analysis_dir = tmp_path / 'analysis'
+    analysis_dir.mkdir()
+    rng = random.Random(1)
+    for component in ('core', 'network'):
+        with ShardWriter(str(analysis_dir / f'{component}_shards')) as writer:
+            for index in range(files_per_component):
+                path = source_dir / f'{component}_{index}.go'
+                path.write_text(generated_file(rng, f'{component}{index}'))
+                writer.add(f'unit_{index}.go', go_analyzer.parse_file(str(path)))
+    return ArchitectureAnalyzer(str(analysis_dir))
+
+def test_final_sampling_step_is_exact(go_analyzer, tmp_path):
+    analyzer = write_sampled_components(go_analyzer, tmp_path)
+    exact = analyzer.analyze_architecture()['metrics']
+
+    steps = list(analyzer.iter_approximate_architecture(seed=3))
+    final = steps[-1]
+
+    assert final['sampling']['exact']
+    assert final['sampling']['files_sampled'] == 80
+    for metric in ('total_components', 'total_relationships', 'control_flow_count', 'data_flow_count'):
+        assert final['metrics'][metric] == exact[metric]
+        assert final['metrics']['confidence_intervals'][metric] == [exact[metric], exact[metric]]
+    assert not any(step['sampling']['exact'] for step in steps[:-1])
+
+def test_confidence_intervals_contain_the_truth(go_analyzer, tmp_path):
+    analyzer = write_sampled_components(go_analyzer, tmp_path)
+    exact = analyzer.analyze_architecture()['metrics']
+
+    steps = list(analyzer.iter_approximate_architecture((0.1, 0.25, 0.5), seed=3))
+
+    assert [step['sampling']['files_sampled'] for step in steps] == [10, 20, 40]
+    for step in steps:
+        for metric, (low, high) in step['metrics']['confidence_intervals'].items():
+            assert low <= exact[metric] <= high, (step['sampling']['files_sampled'], metric)
+
+def test_same_seed_draws_the_same_sample(go_analyzer, tmp_path):
+    analyzer = write_sampled_components(go_analyzer, tmp_path)
+
+    first = analyzer.analyze_architecture_approx(0.25, seed=5)
+    second = analyzer.analyze_architecture_approx(0.25, seed=5)
+
+    assert first['metrics'] == second['metrics']
+    assert first['sampling']['files_sampled'] == 20
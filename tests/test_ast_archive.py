@@ -0,0 +1,87 @@
+import logging
+import os
+import zlib
+
+import pytest
+
+import ast_archive
+from ast_archive import FOOTER, ArchiveReader, ArchiveWriter, available_codecs
+
+def write_archive(path, records, **kwargs):
+    # Two workers and more records than 2 * workers, so frames are flushed while adding
+    with ArchiveWriter(path, max_workers=2, **kwargs) as writer:
+        for file_path, record in records.items():
+            writer.add(file_path, record)
+    return writer
+
+@pytest.mark.parametrize('codec', available_codecs())
+@pytest.mark.parametrize('compact', [True, False])
+def test_records_read_back(records, check_read_back, tmp_path, codec, compact):
+    write_archive(tmp_path / 'ast.astar', records, codec=codec, compact=compact)
+
+    with ArchiveReader(tmp_path / 'ast.astar', verify=True) as reader:
+        assert reader.codec == codec
+        check_read_back(reader)
+        reader.verify()
+
+def test_reads_without_pread(records, tmp_path, monkeypatch):
+    write_archive(tmp_path / 'ast.astar', records)
+    monkeypatch.delattr(os, 'pread', raising=False)
+
+    with ArchiveReader(tmp_path / 'ast.astar') as reader:
+        assert [reader.load(file_path)['ast'] for file_path in records] == [r['ast'] for r in records.values()]
+
+def test_zstd_falls_back_to_zlib_without_zstandard(records, check_read_back, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(ast_archive, 'zstandard', None)
+
+    with caplog.at_level(logging.WARNING):
+        writer = write_archive(tmp_path / 'ast.astar', records, codec='zstd', level=19)
+
+    assert writer.codec == 'zlib'
+    assert 'zstandard is not installed' in caplog.text
+    with ArchiveReader(tmp_path / 'ast.astar') as reader:
+        assert reader.codec == 'zlib'
+        check_read_back(reader)
+
+def test_zstd_archive_needs_zstandard_to_read(records, tmp_path, monkeypatch):
+    # Stand-in zstd codec, so the archive can be written without zstandard installed
+    monkeypatch.setitem(ast_archive.CODECS, 'zstd', (lambda data, level: zlib.compress(data), zlib.decompress, 3))
+    monkeypatch.setattr(ast_archive, 'zstandard', object())
+    write_archive(tmp_path / 'ast.astar', records, codec='zstd')
+    monkeypatch.setattr(ast_archive, 'zstandard', None)
+
+    with pytest.raises(ValueError, match='codec not available'):
+        ArchiveReader(tmp_path / 'ast.astar')
+
+@pytest.mark.parametrize('keep', [
+    lambda size: size - 1,                    # footer cut short
+    lambda size: size - FOOTER.size,          # footer gone, index end read as footer
+    lambda size: len(ast_archive.ARCHIVE_MAGIC) + 4,  # shorter than any footer
+])
+def test_rejects_truncated_archives(records, tmp_path, keep):
+    write_archive(tmp_path / 'ast.astar', records)
+    data = (tmp_path / 'ast.astar').read_bytes()
+    (tmp_path / 'ast.astar').write_bytes(data[:keep(len(data))])
+
+    with pytest.raises(ValueError, match='Truncated'):
+        ArchiveReader(tmp_path / 'ast.astar')
+
+def test_verify_rejects_a_corrupt_frame(records, tmp_path):
+    writer = write_archive(tmp_path / 'ast.astar', records)
+    entry = writer.entries['pkg1/pe.go']
+    data = bytearray((tmp_path / 'ast.astar').read_bytes())
+    data[entry['offset'] + entry['length'] // 2] ^= 0xff
+    (tmp_path / 'ast.astar').write_bytes(bytes(data))
+
+    with ArchiveReader(tmp_path / 'ast.astar') as reader:
+        with pytest.raises(ValueError, match='pkg1/pe.go'):
+            reader.verify()
+
+def test_rejects_files_that_are_not_archives(tmp_path):
+    (tmp_path / 'other.bin').write_bytes(b'not an archive at all, just some bytes')
+    with pytest.raises(ValueError):
+        ArchiveReader(tmp_path / 'other.bin')
+
+def test_rejects_unknown_codec(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveWriter(tmp_path / 'ast.astar', codec='rar')
@@ -0,0 +1,45 @@
+import re
+
+import pytest
+
+from ast_index import ASTIndex, SelectorError, quote_value
+
+def leaf(text):
+    return {'type': 'identifier', 'text': text, 'children': []}
+
+@pytest.fixture
+def index():
+    texts = ['PE.Run', 'PExRun', 'say "hi"', 'a|b', 'ab', 'back\\slash']
+    return ASTIndex({'type': 'source_file', 'children': [leaf(text) for text in texts]})
+
+def selected(index, selector):
+    return [index.nodes[position]['text'] for position in index.select_positions(selector)]
+
+@pytest.mark.parametrize('literal, expected', [
+    ('pe.run', ['PE.Run']),
+    ('"hi"', ['say "hi"']),
+    ('a|b', ['a|b']),
+    ('\\s', ['back\\slash']),
+])
+def test_escaped_literals_match_only_themselves(index, literal, expected):
+    selector = f'[text~="{quote_value(re.escape(literal))}" i]'
+
+    assert selected(index, selector) == expected
+
+def test_escaped_alternatives(index):
+    pattern = '|'.join(re.escape(text) for text in ('"hi"', 'a|b'))
+
+    assert selected(index, f'[text~="{quote_value(pattern)}"]') == ['say "hi"', 'a|b']
+
+def test_unescaped_quote_does_not_parse():
+    with pytest.raises(SelectorError):
+        ASTIndex(leaf('x')).select_positions('[text="say "hi""]')
+
+def test_component_selector_matches_like_substrings(go_analyzer, go_file):
+    from cgra_analyzer import CGRAAnalyzer
+    analyzer = CGRAAnalyzer()
+    index = ASTIndex(analyzer.parse_file(str(go_file))['ast'])
+
+    expected = [position for position, node in enumerate(index.nodes)
+                if 'text' in node and any(text in node['text'].lower() for text in analyzer._component_texts)]
+    assert index.select_positions(analyzer._component_selector) == expected
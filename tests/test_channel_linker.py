@@ -0,0 +1,93 @@
+from channel_linker import ChannelLinker
+from cgra_analyzer import CGRAAnalyzer
+
+METHODS_SOURCE = '''package cgra
+
+type A struct{}
+type B struct{}
+
+func (a *A) Run() {
+\tch := make(chan int)
+\tch <- 1
+}
+
+func (b *B) Run() {
+\tch := make(chan int)
+\t<-ch
+}
+'''
+
+MAIN_SEND = '''package main
+
+var done = make(chan bool)
+
+func main() {
+\tdone <- true
+}
+'''
+
+MAIN_RECEIVE = '''package main
+
+var done = make(chan bool)
+
+func main() {
+\t<-done
+}
+'''
+
+def analyze(analyzer, root, files):
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return analyzer.analyze_cgra_project(str(root))
+
+def channel_keys(project):
+    return {entry['channel'] for entry in project['dataflow']['channels']}
+
+def test_method_locals_are_scoped_by_receiver_type(go_analyzer, tmp_path):
+    project = analyze(CGRAAnalyzer(), tmp_path, {'pe.go': METHODS_SOURCE})
+
+    assert channel_keys(project) == {'cgra.A.Run:ch', 'cgra.B.Run:ch'}
+    assert project['dataflow']['connections'] == []
+    assert sorted(p['type'] for p in project['dataflow']['patterns']) == ['unconsumed', 'unproduced']
+
+def test_same_package_name_in_two_directories_does_not_link(go_analyzer, tmp_path):
+    project = analyze(CGRAAnalyzer(), tmp_path, {'cmd/send/main.go': MAIN_SEND,
+                                                 'cmd/receive/main.go': MAIN_RECEIVE})
+
+    assert channel_keys(project) == {'cmd/send/main.done', 'cmd/receive/main.done'}
+    assert project['dataflow']['connections'] == []
+
+def test_same_directory_links_across_files(go_analyzer, tmp_path):
+    project = analyze(CGRAAnalyzer(), tmp_path, {'cmd/main.go': MAIN_SEND, 'cmd/wait.go': MAIN_RECEIVE})
+
+    [connection] = project['dataflow']['connections']
+    assert connection['channel'] == 'cmd/main.done'
+    assert connection['from'] == {'file': 'cmd/main.go', 'function': 'main'}
+    assert connection['to'] == {'file': 'cmd/wait.go', 'function': 'main'}
+
+def test_copy_in_another_directory_is_rekeyed(go_analyzer, tmp_path):
+    path = tmp_path / 'cmd' / 'main.go'
+    path.parent.mkdir()
+    path.write_text(MAIN_SEND)
+    analyzer = CGRAAnalyzer()
+    original = analyzer.analyze_cgra_file(str(path), str(tmp_path))
+
+    copy = CGRAAnalyzer.rewrite_file_analysis(original, 'tools/main.go')
+
+    assert [entry['channel'] for entry in copy['dataflow']['channels']] == ['tools/main.done']
+    assert [p['channel'] for p in copy['dataflow']['patterns']] == ['tools/main.done']
+    assert [entry['channel'] for entry in original['dataflow']['channels']] == ['cmd/main.done']
+
+def test_linker_joins_only_equal_keys():
+    linker = ChannelLinker()
+    linker.add([
+        {'channel': 'cmd/a/main.done', 'direction': 'send', 'file': 'cmd/a/main.go', 'function': 'main'},
+        {'channel': 'cmd/b/main.done', 'direction': 'receive', 'file': 'cmd/b/main.go', 'function': 'main'},
+        {'channel': 'cmd/a/main.done', 'direction': 'receive', 'file': 'cmd/a/wait.go', 'function': 'wait'},
+    ])
+    graph = linker.link()
+
+    assert [(c['from']['file'], c['to']['file']) for c in graph['connections']] == \
+        [('cmd/a/main.go', 'cmd/a/wait.go')]
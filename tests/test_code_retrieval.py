@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from code_retrieval import CodeIndex, tokenize
+
+@pytest.fixture
+def project(tmp_path, go_file):
+    root = tmp_path / 'project'
+    root.mkdir()
+    (root / 'pe.go').write_bytes(go_file.read_bytes())
+    (root / 'memory.go').write_text('package cgra\n\n'
+                                    'type MemoryBank struct {\n\tWords []uint32\n}\n\n'
+                                    'func (m *MemoryBank) ReadWord(addr int) uint32 {\n\treturn m.Words[addr]\n}\n')
+    return root
+
+def touch(path):
+    # A new mtime, so the size and mtime shortcut cannot hide the change
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def names(results):
+    return [result['name'] for result in results]
+
+def test_search_ranks_matching_declarations_first(go_analyzer, project, tmp_path):
+    index = CodeIndex(tmp_path / 'index.json', go_analyzer)
+    assert index.update(project) == 2
+
+    assert names(index.search('read memory word', k=1)) == ['ReadWord']
+    assert 'ProcessingElement' in names(index.search('processing element', k=2))
+
+def test_unchanged_files_are_not_reindexed(go_analyzer, project, tmp_path):
+    CodeIndex(tmp_path / 'index.json', go_analyzer).update(project)
+
+    index = CodeIndex(tmp_path / 'index.json', go_analyzer)
+    assert index.update(project) == 0
+    assert index.stats['files_read'] == 0
+    assert names(index.search('read memory word', k=1)) == ['ReadWord']
+
+def test_changed_and_deleted_files_replace_their_documents(go_analyzer, project, tmp_path):
+    index = CodeIndex(tmp_path / 'index.json', go_analyzer)
+    index.update(project)
+
+    (project / 'memory.go').write_text('package cgra\n\nfunc FlushScratchpad() {}\n')
+    touch(project / 'memory.go')
+    os.remove(project / 'pe.go')
+    assert index.update(project) == 1
+
+    assert index.stats['files_removed'] == 1
+    assert set(index.files) == {'memory.go'}
+    assert names(index.search('flush scratchpad')) == ['FlushScratchpad']
+    assert names(index.search('read word')) == []
+    assert names(index.search('processing element')) == []
+    # Postings of removed documents are gone too
+    assert all(doc_id in index.docs for postings in index.postings.values() for doc_id in postings)
+
+def test_parse_failure_drops_stale_documents(go_analyzer, project, tmp_path, monkeypatch):
+    index = CodeIndex(tmp_path / 'index.json', go_analyzer)
+    index.update(project)
+
+    (project / 'memory.go').write_text('package cgra\n\nfunc Changed() {}\n')
+    touch(project / 'memory.go')
+    monkeypatch.setattr(go_analyzer, 'parse_file', lambda *args, **kwargs: None)
+    assert not index.index_file(project, project / 'memory.go')
+
+    assert 'memory.go' not in index.files
+    assert 'ReadWord' not in names(index.search('read memory word'))
+
+def test_tokenize_splits_identifiers():
+    assert tokenize('ReadWord(addr)') == ['read', 'word', 'addr']
@@ -0,0 +1,28 @@
+import compact_schema
+from code_analyzer import COMPACT
+
+def test_round_trip_restores_parse_record(go_analyzer, go_file):
+    record = go_analyzer.parse_file(go_file)
+    document = compact_schema.encode({'file': 'pe.go', 'ast': record})
+
+    assert compact_schema.is_compact(document)
+    assert compact_schema.decode(document) == {'file': 'pe.go', 'ast': record}
+
+def test_strings_are_interned_once(go_analyzer, go_file):
+    document = compact_schema.encode(go_analyzer.parse_file(go_file))
+
+    assert len(document['strings']) == len(set(document['strings']))
+
+def test_compact_output_matches_dict_output(go_analyzer, go_file):
+    for profile in (None, 'named', 'declarations'):
+        record = go_analyzer.parse_file(go_file, prune_profile=profile)
+        packed = compact_schema.decode(go_analyzer.parse_file(go_file, prune_profile=profile, output=COMPACT))
+        packed.pop('summary')
+        assert packed == record
+
+def test_dump_and_load_detect_the_schema(go_analyzer, go_file, tmp_path):
+    record = go_analyzer.parse_file(go_file)
+    for compact in (True, False):
+        path = tmp_path / f'ast_{compact}.json'
+        compact_schema.dump(record, path, compact)
+        assert compact_schema.load(path) == record
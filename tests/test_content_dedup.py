@@ -0,0 +1,37 @@
+from content_dedup import ParseCache
+
+def record(path):
+    return {'file_path': path, 'ast': {'type': 'source_file'}, 'file_policy': {'action': 'parse'}}
+
+def test_copy_points_at_the_parsed_path():
+    cache = ParseCache()
+    key = cache.key(b'package a', '.go', None)
+    cache.put(key, record('a/x.go'))
+
+    copy = cache.get(key, 'b/x.go')
+
+    assert copy['file_path'] == 'b/x.go'
+    assert copy['duplicate_of'] == 'a/x.go'
+    assert 'file_policy' not in copy
+    assert cache.stats == {'unique': 1, 'duplicates': 1}
+
+def test_same_path_again_is_not_a_duplicate():
+    cache = ParseCache()
+    key = cache.key(b'package a', '.go', None)
+    cache.put(key, record('a/x.go'))
+
+    again = cache.get(key, 'a/x.go')
+
+    assert 'duplicate_of' not in again
+    assert cache.stats == {'unique': 1, 'duplicates': 0}
+
+def test_least_recently_used_result_is_evicted():
+    cache = ParseCache(max_entries=2)
+    keys = [cache.key(content, '.go', None) for content in (b'one', b'two', b'three')]
+    cache.put(keys[0], record('one.go'))
+    cache.put(keys[1], record('two.go'))
+    cache.get(keys[0], 'copy.go')
+    cache.put(keys[2], record('three.go'))
+
+    assert cache.get(keys[1], 'other.go') is None
+    assert cache.get(keys[0], 'other.go')['duplicate_of'] == 'one.go'
@@ -0,0 +1,26 @@
+from cgra_analyzer import CGRAAnalyzer
+from context_packer import ContextPacker
+from file_policy import FilePolicy
+
+def test_cached_summary_is_reused_under_another_root(go_analyzer, go_file, tmp_path):
+    cache = tmp_path / 'cache.json'
+    first = ContextPacker(CGRAAnalyzer(), str(cache))
+    summary = first.summarize_file(str(go_file), 'pe.go')
+    first.save_cache()
+
+    packer = ContextPacker(CGRAAnalyzer(), str(cache))
+    packer.analyzer.parse_file = None  # a cache hit must not parse
+    again = packer.summarize_file(str(go_file), 'src/pe.go')
+
+    assert again == {**summary, 'file': 'src/pe.go'}
+    assert summary['file'] == 'pe.go'
+
+def test_cache_of_other_settings_is_ignored(go_analyzer, go_file, tmp_path):
+    cache = tmp_path / 'cache.json'
+    first = ContextPacker(CGRAAnalyzer(), str(cache))
+    first.summarize_file(str(go_file), 'pe.go')
+    first.save_cache()
+
+    for analyzer in (CGRAAnalyzer('declarations'), CGRAAnalyzer(file_policy=FilePolicy())):
+        packer = ContextPacker(analyzer, str(cache))
+        assert packer._summary_cache == {}
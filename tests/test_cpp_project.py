@@ -0,0 +1,29 @@
+from cpp_project import CppProject
+
+def make_project(root):
+    files = {'main.cpp': '#include "a.h"\n#include "b.h"\nint main() { return 0; }\n',
+             'a.h': '#include "b.h"\nint a();\n',
+             'b.h': 'int b();\n'}
+    for name, text in files.items():
+        (root / name).write_text(text)
+
+def test_trees_are_released_after_build_by_default(cpp_analyzer, tmp_path):
+    make_project(tmp_path)
+    project = CppProject(tmp_path, analyzer=cpp_analyzer)
+    project.build()
+
+    assert project.stats['files_parsed'] == 3
+    assert len(project._trees) == 0
+    assert project.parse(tmp_path / 'a.h')['ast']['type'] == 'translation_unit'
+    assert project.stats['files_parsed'] == 4
+
+def test_kept_trees_are_capped_and_reused(cpp_analyzer, tmp_path):
+    make_project(tmp_path)
+    project = CppProject(tmp_path, analyzer=cpp_analyzer, keep_trees=2)
+    graph = project.build()
+
+    assert len(project._trees) == 2
+    for path in graph:
+        assert project.parse(path) is not None
+    assert project.stats['files_parsed'] == 4
+    assert len(project._trees) == 0
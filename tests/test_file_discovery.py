@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from file_discovery import FileDiscovery, IgnoreRules
+
+@pytest.mark.parametrize('patterns, rel_path, is_dir, expected', [
+    # Unanchored patterns match at any depth
+    (['*.pb.go'], 'api.pb.go', False, True),
+    (['*.pb.go'], 'proto/v1/api.pb.go', False, True),
+    (['gen'], 'core/gen', True, True),
+    # A leading or inner slash anchors the pattern to the rules' directory
+    (['/gen'], 'gen', True, True),
+    (['/gen'], 'core/gen', True, None),
+    (['core/gen'], 'core/gen', True, True),
+    (['core/gen'], 'x/core/gen', True, None),
+    (['**/gen'], 'x/core/gen', True, True),
+    (['core/**'], 'core/a/b.go', False, True),
+    (['a/**/b.go'], 'a/b.go', False, True),
+    (['a/**/b.go'], 'a/x/y/b.go', False, True),
+    # Wildcards stay within one segment
+    (['core/*.go'], 'core/sub/pe.go', False, None),
+    (['pe?.go'], 'pe1.go', False, True),
+    (['pe[0-9].go'], 'pe7.go', False, True),
+    (['pe[!0-9].go'], 'pe7.go', False, None),
+    # Directory-only rules never match files
+    (['logs/'], 'logs', True, True),
+    (['logs/'], 'logs', False, None),
+    (['logs/'], 'src/logs', True, True),
+    # Negation re-includes, the last matching rule wins
+    (['*.go', '!keep.go'], 'keep.go', False, False),
+    (['*.go', '!keep.go'], 'drop.go', False, True),
+    (['!keep.go', '*.go'], 'keep.go', False, True),
+    # Comments, blank lines and escapes
+    (['# *.go', ''], 'pe.go', False, None),
+    (['\\#notes'], '#notes', False, True),
+    (['\\!bang'], '!bang', False, True),
+])
+def test_pattern_table(patterns, rel_path, is_dir, expected):
+    assert IgnoreRules(patterns).match(rel_path, is_dir) is expected
+
+@pytest.mark.parametrize('base, rel_path, expected', [
+    ('core', 'core/gen.go', True),
+    ('core', 'core/sub/gen.go', True),
+    ('core', 'gen.go', None),
+    ('core', 'corex/gen.go', None),
+])
+def test_rules_match_relative_to_their_directory(base, rel_path, expected):
+    assert IgnoreRules(['gen.go'], base).match(rel_path, False) is expected
+
+def write_tree(root, files):
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+def relative(root, paths):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in paths]
+
+@pytest.mark.parametrize('files, expected', [
+    # A deeper .gitignore re-includes what the root one ignores
+    ({'.gitignore': '*_gen.go\n', 'core/.gitignore': '!keep_gen.go\n',
+      'a_gen.go': '', 'core/keep_gen.go': '', 'core/drop_gen.go': ''},
+     ['core/keep_gen.go']),
+    # ...and ignores what the root one re-includes
+    ({'.gitignore': '*.go\n!pe.go\n', 'core/.gitignore': 'pe.go\n', 'pe.go': '', 'core/pe.go': ''},
+     ['pe.go']),
+    # Ignored directories are not entered, so their files cannot be re-included
+    ({'.gitignore': 'gen/\n!gen/keep.go\n', 'gen/keep.go': '', 'main.go': ''},
+     ['main.go']),
+    # Anchored rules of a nested .gitignore are relative to its directory
+    ({'core/.gitignore': '/pe.go\n', 'core/pe.go': '', 'core/sub/pe.go': '', 'pe.go': ''},
+     ['core/sub/pe.go', 'pe.go']),
+])
+def test_gitignore_files_apply_from_the_root_down(tmp_path, files, expected):
+    write_tree(tmp_path, files)
+
+    assert relative(tmp_path, FileDiscovery(('.go',)).discover(str(tmp_path))) == expected
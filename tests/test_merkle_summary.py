@@ -0,0 +1,83 @@
+import os
+
+from merkle_summary import MerkleSummarizer
+
+def make_tree(root):
+    files = {'a/x.go': 'one\n', 'a/y.go': 'two\nlines\n', 'b/z.go': 'three\n', 'top.go': 'top\n'}
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return [str(root / rel_path) for rel_path in files]
+
+def line_summarizer(root, cache_path, calls):
+    def summarize_file(rel_path):
+        calls.append(rel_path)
+        with open(os.path.join(root, rel_path)) as f:
+            return {'files': 1, 'counts': {'lines': f.read().count('\n')}, 'components': [], 'patterns': {}}
+    return MerkleSummarizer(summarize_file, cache_path, salt='lines')
+
+def test_unchanged_tree_is_reused_without_reading_files(tmp_path):
+    files = make_tree(tmp_path / 'src')
+    cache = tmp_path / 'cache.json'
+    first = line_summarizer(tmp_path / 'src', cache, []).summarize_files(tmp_path / 'src', files)
+
+    calls = []
+    summarizer = line_summarizer(tmp_path / 'src', cache, calls)
+    second = summarizer.summarize_files(tmp_path / 'src', files)
+
+    assert second == first
+    assert first['summary']['counts'] == {'lines': 5}
+    assert calls == []
+    assert summarizer.stats['files_read'] == 0
+    assert summarizer.stats['directories_computed'] == 0
+
+def test_change_recomputes_only_its_path_to_the_root(tmp_path):
+    files = make_tree(tmp_path / 'src')
+    cache = tmp_path / 'cache.json'
+    first = line_summarizer(tmp_path / 'src', cache, []).summarize_files(tmp_path / 'src', files)
+
+    (tmp_path / 'src' / 'a' / 'x.go').write_text('one\nand more\n')
+    os.utime(tmp_path / 'src' / 'a' / 'x.go', ns=(1, 1))
+    calls = []
+    summarizer = line_summarizer(tmp_path / 'src', cache, calls)
+    second = summarizer.summarize_files(tmp_path / 'src', files)
+
+    assert calls == [os.path.join('a', 'x.go')]
+    # a and the root are merged again, b is reused
+    assert summarizer.stats['directories_computed'] == 2
+    assert summarizer.stats['directories_reused'] == 1
+    assert second['directories']['b'] == first['directories']['b']
+    assert second['summary']['counts'] == {'lines': 6}
+    assert second['hash'] != first['hash']
+
+def test_identical_content_at_another_path_is_summarized_again(tmp_path):
+    files = make_tree(tmp_path / 'src')
+    cache = tmp_path / 'cache.json'
+    line_summarizer(tmp_path / 'src', cache, []).summarize_files(tmp_path / 'src', files)
+
+    # Same content, new path: path-dependent summaries (e.g. a file policy) must not be shared
+    (tmp_path / 'src' / 'b' / 'copy.go').write_text('three\n')
+    calls = []
+    line_summarizer(tmp_path / 'src', cache, calls).summarize_files(
+        tmp_path / 'src', files + [str(tmp_path / 'src' / 'b' / 'copy.go')])
+
+    assert calls == [os.path.join('b', 'copy.go')]
+
+def test_other_salt_ignores_the_cache(tmp_path):
+    files = make_tree(tmp_path / 'src')
+    cache = tmp_path / 'cache.json'
+    line_summarizer(tmp_path / 'src', cache, []).summarize_files(tmp_path / 'src', files)
+
+    calls = []
+    summarize_file = line_summarizer(tmp_path / 'src', None, calls).summarize_file
+    MerkleSummarizer(summarize_file, cache, salt='words').summarize_files(tmp_path / 'src', files)
+
+    assert len(calls) == len(files)
+
+def test_missing_files_are_left_out(tmp_path):
+    files = make_tree(tmp_path / 'src')
+    result = line_summarizer(tmp_path / 'src', None, []).summarize_files(
+        tmp_path / 'src', files + [str(tmp_path / 'src' / 'gone.go')])
+
+    assert result['summary']['files'] == len(files)
@@ -0,0 +1,117 @@
+import signal
+import threading
+
+import pytest
+
+import batch_analyze
+from parse_budget import CANCELLED, SIZE, TIMEOUT, Deadline, ParseBudget, ParseTimeout, degraded_result
+
+SMALL_SOURCE = b'package cgra\n\nfunc Add(a, b int) int { return a + b }\n'
+# Large enough that neither parsing nor analyzing it fits in a microsecond budget
+LARGE_SOURCE = b'package cgra\n' + b''.join(
+    b'func F%d(in chan int, out chan int) { out <- <-in * %d }\n' % (i, i) for i in range(5000))
+
+@pytest.fixture
+def parser(go_analyzer):
+    return go_analyzer._parser_for('.go')
+
+def has_error(node):
+    return node.type == 'ERROR' or node.is_missing or any(has_error(child) for child in node.children)
+
+def test_parser_timeout_resets_the_parser(parser):
+    deadline = Deadline(ParseBudget(max_seconds=1e-6), threading.Event())
+
+    with pytest.raises(ParseTimeout) as caught:
+        deadline.parse(parser, LARGE_SOURCE)
+    assert caught.value.reason == TIMEOUT
+
+    # Without the reset the next parse would resume the abandoned one
+    tree = Deadline(None, threading.Event()).parse(parser, SMALL_SOURCE)
+    assert tree.root_node.end_byte == len(SMALL_SOURCE)
+    assert not has_error(tree.root_node)
+
+def test_budget_exception_in_read_callback_is_unwrapped(parser, monkeypatch):
+    def read(byte_offset, point):
+        raise ParseTimeout(TIMEOUT, "watchdog fired")
+
+    deadline = Deadline(None, threading.Event())
+    monkeypatch.setattr(deadline, 'read_callback', lambda source: read)
+
+    with pytest.raises(ParseTimeout) as caught:
+        deadline.parse(parser, SMALL_SOURCE)
+    assert caught.value.detail == "watchdog fired"
+    assert not has_error(Deadline(None, threading.Event()).parse(parser, SMALL_SOURCE).root_node)
+
+def test_other_read_callback_errors_are_not_swallowed(parser, monkeypatch):
+    def read(byte_offset, point):
+        raise KeyError(byte_offset)
+
+    deadline = Deadline(None, threading.Event())
+    monkeypatch.setattr(deadline, 'read_callback', lambda source: read)
+
+    with pytest.raises(SystemError):
+        deadline.parse(parser, SMALL_SOURCE)
+
+def test_cancel_flag_stops_the_parse(parser):
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(ParseTimeout) as caught:
+        Deadline(None, cancel_event).parse(parser, SMALL_SOURCE)
+    assert caught.value.reason == CANCELLED
+
+def test_deadline_checks_the_clock_every_interval():
+    deadline = Deadline(ParseBudget(max_seconds=0, check_interval=3), threading.Event())
+
+    deadline.check()
+    deadline.check()
+    with pytest.raises(ParseTimeout):
+        deadline.check()
+
+def test_degraded_result_has_the_shape_of_a_parse():
+    result = degraded_result('pe.go', 'go', ParseTimeout(SIZE, "too big"))
+
+    assert result['file_path'] == 'pe.go'
+    assert result['language'] == 'go'
+    assert result['ast']['type'] == 'ERROR'
+    assert result['ast']['children'] == []
+    assert result['degraded'] == {'reason': SIZE, 'detail': "too big"}
+
+@pytest.mark.parametrize('budget, reason', [
+    (ParseBudget(max_size=16), SIZE),
+    (ParseBudget(max_seconds=1e-6), TIMEOUT),
+])
+def test_file_over_budget_gets_a_degraded_result(go_analyzer, tmp_path, budget, reason):
+    path = tmp_path / 'big.go'
+    path.write_bytes(LARGE_SOURCE)
+    go_analyzer.parse_budget = budget
+
+    result = go_analyzer.parse_file(str(path))
+
+    assert result['degraded']['reason'] == reason
+    assert result['ast']['children'] == []
+
+def test_cancelled_analyzer_degrades_files(go_analyzer, go_file):
+    go_analyzer.cancel()
+
+    assert go_analyzer.parse_file(str(go_file))['degraded']['reason'] == CANCELLED
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGALRM'), reason="the watchdog needs SIGALRM")
+def test_watchdog_degrades_a_slow_file(go_analyzer, tmp_path, monkeypatch):
+    path = tmp_path / 'big.go'
+    path.write_bytes(LARGE_SOURCE)
+    monkeypatch.setattr(batch_analyze, '_worker_analyzer', None)
+    monkeypatch.setattr(batch_analyze, '_watchdog_seconds', None)
+    previous = signal.getsignal(signal.SIGALRM)
+    try:
+        batch_analyze._init_worker(None, None, None, watchdog_seconds=1e-4)
+        _, _, analysis, error = batch_analyze._analyze_file_task('repo', str(tmp_path), str(path))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    assert error is None
+    assert analysis['file'] == 'big.go'
+    assert analysis['degraded']['reason'] == TIMEOUT
+    assert 'watchdog' in analysis['degraded']['detail']
+    assert analysis['dataflow']['channels'] == []
@@ -0,0 +1,37 @@
+import pytest
+
+import serializer
+
+DATA = {
+    'file': 'pe/processing_element.go',
+    'text': 'naïve → ✓ "quoted"',
+    'counts': {'processing_elements': 3, 'channels': 0},
+    'nested': [{'row': 1, 'column': 0}, [], {}, None, True, False],
+    'ratio': 0.25,
+    'big': 2 ** 70,
+    1: 'non-string key'
+}
+
+@pytest.mark.parametrize('backend', serializer.available_backends())
+@pytest.mark.parametrize('compact', [True, False])
+def test_backends_write_identical_bytes(backend, compact):
+    expected = serializer.Serializer('json').dumps(DATA, compact)
+    assert serializer.Serializer(backend).dumps(DATA, compact) == expected
+
+@pytest.mark.parametrize('backend', serializer.available_backends())
+def test_backends_round_trip(backend, tmp_path):
+    writer = serializer.Serializer(backend)
+    writer.dump(DATA, tmp_path / 'data.json')
+    expected = {str(key): value for key, value in DATA.items()}
+    for reader in serializer.available_backends():
+        assert serializer.Serializer(reader).load(tmp_path / 'data.json') == expected
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_parse_records_are_backend_independent(go_analyzer, go_file, compact):
+    record = go_analyzer.parse_file(go_file)
+    outputs = {serializer.Serializer(backend).dumps(record, compact) for backend in serializer.available_backends()}
+    assert len(outputs) == 1
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        serializer.Serializer('pickle')
@@ -0,0 +1,76 @@
+import pytest
+
+import serializer
+from shard_store import DATA_FILE, MANIFEST_FILE, ShardReader, ShardWriter
+
+def write_shards(path, records, **kwargs):
+    with ShardWriter(path, **kwargs) as writer:
+        return {file_path: writer.add(file_path, record) for file_path, record in records.items()}
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_records_read_back(records, check_read_back, tmp_path, compact):
+    write_shards(tmp_path / 'shards', records, compact=compact)
+
+    with ShardReader(tmp_path / 'shards', verify=True) as reader:
+        check_read_back(reader)
+
+def test_append_extends_the_manifest(records, check_read_back, tmp_path):
+    paths = list(records)
+    first = write_shards(tmp_path / 'shards', {path: records[path] for path in paths[:2]})
+    second = write_shards(tmp_path / 'shards', {path: records[path] for path in paths[2:]}, append=True)
+
+    manifest = serializer.load(tmp_path / 'shards' / MANIFEST_FILE)
+    assert list(manifest['files']) == paths
+    assert min(entry['offset'] for entry in second.values()) > max(entry['offset'] for entry in first.values())
+    with ShardReader(tmp_path / 'shards') as reader:
+        reader.verify()
+        check_read_back(reader)
+
+def test_append_rejects_another_schema(records, tmp_path):
+    write_shards(tmp_path / 'shards', records, compact=True)
+
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path / 'shards', compact=False, append=True)
+
+def test_re_added_path_points_at_newest_record(records, tmp_path):
+    write_shards(tmp_path / 'shards', {'pe.go': records['pkg0/pe.go']})
+    write_shards(tmp_path / 'shards', {'pe.go': records['pkg1/pe.go']}, append=True)
+
+    with ShardReader(tmp_path / 'shards') as reader:
+        assert reader.files() == ['pe.go']
+        assert reader.load('pe.go')['prune_profile'] == 'named'
+
+def corrupt(path, position):
+    data = bytearray(path.read_bytes())
+    data[position] ^= 1
+    path.write_bytes(bytes(data))
+
+def test_verified_reads_detect_corrupt_records(records, tmp_path):
+    entries = write_shards(tmp_path / 'shards', records, compact=False)
+    entry = entries['pkg0/pe.go']
+    corrupt(tmp_path / 'shards' / DATA_FILE, entry['offset'] + entry['length'] // 2)
+
+    with ShardReader(tmp_path / 'shards', verify=True) as reader:
+        with pytest.raises(ValueError):
+            reader.read_raw('pkg0/pe.go')
+        assert reader.load('pkg1/pe.go')['ast'] == records['pkg1/pe.go']['ast']
+
+def test_verify_rejects_a_corrupt_shard(records, tmp_path):
+    entries = write_shards(tmp_path / 'shards', records)
+    with ShardReader(tmp_path / 'shards') as reader:
+        reader.verify()
+
+    entry = entries['pkg2/pe.go']
+    corrupt(tmp_path / 'shards' / DATA_FILE, entry['offset'])
+    with ShardReader(tmp_path / 'shards') as reader:
+        with pytest.raises(ValueError, match='pkg2/pe.go'):
+            reader.verify()
+
+def test_verify_rejects_a_truncated_data_file(records, tmp_path):
+    entries = write_shards(tmp_path / 'shards', records)
+    data_path = tmp_path / 'shards' / DATA_FILE
+    data_path.write_bytes(data_path.read_bytes()[:entries['pkg3/pe.go']['offset'] + 1])
+
+    with ShardReader(tmp_path / 'shards') as reader:
+        with pytest.raises(ValueError, match='pkg3/pe.go'):
+            reader.verify()
@@ -0,0 +1,44 @@
+from code_analyzer import SKELETON
+from skeleton import render_go_skeleton
+
+def test_go_skeleton_keeps_declarations_without_bodies(go_analyzer, go_file):
+    result = go_analyzer.parse_file(go_file, output=SKELETON)
+    skeleton = result['skeleton']
+
+    assert result['language'] == 'go'
+    assert 'ast' not in result
+    assert skeleton['package'] == 'cgra'
+    assert skeleton['imports'] == [{'path': 'fmt'},
+                                   {'path': 'github.com/sarchlab/zeonica/network', 'name': 'net'}]
+    assert skeleton['types'] == [
+        {'name': 'ProcessingElement', 'line': 9, 'kind': 'struct', 'fields': ['ID     int', 'Buffer []int']},
+        {'name': 'Router', 'line': 14, 'kind': 'interface', 'methods': ['Route(dst int) int']}
+    ]
+    assert skeleton['functions'] == [{'name': 'NewProcessingElement', 'line': 18,
+                                      'signature': 'func NewProcessingElement(id int) *ProcessingElement'}]
+    assert skeleton['methods'] == [{'name': 'Tick', 'line': 22, 'receiver': '(pe *ProcessingElement)',
+                                    'signature': 'func (pe *ProcessingElement) Tick(in chan int, out chan<- int)'}]
+
+def test_render_go_skeleton(go_analyzer, go_file):
+    skeleton = go_analyzer.parse_file(go_file, output=SKELETON)['skeleton']
+
+    assert render_go_skeleton(skeleton) == (
+        'package cgra\n'
+        'import "fmt"\n'
+        'import net "github.com/sarchlab/zeonica/network"\n'
+        'type ProcessingElement struct {\n\tID     int\n\tBuffer []int\n}\n'
+        'type Router interface {\n\tRoute(dst int) int\n}\n'
+        'func NewProcessingElement(id int) *ProcessingElement\n'
+        'func (pe *ProcessingElement) Tick(in chan int, out chan<- int)\n'
+    )
+
+def test_type_alias_and_generic_type(go_analyzer, tmp_path):
+    path = tmp_path / 'types.go'
+    path.write_text('package grid\n\ntype ID = int\n\ntype Grid[T any] []T\n')
+    skeleton = go_analyzer.parse_file(path, output=SKELETON)['skeleton']
+
+    assert skeleton['types'] == [
+        {'name': 'ID', 'line': 3, 'kind': 'alias', 'type': 'int'},
+        {'name': 'Grid', 'line': 5, 'type_parameters': '[T any]', 'kind': 'type', 'type': '[]T'}
+    ]
+    assert render_go_skeleton(skeleton) == 'package grid\ntype ID = int\ntype Grid[T any] []T\n'
@@ -0,0 +1,41 @@
+import json
+import logging
+
+import pytest
+
+import snapshot_diff
+from snapshot_diff import SnapshotDiff
+
+def write(path, document):
+    path.write_text(json.dumps(document))
+    return str(path)
+
+@pytest.fixture
+def snapshots(tmp_path):
+    old = {'components': ['PE', 'Router'], 'relationships': [{'from': 'PE', 'to': 'Router', 'type': 'uses'}],
+           'control_flow_patterns': [], 'data_flow_patterns': []}
+    new = {'components': ['PE', 'Switch'], 'relationships': [{'from': 'PE', 'to': 'Router', 'type': 'calls'}],
+           'control_flow_patterns': [], 'data_flow_patterns': []}
+    return write(tmp_path / 'old.json', old), write(tmp_path / 'new.json', new)
+
+def test_diff_without_ijson_loads_each_snapshot_once_and_warns(snapshots, monkeypatch, caplog):
+    monkeypatch.setattr(snapshot_diff, 'ijson', None)
+    loads = []
+    load = SnapshotDiff._load
+    monkeypatch.setattr(SnapshotDiff, '_load', staticmethod(lambda path: loads.append(path) or load(path)))
+
+    with caplog.at_level(logging.WARNING):
+        result = SnapshotDiff().diff(*snapshots)
+
+    assert sorted(loads) == sorted(snapshots)
+    assert 'ijson is not installed' in caplog.text
+    assert result['kind'] == 'architecture'
+    assert [entry['name'] for entry in result['added']] == ['Switch', 'PE->Router']
+    assert [entry['name'] for entry in result['removed']] == ['Router', 'PE->Router']
+
+def test_streaming_diff_matches_whole_loads(snapshots, monkeypatch):
+    pytest.importorskip('ijson')
+    streamed = SnapshotDiff().diff(*snapshots)
+    monkeypatch.setattr(snapshot_diff, 'ijson', None)
+
+    assert SnapshotDiff().diff(*snapshots) == streamed